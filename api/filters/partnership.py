@@ -1,13 +1,14 @@
 from django.contrib.gis.geos import Polygon
-from django.db.models import OuterRef, Q, Case, When, Subquery, F
+from django.db.models import OuterRef, Q, Case, When, Subquery, F, IntegerField, Value
 from django.utils.translation import gettext_lazy as _
 from django_filters import rest_framework as filters
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 
-from base.models.entity_version import EntityVersion
+from partnership.entity_tree import get_entity_tree
+from partnership.financings import get_financing_lookup
 from partnership.models import (
-    Financing,
+    PartnershipConfiguration,
     PartnershipPartnerRelation,
     PartnershipType,
     PartnershipYear,
@@ -17,7 +18,22 @@ from partnership.models import (
 )
 
 
-def filter_funding(year_field='', lookup=''):
+def parse_bbox(value):
+    """
+    Parse a bounding box given as "xmin,ymin,xmax,ymax"
+
+    :return: the Polygon, None if the value is malformed
+    """
+    try:
+        coords = [float(coord) for coord in value.split(',')]
+    except ValueError:
+        return None
+    if len(coords) != 4:
+        return None
+    return Polygon.from_bbox(coords)
+
+
+def filter_funding(year_field='', funding_field=''):
     def inner(qs, name, value):
         # We need at least source to check if funding is set for mobility
         qs = qs.alias(
@@ -38,17 +54,21 @@ def filter_funding(year_field='', lookup=''):
             )
             annotation_to_search_on = 'funding_value'
 
+        # Countries whose financing matches, for the API academic year
+        academic_year = PartnershipConfiguration.get_configuration().get_current_academic_year_for_api()
+        country_ids = get_financing_lookup().country_ids(
+            academic_year.pk, **{funding_field: value.pk}
+        )
+
         return qs.annotate_partner_address('country_id').alias(
             search_id=Case(
                 # If mobility, take financing if funding not set
                 When(partnership__partnership_type=PartnershipType.MOBILITY.name,
                      funding_source__isnull=True,
-                     then=Subquery(Financing.objects.filter(
-                         **{lookup: value.pk},
-                         countries=OuterRef('country_id'),
-                         academic_year=OuterRef('current_academic_year'),
-                     ).values(lookup)[:1])),
-                default=F(annotation_to_search_on))
+                     then=Case(When(country_id__in=country_ids, then=Value(value.pk)))),
+                default=F(annotation_to_search_on),
+                output_field=IntegerField(),
+            )
         ).filter(search_id=value.pk)
     return inner
 
@@ -99,13 +119,13 @@ class PartnershipPartnerRelationFilter(filters.FilterSet):
     funding_source = extend_schema_field(OpenApiTypes.NUMBER)(
         filters.ModelChoiceFilter(
             queryset=FundingSource.objects.all(),
-            method=filter_funding('funding_source_id', 'type__program__source_id'),
+            method=filter_funding('funding_source_id', 'source_id'),
         )
     )
     funding_program = extend_schema_field(OpenApiTypes.NUMBER)(
         filters.ModelChoiceFilter(
             queryset=FundingProgram.objects.all(),
-            method=filter_funding('funding_program_id', 'type__program_id'),
+            method=filter_funding('funding_program_id', 'program_id'),
         )
     )
     funding_type = extend_schema_field(OpenApiTypes.NUMBER)(
@@ -135,9 +155,13 @@ class PartnershipPartnerRelationFilter(filters.FilterSet):
     def filter_ucl_entity(self, queryset, name, value):
         if self.form.cleaned_data.get('with_children', True):
             # Allow all children of entity too
-            cte = EntityVersion.objects.with_parents(entity__uuid=value)
-            qs = cte.queryset().with_cte(cte).values('entity_id')
-            return queryset.filter(partnership__ucl_entity__in=qs)
+            tree = get_entity_tree()
+            entity_id = tree.get_id(value)
+            if entity_id is None:
+                return queryset.none()
+            return queryset.filter(
+                partnership__ucl_entity__in=tree.descendants(entity_id),
+            )
         else:
             return queryset.filter(partnership__ucl_entity__uuid=value)
 
@@ -156,5 +180,7 @@ class PartnershipPartnerRelationFilter(filters.FilterSet):
 
     @staticmethod
     def filter_bbox(queryset, name, value):
-        bbox = Polygon.from_bbox(value.split(','))
+        bbox = parse_bbox(value)
+        if bbox is None:
+            return queryset.none()
         return queryset.filter(location__contained=bbox)
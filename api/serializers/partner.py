@@ -3,7 +3,6 @@ import datetime
 import json
 
 from django.db import transaction
-from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers, status
 
@@ -17,6 +16,7 @@ from partnership.api.exceptions import OrganizationAlreadyDeclareAsPartner
 from partnership.models import Partner, EntityProxy
 
 __all__ = [
+    'PartnerClusterSerializer',
     'PartnerListSerializer',
     'PartnerAdminSerializer',
     'PartnerDetailSerializer',
@@ -31,7 +31,7 @@ class PartnerListSerializer(serializers.ModelSerializer):
     city = serializers.CharField(read_only=True)
     country = serializers.CharField(source='country_name', read_only=True)
     country_iso = serializers.CharField(source='country_iso_code')
-    partnerships_count = serializers.SerializerMethodField()
+    partnerships_count = serializers.IntegerField(read_only=True)
     location = serializers.SerializerMethodField()
 
     class Meta:
@@ -41,10 +41,6 @@ class PartnerListSerializer(serializers.ModelSerializer):
             'location', 'partnerships_count',
         ]
 
-    @extend_schema_field(OpenApiTypes.INT)
-    def get_partnerships_count(self, obj):
-        return self.context['counts'][obj.pk]
-
     @extend_schema_field({
         "type": "array",
         "items": {
@@ -58,6 +54,31 @@ class PartnerListSerializer(serializers.ModelSerializer):
             return json.loads(obj.location.json)
 
 
+class PartnerClusterSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    center = serializers.SerializerMethodField()
+    bbox = serializers.SerializerMethodField()
+    tile = serializers.SerializerMethodField()
+    partner = serializers.UUIDField(allow_null=True)
+
+    @extend_schema_field(serializers.ListField(child=serializers.FloatField()))
+    def get_center(self, obj):
+        return [obj['longitude'], obj['latitude']]
+
+    @extend_schema_field(serializers.ListField(child=serializers.FloatField()))
+    def get_bbox(self, obj):
+        return [
+            obj['min_longitude'],
+            obj['min_latitude'],
+            obj['max_longitude'],
+            obj['max_latitude'],
+        ]
+
+    @extend_schema_field(serializers.ListField(child=serializers.IntegerField()))
+    def get_tile(self, obj):
+        return [obj['zoom'], obj['x'], obj['y']]
+
+
 class PartnerDetailSerializer(PartnerListSerializer):
     partner_type = serializers.CharField(source='organization.get_type_display')
     website = serializers.CharField()
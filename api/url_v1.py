@@ -3,7 +3,7 @@ from django.urls import path, re_path
 from .views.configuration import ConfigurationView
 from .views.partners import (
     PartnersApiListView, InternshipPartnerListApiView, InternshipPartnerDetailApiView,
-    DeclareOrganizationAsInternshipPartnerApiView,
+    DeclareOrganizationAsInternshipPartnerApiView, PartnersClustersApiView,
 )
 from .views.partnerships import (
     PartnershipsApiExportView,
@@ -16,6 +16,7 @@ app_name = "partnership_api_v1"
 urlpatterns = [
     path('configuration', ConfigurationView.as_view(), name='configuration'),
     path('partners', PartnersApiListView.as_view(), name='partners'),
+    path('partners/clusters', PartnersClustersApiView.as_view(), name='partners_clusters'),
     path('internship_partners', InternshipPartnerListApiView.as_view(), name='internship_partners'),
     path(
         'declare_organization_as_internship_partner',
@@ -1,10 +1,17 @@
+import hashlib
+import time
+
 from django.conf import settings
 from django.contrib.postgres.aggregates import StringAgg
+from django.core.cache import cache
 from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.utils.translation import get_language
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.permissions import AllowAny
-from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 
 from base.models.education_group_year import EducationGroupYear
@@ -18,6 +25,7 @@ from partnership.api.serializers.configuration import (
     EducationLevelSerializer,
     PartnershipTypeSerializer, ConfigurationSerializer,
 )
+from partnership.cache import PARTNERSHIP_DATA, get_data_version
 from partnership.models import (
     EntityProxy,
     Partner,
@@ -32,93 +40,137 @@ from reference.models.continent import Continent
 from reference.models.country import Country
 
 
-class ConfigurationView(APIView):
+CONFIGURATION_CACHE_KEY = 'partnership_api_configuration_{version}_{language}_{year}'
+CONFIGURATION_CACHE_TIMEOUT = 24 * 60 * 60
 
-    permission_classes = (AllowAny,)
 
-    @extend_schema(
-        responses=ConfigurationSerializer,
-    )
-    def get(self, request):
-        config = PartnershipConfiguration.get_configuration()
-        current_year = config.get_current_academic_year_for_api()
-
-        continents = Continent.objects.prefetch_related(
-            Prefetch(
-                'country_set',
-                queryset=Country.objects.annotate(
-                    cities=StringAgg('entityversionaddress__city', ';', distinct=True)
-                )
+def get_configuration_data(current_year):
+    """
+    Get the filter values of the portal for an academic year
+    """
+    continents = Continent.objects.prefetch_related(
+        Prefetch(
+            'country_set',
+            queryset=Country.objects.annotate(
+                cities=StringAgg('entityversionaddress__city', ';', distinct=True)
             )
         )
-        partners = (
-            Partner.objects
-            .having_partnerships()
+    )
+    partners = (
+        Partner.objects
+        .having_partnerships()
+        .distinct('pk')
+        .order_by('pk')
+        .values('uuid', 'organization__name')
+    )
+
+    # Get UCL entity parents which children have a partnership
+    ucl_universities = (
+        EntityProxy.objects
+        .ucl_entities_parents()
+        .with_title()
+        .with_acronym_path()
+        .distinct()
+        .order_by('acronym_path')
+    )
+
+    # label = 'title_fr' if get_language() == settings.LANGUAGE_CODE_FR else 'title_en'
+    # education_fields = (
+    #     DomainIsced.objects
+    #     .filter(partnershipyear__academic_year=current_year)
+    #     .distinct()
+    #     .values('uuid', label)
+    # )
+    education_levels = (
+        PartnershipYearEducationLevel.objects
+            .filter(partnerships_years__academic_year=current_year,
+                    partnerships_years__partnership__isnull=False)
             .distinct('pk')
             .order_by('pk')
-            .values('uuid', 'organization__name')
-        )
+            .values('code', 'label')
+    )
 
-        # Get UCL entity parents which children have a partnership
-        ucl_universities = (
-            EntityProxy.objects
-            .ucl_entities_parents()
-            .with_title()
-            .with_acronym_path()
-            .distinct()
-            .order_by('acronym_path')
-        )
+    label = 'title' if get_language() == settings.LANGUAGE_CODE_FR else 'title_english'
+    year_offers = EducationGroupYear.objects.filter(
+        partnerships__isnull=False,
+    ).values('uuid', 'acronym', label).distinct().order_by('acronym', label)
 
-        # label = 'title_fr' if get_language() == settings.LANGUAGE_CODE_FR else 'title_en'
-        # education_fields = (
-        #     DomainIsced.objects
-        #     .filter(partnershipyear__academic_year=current_year)
-        #     .distinct()
-        #     .values('uuid', label)
-        # )
-        education_levels = (
-            PartnershipYearEducationLevel.objects
-                .filter(partnerships_years__academic_year=current_year,
-                        partnerships_years__partnership__isnull=False)
-                .distinct('pk')
-                .order_by('pk')
-                .values('code', 'label')
-        )
+    view = FundingAutocompleteView()
+    view.q = ''
+    fundings = view.get_list()
 
-        label = 'title' if get_language() == settings.LANGUAGE_CODE_FR else 'title_english'
-        year_offers = EducationGroupYear.objects.filter(
-            partnerships__isnull=False,
-        ).values('uuid', 'acronym', label).distinct().order_by('acronym', label)
-
-        view = FundingAutocompleteView()
-        view.q = ''
-        fundings = view.get_list()
-
-        tags = (
-             PartnershipTag.objects
-             .filter(partnerships__isnull=False)
-             .values_list('value', flat=True)
-             .distinct('value')
-             .order_by('value')
-        )
-        partner_tags = (
-             PartnerTag.objects
-             .of_partners_having_partnerships()
-             .values_list('value', flat=True)
-             .distinct('value')
-             .order_by('value')
-        )
+    tags = (
+         PartnershipTag.objects
+         .filter(partnerships__isnull=False)
+         .values_list('value', flat=True)
+         .distinct('value')
+         .order_by('value')
+    )
+    partner_tags = (
+         PartnerTag.objects
+         .of_partners_having_partnerships()
+         .values_list('value', flat=True)
+         .distinct('value')
+         .order_by('value')
+    )
+
+    data = {
+        'continents': ContinentConfigurationSerializer(continents, many=True).data,
+        'partners': PartnerConfigurationSerializer(partners, many=True).data,
+        'ucl_universities': UCLUniversityConfigurationSerializer(ucl_universities, many=True).data,
+        # 'education_fields': EducationFieldConfigurationSerializer(education_fields, many=True).data,
+        'education_levels': EducationLevelSerializer(education_levels, many=True).data,
+        'fundings': list(fundings),
+        'partnership_types': PartnershipTypeSerializer(PartnershipType.all(), many=True).data,
+        'tags': list(tags),
+        'partner_tags': list(partner_tags),
+        'offers': OfferSerializer(year_offers, many=True).data,
+    }
+    return data
+
+
+def get_configuration_payload():
+    """
+    Get the configuration rendered as JSON for the current language and API
+    academic year, cached until the partnership data changes
 
-        data = {
-            'continents': ContinentConfigurationSerializer(continents, many=True).data,
-            'partners': PartnerConfigurationSerializer(partners, many=True).data,
-            'ucl_universities': UCLUniversityConfigurationSerializer(ucl_universities, many=True).data,
-            # 'education_fields': EducationFieldConfigurationSerializer(education_fields, many=True).data,
-            'education_levels': EducationLevelSerializer(education_levels, many=True).data,
-            'fundings': list(fundings),
-            'partnership_types': PartnershipTypeSerializer(PartnershipType.all(), many=True).data,
-            'tags': list(tags),
-            'partner_tags': list(partner_tags),
-            'offers': OfferSerializer(year_offers, many=True).data,
+    :return: dict with content (bytes), etag and last_modified (timestamp)
+    """
+    config = PartnershipConfiguration.get_configuration()
+    current_year = config.get_current_academic_year_for_api()
+    key = CONFIGURATION_CACHE_KEY.format(
+        version=get_data_version(PARTNERSHIP_DATA),
+        language=get_language(),
+        year=current_year.pk,
+    )
+    payload = cache.get(key)
+    if payload is None:
+        content = JSONRenderer().render(get_configuration_data(current_year))
+        payload = {
+            'content': content,
+            'etag': quote_etag(hashlib.md5(content).hexdigest()),
+            'last_modified': int(time.time()),
         }
-        return Response(data)
+        cache.set(key, payload, timeout=CONFIGURATION_CACHE_TIMEOUT)
+    return payload
+
+
+class ConfigurationView(APIView):
+
+    permission_classes = (AllowAny,)
+
+    @extend_schema(
+        responses=ConfigurationSerializer,
+    )
+    def get(self, request):
+        payload = get_configuration_payload()
+        response = get_conditional_response(
+            request,
+            etag=payload['etag'],
+            last_modified=payload['last_modified'],
+        )
+        if response is None:
+            response = HttpResponse(payload['content'], content_type='application/json')
+        response['ETag'] = payload['etag']
+        response['Last-Modified'] = http_date(payload['last_modified'])
+        return response
@@ -1,5 +1,7 @@
-from collections import defaultdict
+import json
 
+from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
@@ -7,123 +9,130 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExampl
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from osis_role.contrib.views import APIPermissionRequiredMixin
 from partnership.models import (
+    MAP_MAX_ZOOM,
     Partner,
+    PartnerLocation,
     PartnershipPartnerRelation,
     PartnershipConfiguration,
 )
 from ..filters import PartnershipPartnerRelationFilter, PartnerFilter
-from ..serializers import PartnerListSerializer
+from ..filters.partnership import parse_bbox
+from ..serializers import PartnerClusterSerializer, PartnerListSerializer
 from ..serializers.partner import InternshipPartnerSerializer, DeclareOrganizationAsInternshipPartnerSerializer
 
 
+# Parameters from PartnershipPartnerRelationFilter
+PARTNERSHIP_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        'continent',
+        OpenApiTypes.STR,
+        description='The continent name',
+    ),
+    OpenApiParameter(
+        'country',
+        OpenApiTypes.STR,
+        description='The country iso code',
+    ),
+    OpenApiParameter(
+        'city',
+        OpenApiTypes.STR,
+        description='The city name',
+    ),
+    OpenApiParameter(
+        'partner',
+        OpenApiTypes.UUID,
+        description='The uuid of the partner',
+    ),
+    OpenApiParameter(
+        'ucl_entity',
+        OpenApiTypes.UUID,
+        description='The uuid of the faculty or school',
+    ),
+    OpenApiParameter(
+        'with_children',
+        OpenApiTypes.BOOL,
+        description='If children of ucl_entity should be taken into account',
+    ),
+    OpenApiParameter(
+        'type',
+        OpenApiTypes.STR,
+        description='The type of partnership',
+        enum=[
+            'GENERAL',
+            'MOBILITY',
+            'COURSE',
+            'DOCTORATE',
+            'PROJECT',
+        ],
+    ),
+    OpenApiParameter(
+        'education_level',
+        OpenApiTypes.STR,
+        description='The education level code',
+    ),
+    OpenApiParameter(
+        'tag',
+        OpenApiTypes.STR,
+        description='The tag of the partnership',
+    ),
+    OpenApiParameter(
+        'partner_tag',
+        OpenApiTypes.STR,
+        description='The tag of the partner',
+    ),
+    OpenApiParameter(
+        'education_field',
+        OpenApiTypes.UUID,
+        description='The uuid of the education field',
+    ),
+    OpenApiParameter(
+        'offer',
+        OpenApiTypes.UUID,
+        description='The uuid of the offer',
+    ),
+    OpenApiParameter(
+        'mobility_type',
+        OpenApiTypes.STR,
+        description='The type of mobility, either for student or for staff',
+        enum=['student', 'staff',]
+    ),
+    OpenApiParameter(
+        'flow_direction',
+        OpenApiTypes.STR,
+        description='The source id of funding',
+        enum=['IN', 'IN_OUT', 'OUT', ]
+    ),
+    OpenApiParameter(
+        'funding_source',
+        OpenApiTypes.NUMBER,
+        description='The source id of funding',
+    ),
+    OpenApiParameter(
+        'funding_program',
+        OpenApiTypes.NUMBER,
+        description='The program id of funding',
+    ),
+    OpenApiParameter(
+        'funding_type',
+        OpenApiTypes.NUMBER,
+        description='The type id of funding',
+    ),
+    OpenApiParameter(
+        'bbox',
+        OpenApiTypes.STR,
+        description='The bounding box to export the partnerships',
+        examples=[OpenApiExample('bbox', '5.2,10.5,5.7,10.9')],
+    ),
+]
+
+
 @extend_schema_view(
     get=extend_schema(
-        parameters=[
-            # Parameters from PartnershipPartnerRelationFilter
-            OpenApiParameter(
-                'continent',
-                OpenApiTypes.STR,
-                description='The continent name',
-            ),
-            OpenApiParameter(
-                'country',
-                OpenApiTypes.STR,
-                description='The country iso code',
-            ),
-            OpenApiParameter(
-                'city',
-                OpenApiTypes.STR,
-                description='The city name',
-            ),
-            OpenApiParameter(
-                'partner',
-                OpenApiTypes.UUID,
-                description='The uuid of the partner',
-            ),
-            OpenApiParameter(
-                'ucl_entity',
-                OpenApiTypes.UUID,
-                description='The uuid of the faculty or school',
-            ),
-            OpenApiParameter(
-                'with_children',
-                OpenApiTypes.BOOL,
-                description='If children of ucl_entity should be taken into account',
-            ),
-            OpenApiParameter(
-                'type',
-                OpenApiTypes.STR,
-                description='The type of partnership',
-                enum=[
-                    'GENERAL',
-                    'MOBILITY',
-                    'COURSE',
-                    'DOCTORATE',
-                    'PROJECT',
-                ],
-            ),
-            OpenApiParameter(
-                'education_level',
-                OpenApiTypes.STR,
-                description='The education level code',
-            ),
-            OpenApiParameter(
-                'tag',
-                OpenApiTypes.STR,
-                description='The tag of the partnership',
-            ),
-            OpenApiParameter(
-                'partner_tag',
-                OpenApiTypes.STR,
-                description='The tag of the partner',
-            ),
-            OpenApiParameter(
-                'education_field',
-                OpenApiTypes.UUID,
-                description='The uuid of the education field',
-            ),
-            OpenApiParameter(
-                'offer',
-                OpenApiTypes.UUID,
-                description='The uuid of the offer',
-            ),
-            OpenApiParameter(
-                'mobility_type',
-                OpenApiTypes.STR,
-                description='The type of mobility, either for student or for staff',
-                enum=['student', 'staff',]
-            ),
-            OpenApiParameter(
-                'flow_direction',
-                OpenApiTypes.STR,
-                description='The source id of funding',
-                enum=['IN', 'IN_OUT', 'OUT', ]
-            ),
-            OpenApiParameter(
-                'funding_source',
-                OpenApiTypes.NUMBER,
-                description='The source id of funding',
-            ),
-            OpenApiParameter(
-                'funding_program',
-                OpenApiTypes.NUMBER,
-                description='The program id of funding',
-            ),
-            OpenApiParameter(
-                'funding_type',
-                OpenApiTypes.NUMBER,
-                description='The type id of funding',
-            ),
-            OpenApiParameter(
-                'bbox',
-                OpenApiTypes.STR,
-                description='The bounding box to export the partnerships',
-                examples=[OpenApiExample('bbox', '5.2,10.5,5.7,10.9')],
-            ),
-        ],
+        parameters=PARTNERSHIP_FILTER_PARAMETERS,
     ),
 )
 class PartnersApiListView(generics.ListAPIView):
@@ -132,7 +141,7 @@ class PartnersApiListView(generics.ListAPIView):
     filter_backends = [DjangoFilterBackend]
     filterset_class = PartnerFilter
     pagination_class = None
-    counts = None
+    chunk_size = 500
     address_fields_to_annotate = (
         'country__continent__name',
         'country__iso_code',
@@ -143,32 +152,26 @@ class PartnersApiListView(generics.ListAPIView):
 
     def get_partnerships_query(self, academic_year):
         # Partnership relations queryset for count
-        qs = PartnershipPartnerRelation.objects.annotate_partner_address(
-            *self.address_fields_to_annotate
-        ).filter_for_api(academic_year)
+        qs = PartnershipPartnerRelation.objects.from_api_snapshot(academic_year)
         partnerships_filter = PartnershipPartnerRelationFilter(
             data=self.request.query_params,
             queryset=qs,
             request=self.request,
         )
         partnerships_filter.is_valid()
-        return partnerships_filter.qs.distinct('pk').order_by('pk')
+        return partnerships_filter.qs.order_by()
 
-    def get_queryset(self):
+    def get_relations_query(self):
         academic_year = PartnershipConfiguration.get_configuration().get_current_academic_year_for_api()
-        qs = self.get_partnerships_query(academic_year)
-
-        # Because the partnership query is much faster than a linked subquery,
-        # We query the partner id with the normal filters, do a count and pass
-        # the count to the serializer, returning filtered partners on pk
-        self.counts = defaultdict(int)
-        for result in qs.values('entity__organization__partner'):
-            self.counts[result['entity__organization__partner']] += 1
+        return self.get_partnerships_query(academic_year).values('pk')
 
+    def get_queryset(self):
+        # Partners having filtered relations, counted in the same grouped query
         return (
-            Partner.objects.annotate_address(*self.address_fields_to_annotate)
-            .filter(pk__in=self.counts.keys())
-            .distinct()
+            Partner.objects
+            .filter(organization__entity__partner_of__in=self.get_relations_query())
+            .annotate(partnerships_count=Count('organization__entity__partner_of', distinct=True))
+            .annotate_address(*self.address_fields_to_annotate)
             .order_by('pk')
             .only(
                 'uuid',
@@ -176,10 +179,78 @@ class PartnersApiListView(generics.ListAPIView):
             )
         )
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['counts'] = self.counts
-        return context
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_json(queryset),
+            content_type='application/json',
+        )
+
+    def stream_json(self, queryset):
+        """Serialize partners as a JSON list, chunk by chunk"""
+        serializer = self.get_serializer()
+        yield '['
+        for i, partner in enumerate(queryset.iterator(chunk_size=self.chunk_size)):
+            yield (',' if i else '') + json.dumps(
+                serializer.to_representation(partner),
+                cls=JSONEncoder,
+            )
+        yield ']'
+
+
+@extend_schema_view(
+    get=extend_schema(
+        parameters=[
+            *PARTNERSHIP_FILTER_PARAMETERS,
+            OpenApiParameter(
+                'zoom',
+                OpenApiTypes.INT,
+                description='The zoom level of the map, from 0 to {}'.format(MAP_MAX_ZOOM),
+            ),
+        ],
+        responses=PartnerClusterSerializer(many=True),
+    ),
+)
+class PartnersClustersApiView(PartnersApiListView):
+    """
+    Partners having partnerships grouped by map tile of a zoom level
+    """
+    serializer_class = PartnerClusterSerializer
+
+    def get_queryset(self):
+        return Partner.objects.filter(
+            organization__entity__partner_of__in=self.get_relations_query(),
+        )
+
+    def get_zoom(self):
+        try:
+            zoom = int(self.request.query_params.get('zoom', 0))
+        except ValueError:
+            zoom = 0
+        return max(0, min(MAP_MAX_ZOOM, zoom))
+
+    def list(self, request, *args, **kwargs):
+        bbox = None
+        if request.query_params.get('bbox'):
+            bbox = parse_bbox(request.query_params['bbox'])
+            if bbox is None:
+                return Response(data={'error': 'Incorrect bbox format.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        partners = self.filter_queryset(self.get_queryset()).order_by()
+        locations = PartnerLocation.objects.filter(partner__in=partners.values('pk'))
+        if bbox is not None:
+            # Already filtered on relations, but the spatial index is here
+            locations = locations.filter(location__contained=bbox)
+
+        zoom = self.get_zoom()
+        clusters = list(locations.clusters(zoom))
+        uuids = dict(Partner.objects.filter(pk__in=[
+            cluster['partner_id'] for cluster in clusters if cluster['count'] == 1
+        ]).values_list('pk', 'uuid'))
+        for cluster in clusters:
+            cluster['zoom'] = zoom
+            cluster['partner'] = uuids.get(cluster['partner_id'])
+        return Response(self.get_serializer(clusters, many=True).data)
 
 
 @extend_schema_view(
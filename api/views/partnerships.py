@@ -1,28 +1,28 @@
+from copy import copy
+
 from django.contrib.postgres.aggregates import StringAgg
 from django.db import models
-from django.db.models.expressions import (
-    F, OuterRef, Subquery, Value,
-)
-from django.db.models.functions import Concat, Now, Right, Cast
+from django.db.models.expressions import F, Value
+from django.db.models.functions import Concat
 from django.db.models.query import Prefetch
 from django.http import JsonResponse
-from django.urls import reverse
+from django.urls import get_script_prefix, reverse
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _, pgettext_lazy
 from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters.views import FilterMixin
-from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter, OpenApiResponse
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
-from base.models.academic_year import AcademicYear
 from osis_common.document.xls_build import CONTENT_TYPE_XLS
+from partnership.financings import get_financing_lookup
 from partnership.models import (
     EntityProxy,
     AgreementStatus,
-    Financing,
     Media,
     Partner,
     Partnership,
@@ -31,8 +31,16 @@ from partnership.models import (
     PartnershipYear,
     PartnershipPartnerRelation,
 )
+from partnership.loaders import PartnershipExportLoader, iterate_in_chunks
+from partnership.pagination import (
+    COUNT_QUERY_PARAM,
+    CURSOR_QUERY_PARAM,
+    CountingLimitOffsetPagination,
+    KeysetPaginationAPIMixin,
+)
 from ..filters import PartnershipPartnerRelationFilter
 from ..serializers import PartnershipPartnerRelationSerializer
+from ...exports import enqueue_export
 from ...views import ExportView
 
 __all__ = [
@@ -57,36 +65,17 @@ class PartnershipsApiViewMixin:
         config = PartnershipConfiguration.get_configuration()
         academic_year = config.get_current_academic_year_for_api()
         self.academic_year = academic_year
-        academic_year_repr = Concat(
-            Cast(F('academic_year__year'), models.CharField()),
-            Value('-'),
-            Right(
-                Cast(
-                    F('academic_year__year') + 1,
-                    output_field=models.CharField()
-                ),
-                2
-            ),
-        )
 
         return (
             PartnershipPartnerRelation.objects
-            .filter_for_api(academic_year)
-            .annotate_partner_address(
-                'country__continent__name',
-                'country__iso_code',
-                'country__name',
-                'country_id',
-                'city',
-                'location',
-            )
+            .from_api_snapshot(academic_year)
             .select_related(
                 'entity__partnerentity',
                 'entity__organization',
             ).prefetch_related(
                 Prefetch(
                     'partnership',
-                    queryset=Partnership.objects.add_acronyms().select_related(
+                    queryset=Partnership.objects.add_acronyms().annotate_display().select_related(
                         'subtype',
                         'supervisor',
                     ).prefetch_related(
@@ -178,63 +167,37 @@ class PartnershipsApiViewMixin:
                 ),
             )
             .annotate(
-                validity_end_year=Subquery(
-                    AcademicYear.objects
-                    .filter(
-                        partnership_agreements_end__partnership=OuterRef('partnership_id'),
-                        partnership_agreements_end__status=AgreementStatus.VALIDATED.name
-                    )
-                    .order_by('-end_date')
-                    .values('year')[:1]
-                ),
-                start_year=Subquery(
-                    PartnershipYear.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                    ).annotate(
-                        name=academic_year_repr
-                    ).order_by('academic_year').values('name')[:1]
-                ),
-                end_year=Subquery(
-                    PartnershipYear.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                    ).annotate(
-                        name=academic_year_repr
-                    ).order_by('-academic_year').values('name')[:1]
-                ),
-                agreement_end=Subquery(
-                    PartnershipAgreement.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                        start_date__lte=Now(),
-                        end_date__gte=Now(),
-                    ).order_by('-end_date').values('end_date')[:1]
-                ),
-            ).annotate(
                 validity_years=Concat(
                     Value(academic_year.year),
                     Value('-'),
                     F('validity_end_year') + 1,
                     output_field=models.CharField()
                 ),
-                funding_name=Subquery(
-                    Financing.objects.filter(
-                        academic_year=academic_year,
-                        countries=OuterRef('country_id'),
-                    ).values('type__name')[:1]
-                ),
-                funding_url=Subquery(
-                    Financing.objects.filter(
-                        academic_year=academic_year,
-                        countries=OuterRef('country_id'),
-                    ).values('type__url')[:1]
-                ),
             )
             .distinct('pk')
             .order_by('pk')
         )
 
 
-class PartnershipsApiListView(PartnershipsApiViewMixin, generics.ListAPIView):
+@extend_schema_view(
+    get=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                CURSOR_QUERY_PARAM,
+                OpenApiTypes.STR,
+                description='Paginate with cursors instead of page numbers, empty for the first page',
+            ),
+            OpenApiParameter(
+                COUNT_QUERY_PARAM,
+                OpenApiTypes.BOOL,
+                description='Include the total count when paginating with cursors',
+            ),
+        ],
+    ),
+)
+class PartnershipsApiListView(KeysetPaginationAPIMixin, PartnershipsApiViewMixin, generics.ListAPIView):
     filter_backends = [DjangoFilterBackend]
+    pagination_class = CountingLimitOffsetPagination
     filterset_class = PartnershipPartnerRelationFilter
 
 
@@ -246,11 +209,17 @@ class PartnershipsApiRetrieveView(PartnershipsApiViewMixin, generics.RetrieveAPI
 def partnership_get_export_url(request):  # pragma: no cover
     # TODO: Fix when authentication is done in ESB (use already X-Forwarded-Host) / Shibb
     url = reverse('partnership_api_v1:export')
+    export_request = copy(request)
+    export_request.path = url
+    # Resolved by the export worker, without the prefix of the deployment
+    script_prefix = get_script_prefix().rstrip('/')
+    export_request.path_info = url[len(script_prefix):] if url.startswith(script_prefix) else url
+    job = enqueue_export(export_request)
     return JsonResponse({
         'url': '{scheme}://{host}{path}'.format(
             scheme=request.scheme,
             host=request.headers["host"],
-            path=url + '?' + request.GET.urlencode()
+            path=job.get_download_url(),
         ),
     })
 
@@ -312,33 +281,27 @@ class PartnershipsApiExportView(FilterMixin, PartnershipsApiViewMixin, ExportVie
 
         queryset = (
             queryset
-            .annotate_financing(self.academic_year)
             .annotate(tags_list=StringAgg('partnership__tags__value', ', '))
-            .prefetch_related(
-                Prefetch(
-                    'partnership__years',
-                    queryset=PartnershipYear.objects.select_related('academic_year'),
-                ),
-                Prefetch(
-                    'partnership__years',
-                    queryset=PartnershipYear.objects.select_related('academic_year').reverse(),
-                    to_attr='reverse_years',
-                ),
-                'entity__entityversion_set',
-            )
         )
-        for rel in queryset.distinct():
+        rows = iterate_in_chunks(
+            queryset.distinct(),
+            PartnershipExportLoader,
+            self.chunk_size,
+        )
+        financing = get_financing_lookup()
+        for rel, loader in rows:
             partnership = rel.partnership
+            funding = financing.get(rel.country_id, self.academic_year.pk)
             year = (partnership.current_year_for_api[0]
                     if partnership.current_year_for_api else '')
             last_agreement = (partnership.valid_current_agreements[0]
                               if partnership.valid_current_agreements else None)
 
             # Replace funding values if financing is eligible for mobility and not overridden in year
-            if partnership.is_mobility and year and year.eligible and rel.financing_source and not year.funding_source:
-                funding_source = rel.financing_source
-                funding_program = rel.financing_program
-                funding_type = rel.financing_type
+            if partnership.is_mobility and year and year.eligible and funding and not year.funding_source:
+                funding_source = funding.source
+                funding_program = funding.program
+                funding_type = funding.type
             else:
                 funding_source = year and year.funding_source
                 funding_program = year and year.funding_program
@@ -347,6 +310,7 @@ class PartnershipsApiExportView(FilterMixin, PartnershipsApiViewMixin, ExportVie
             parts = partnership.acronym_path[1:] if partnership.acronym_path else []
 
             organization = rel.entity.organization
+            erasmus_code, pic_code = loader.get_partner_codes(organization)
             yield [
                 partnership.pk,
                 partnership.get_partnership_type_display(),
@@ -358,8 +322,8 @@ class PartnershipsApiExportView(FilterMixin, PartnershipsApiViewMixin, ExportVie
                 str(rel.country_name),
                 str(organization.name),
                 str(organization.code or ''),
-                str(organization.partner_prefetched.erasmus_code or ''),
-                str(organization.partner_prefetched.pic_code or ''),
+                str(erasmus_code or ''),
+                str(pic_code or ''),
 
                 hasattr(rel.entity, 'partnerentity')
                 and rel.entity.partnerentity.name or '',
@@ -373,10 +337,10 @@ class PartnershipsApiExportView(FilterMixin, PartnershipsApiViewMixin, ExportVie
                 partnership.created.strftime('%Y-%m-%d'),
                 partnership.modified.strftime('%Y-%m-%d'),
 
-                str(partnership.years.first().academic_year)
+                str(loader.get_first_year(partnership) or '')
                 if partnership.is_mobility else partnership.start_date,
 
-                str(partnership.reverse_years[0].academic_year)
+                str(loader.get_last_year(partnership) or '')
                 if partnership.is_mobility else partnership.end_date,
 
                 getattr(
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class PartnershipConfig(AppConfig):
     name = 'partnership'
+
+    def ready(self):
+        # Connect the receivers keeping precomputed tables up to date
+        from . import signals  # noqa: F401
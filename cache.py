@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'partnership_data_version_{}'
+
+# Data set changing with any model of the app
+PARTNERSHIP_DATA = 'partnership'
+
+
+def get_data_version(name):
+    """
+    Get the current version of a data set, used to build cache keys
+
+    :param name: name of the data set, e.g. 'entity_tree'
+    """
+    key = DATA_VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        # Start from a timestamp so that a lost key never reuses a version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    if version is None:  # pragma: no cover
+        # Cache disabled, every version is a new one
+        return time.time_ns()
+    return version
+
+
+def bump_data_version(name):
+    """
+    Invalidate every cached value of a data set
+
+    :param name: name of the data set, e.g. 'entity_tree'
+    """
+    key = DATA_VERSION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import date
+
+from django.core.cache import cache
+
+from base.models.entity import Entity
+from base.models.entity_version import EntityVersion
+from partnership.cache import get_data_version
+from partnership.models.entity_path import UCL_ENTITIES_Q
+
+ENTITY_TREE_DATA = 'entity_tree'
+ENTITY_TREE_CACHE_KEY = 'partnership_entity_tree_{version}_{date}'
+
+_local_tree = {}
+
+
+class EntityTree:
+    """
+    Current hierarchy of UCL entities, to avoid recursive queries
+    """
+
+    def __init__(self, nodes):
+        """
+        :param nodes: list of (entity_id, uuid, parent_id, entity_type, acronym)
+        """
+        self.parents = {}
+        self.types = {}
+        self.acronyms = {}
+        self.ids_by_uuid = {}
+        self.children = defaultdict(set)
+        for entity_id, uuid, parent_id, entity_type, acronym in nodes:
+            self.parents[entity_id] = parent_id
+            self.types[entity_id] = entity_type
+            self.acronyms[entity_id] = acronym
+            self.ids_by_uuid[str(uuid)] = entity_id
+            if parent_id is not None:
+                self.children[parent_id].add(entity_id)
+
+    @classmethod
+    def build(cls, at_date=None):
+        nodes = (
+            EntityVersion.objects
+            .current(at_date or date.today())
+            .filter(entity__in=Entity.objects.filter(UCL_ENTITIES_Q))
+            .order_by('entity_id', '-start_date')
+            .distinct('entity_id')
+            .values_list('entity_id', 'entity__uuid', 'parent_id', 'entity_type', 'acronym')
+        )
+        return cls(list(nodes))
+
+    def get_id(self, uuid):
+        return self.ids_by_uuid.get(str(uuid))
+
+    def descendants(self, entity_id, include_self=True):
+        """Ids of all the children of an entity, recursively"""
+        entity_id = int(entity_id)
+        found = {entity_id} if include_self else set()
+        to_visit = [entity_id]
+        while to_visit:
+            for child_id in self.children.get(to_visit.pop(), ()):
+                if child_id not in found:
+                    found.add(child_id)
+                    to_visit.append(child_id)
+        return found
+
+    def ancestors(self, entity_id, include_self=True):
+        """Ids of the parents of an entity, from the closest one"""
+        entity_id = int(entity_id)
+        found = [entity_id] if include_self else []
+        parent_id = self.parents.get(entity_id)
+        while parent_id is not None and parent_id not in found:
+            found.append(parent_id)
+            parent_id = self.parents.get(parent_id)
+        return found
+
+    def ancestor_of_type(self, entity_id, entity_type):
+        """Closest parent of an entity (or itself) having a type, or None"""
+        for ancestor_id in self.ancestors(entity_id):
+            if self.types.get(ancestor_id) == entity_type:
+                return ancestor_id
+        return None
+
+
+def get_entity_tree():
+    """
+    Get the current UCL entity tree, kept in the process and shared through
+    the Django cache until the entity data version changes
+    """
+    key = ENTITY_TREE_CACHE_KEY.format(
+        version=get_data_version(ENTITY_TREE_DATA),
+        date=date.today().isoformat(),
+    )
+    tree = _local_tree.get(key)
+    if tree is None:
+        tree = cache.get(key)
+        if tree is None:
+            tree = EntityTree.build()
+            cache.set(key, tree, timeout=24 * 60 * 60)
+        # Only keep the latest tree in the process
+        _local_tree.clear()
+        _local_tree[key] = tree
+    return tree
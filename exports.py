@@ -0,0 +1,80 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve
+from django.utils import timezone, translation
+
+from partnership.models import ExportJob, ExportJobStatus
+
+logger = logging.getLogger(settings.DEFAULT_LOGGER)
+
+EXPORT_WORKERS = 2
+
+_executor = ThreadPoolExecutor(
+    max_workers=EXPORT_WORKERS,
+    thread_name_prefix='partnership-export',
+)
+
+
+def enqueue_export(request):
+    """
+    Get the export job for this request, scheduling it in the background
+    when no identical export exists
+
+    :return: the ExportJob
+    """
+    job, created = ExportJob.objects.for_request(request)
+    if created:
+        # The worker uses its own connection, the job must be committed
+        transaction.on_commit(lambda: _executor.submit(_run_in_worker, job.pk))
+    return job
+
+
+def _run_in_worker(job_pk):
+    try:
+        run_export_job(job_pk)
+    finally:
+        close_old_connections()
+
+
+def run_export_job(job_pk):
+    """
+    Build the file of an export job, by replaying the original request
+    """
+    job = ExportJob.objects.get(pk=job_pk)
+    job.status = ExportJobStatus.RUNNING.name
+    job.save(update_fields=['status'])
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = job.path
+    request.GET = QueryDict(mutable=True)
+    for key, values in job.params.items():
+        request.GET.setlist(key, values)
+    request.META['SERVER_NAME'] = 'localhost'
+    request.META['SERVER_PORT'] = '80'
+    request.user = job.user or AnonymousUser()
+
+    try:
+        match = resolve(request.path_info)
+        with translation.override(job.language):
+            response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200 or not hasattr(response, 'file_to_stream'):
+            raise ValueError("Export responded with status {}".format(response.status_code))
+        try:
+            job.file.save(response.filename, File(response.file_to_stream), save=False)
+        finally:
+            response.close()
+        job.status = ExportJobStatus.DONE.name
+    except Exception as e:
+        logger.exception("Export job %s failed", job.uuid)
+        job.status = ExportJobStatus.FAILED.name
+        job.error = str(e)
+    job.finished = timezone.now()
+    job.save()
+    return job
@@ -1,19 +1,17 @@
 import django_filters as filters
-from django.db.models import Exists, Max, OuterRef, Q, Prefetch, Subquery
+from django.db.models import F, Q, Prefetch
 from django.utils.translation import gettext_lazy as _
 
-from base.models.entity_version import EntityVersion
-from base.utils.cte import CTESubquery
+from partnership.entity_tree import get_entity_tree
 from partnership.forms import (
     PartnerFilterForm, PartnershipFilterForm,
     CustomNullBooleanSelect,
 )
 from partnership.models import (
-    AgreementStatus,
     Partner,
     PartnershipAgreement,
-    PartnershipYear,
     PartnershipPartnerRelation,
+    PartnershipYearCoverage,
     Partnership, PartnershipType,
 )
 from partnership.models.enums.filter import DateFilterType
@@ -35,10 +33,7 @@ class PartnerAdminFilter(filters.FilterSet):
             ('is_actif', 'is_actif'),
         )
     )
-    name = filters.CharFilter(
-        field_name='organization__name',
-        lookup_expr='icontains',
-    )
+    name = filters.CharFilter(method='filter_name')
     partner_type = filters.CharFilter(field_name='organization__type')
     pic_code = filters.CharFilter(lookup_expr='icontains')
     erasmus_code = filters.CharFilter(lookup_expr='icontains')
@@ -77,6 +72,10 @@ class PartnerAdminFilter(filters.FilterSet):
     def get_form_class(self):
         return PartnerFilterForm
 
+    @staticmethod
+    def filter_name(queryset, name, value):
+        return queryset.search(value)
+
     @staticmethod
     def filter_is_actif(queryset, name, value):
         return queryset.annotate_dates(filter_value=value)
@@ -325,9 +324,9 @@ class PartnershipAdminFilter(filters.FilterSet):
         if value:
             if self.form.cleaned_data.get('ucl_entity_with_child', False):
                 # Allow all children of entity too
-                cte = EntityVersion.objects.with_parents(entity_id=value.pk)
-                qs = cte.queryset().with_cte(cte).values('entity_id')
-                queryset = queryset.filter(partnership__ucl_entity__in=qs)
+                queryset = queryset.filter(
+                    partnership__ucl_entity__in=get_entity_tree().descendants(value.pk),
+                )
             else:
                 queryset = queryset.filter(partnership__ucl_entity=value)
 
@@ -363,27 +362,19 @@ class PartnershipAdminFilter(filters.FilterSet):
     def filter_partnership_in(queryset, name, value):
         if value:
             queryset = queryset.filter(
-                Exists(
-                    PartnershipAgreement.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                        start_academic_year__start_date__lte=value.start_date,
-                        end_academic_year__end_date__gte=value.end_date,
-                    )
-                )
+                partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                    value, has_agreement=True,
+                ),
             )
         return queryset
 
     @staticmethod
     def filter_partnership_ending_in(queryset, name, value):
         if value:
-            queryset = (
-                queryset.alias(
-                    ending_date=Subquery(
-                        Partnership.objects.filter(pk=OuterRef('partnership__pk')).annotate(
-                            ending_date=Max('agreements__end_academic_year__end_date'),
-                        ).values('ending_date')[:1]
-                    ),
-                ).filter(ending_date=value.end_date)
+            queryset = queryset.filter(
+                partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                    value, is_last_agreement_year=True,
+                ),
             )
         return queryset
 
@@ -391,12 +382,9 @@ class PartnershipAdminFilter(filters.FilterSet):
     def filter_partnership_valid_in(queryset, name, value):
         if value:
             queryset = queryset.filter(
-                Exists(PartnershipAgreement.objects.filter(
-                    partnership=OuterRef('partnership_id'),
-                    status=AgreementStatus.VALIDATED.name,
-                    start_academic_year__start_date__lte=value.start_date,
-                    end_academic_year__end_date__gte=value.end_date,
-                ))
+                partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                    value, has_validated_agreement=True,
+                ),
             )
         return queryset
 
@@ -404,26 +392,9 @@ class PartnershipAdminFilter(filters.FilterSet):
     def filter_partnership_not_valid_in(queryset, name, value):
         if value:
             queryset = queryset.filter(
-                # not_valid_in_has_agreements
-                Exists(
-                    PartnershipAgreement.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                    ).filter(
-                        start_academic_year__start_date__lte=value.start_date,
-                        end_academic_year__end_date__gte=value.end_date,
-                    ),
+                partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                    value, has_agreement=True, has_validated_agreement=False,
                 ),
-            ).exclude(
-                # not_valid_in_has_valid_agreements
-                Exists(
-                    PartnershipAgreement.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                    ).filter(
-                        status=AgreementStatus.VALIDATED.name,
-                        start_academic_year__start_date__lte=value.start_date,
-                        end_academic_year__end_date__gte=value.end_date,
-                    ),
-                )
             )
         return queryset
 
@@ -431,21 +402,8 @@ class PartnershipAdminFilter(filters.FilterSet):
     def filter_partnership_with_no_agreements_in(queryset, name, value):
         if value:
             queryset = queryset.filter(
-                # no_agreements_in_has_years
-                Exists(
-                    PartnershipYear.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                        academic_year=value,
-                    )
-                ),
-            ).exclude(
-                # no_agreements_in_has_agreements
-                Exists(
-                    PartnershipAgreement.objects.filter(
-                        partnership=OuterRef('partnership_id'),
-                        start_academic_year__start_date__lte=value.start_date,
-                        end_academic_year__end_date__gte=value.end_date,
-                    )
+                partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                    value, has_year=True, has_agreement=False,
                 ),
             )
         return queryset
@@ -513,16 +471,8 @@ class PartnershipAgreementAdminFilter(PartnershipAdminFilter):
             # TODO remove when Entity city field is dropped (conflict)
             .defer("partnership__ucl_entity__city")
             .annotate(
-                acronym_path=CTESubquery(
-                    EntityVersion.objects.with_acronym_path(
-                        entity_id=OuterRef('partnership__ucl_entity_id')
-                    ).values('acronym_path')[:1]
-                ),
-                title_path=CTESubquery(
-                    EntityVersion.objects.with_acronym_path(
-                        entity_id=OuterRef('partnership__ucl_entity_id')
-                    ).values('title_path')[:1]
-                ),
+                acronym_path=F('partnership__ucl_entity__entity_path__acronym_path'),
+                title_path=F('partnership__ucl_entity__entity_path__title_path'),
             ).filter(
                 partnership__in=super().qs.values('partnership_id')
             ).select_related(
@@ -531,7 +481,7 @@ class PartnershipAgreementAdminFilter(PartnershipAdminFilter):
             ).prefetch_related(
                 Prefetch(
                     'partnership',
-                    queryset=Partnership.objects.select_related(
+                    queryset=Partnership.objects.annotate_display().select_related(
                         'supervisor',
                         'ucl_entity__uclmanagement_entity__academic_responsible',
                     ),
@@ -0,0 +1,324 @@
+from collections import defaultdict, namedtuple
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, Q, Value, When
+from django.utils.translation import gettext as _
+
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version, get_data_version
+from partnership.models import Financing, FundingType
+from reference.models.country import Country
+
+FinancingCountry = Financing.countries.through
+
+# Data set changing with financings and funding types
+FINANCING_DATA = 'financing'
+FINANCING_LOOKUP_CACHE_KEY = 'partnership_financing_lookup_{version}'
+
+Funding = namedtuple('Funding', [
+    'type_id', 'type', 'url', 'program_id', 'program', 'source_id', 'source',
+])
+
+_local_lookup = {}
+
+
+class FinancingLookup:
+    """
+    Funding of each country for each academic year, to avoid a subquery per
+    partnership
+    """
+
+    def __init__(self, fundings):
+        """
+        :param fundings: dict of Funding by (country_id, academic_year_id)
+        """
+        self.fundings = fundings
+
+    @classmethod
+    def build(cls):
+        rows = FinancingCountry.objects.order_by('financing_id').values_list(
+            'country_id',
+            'financing__academic_year_id',
+            'financing__type_id',
+            'financing__type__name',
+            'financing__type__url',
+            'financing__type__program_id',
+            'financing__type__program__name',
+            'financing__type__program__source_id',
+            'financing__type__program__source__name',
+        )
+        fundings = {}
+        for country_id, academic_year_id, *funding in rows:
+            # Keep the first financing if a country has several
+            fundings.setdefault((country_id, academic_year_id), Funding(*funding))
+        return cls(fundings)
+
+    def get(self, country_id, academic_year_id):
+        """
+        :return: Funding or None
+        """
+        return self.fundings.get((country_id, academic_year_id))
+
+    def country_ids(self, academic_year_id, **values):
+        """
+        Countries financed for an academic year by a funding
+
+        :param values: Funding fields to match, e.g. type_id=1
+        """
+        return [
+            country_id
+            for (country_id, year_id), funding in self.fundings.items()
+            if year_id == academic_year_id and all(
+                getattr(funding, field) == value for field, value in values.items()
+            )
+        ]
+
+    def case(self, academic_year_id, field, country_field='country_id'):
+        """
+        Expression giving a Funding field for the country of each row, e.g.
+        to sort on it
+
+        :param country_field: path to the country id of the rows
+        """
+        country_ids = defaultdict(list)
+        for (country_id, year_id), funding in self.fundings.items():
+            if year_id == academic_year_id:
+                country_ids[getattr(funding, field)].append(country_id)
+        return Case(
+            *[
+                When(**{'{}__in'.format(country_field): ids}, then=Value(value))
+                for value, ids in country_ids.items()
+            ],
+            default=Value(None),
+            output_field=models.CharField(),
+        )
+
+
+def get_financing_lookup():
+    """
+    Get the funding of countries, kept in the process and shared through the
+    Django cache until the financing data version changes
+    """
+    key = FINANCING_LOOKUP_CACHE_KEY.format(
+        version=get_data_version(FINANCING_DATA),
+    )
+    lookup = _local_lookup.get(key)
+    if lookup is None:
+        lookup = cache.get(key)
+        if lookup is None:
+            lookup = FinancingLookup.build()
+            cache.set(key, lookup, timeout=24 * 60 * 60)
+        # Only keep the latest lookup in the process
+        _local_lookup.clear()
+        _local_lookup[key] = lookup
+    return lookup
+
+
+class FinancingDiff:
+    """
+    Changes an import brings to the financings of an academic year, by
+    funding type name
+    """
+
+    def __init__(self):
+        # Funding types
+        self.created_types = []
+        self.updated_types = {}  # name: list of changed fields
+
+        # Financings of the year
+        self.created = []
+        self.deleted = []
+
+        # Countries of the financings, as sets of ISO codes
+        self.added_countries = {}
+        self.removed_countries = {}
+
+    @property
+    def has_changes(self):
+        return any([
+            self.created_types,
+            self.updated_types,
+            self.created,
+            self.deleted,
+            self.added_countries,
+            self.removed_countries,
+        ])
+
+    def get_report(self):
+        """
+        :return: list of (funding type name, list of changes) sorted by name
+        """
+        changes = {}
+        for name in self.created_types:
+            changes.setdefault(name, []).append(_('funding_type_created'))
+        for name, fields in self.updated_types.items():
+            changes.setdefault(name, []).append(
+                _('funding_type_changed_{fields}').format(fields=', '.join(fields))
+            )
+        for name in self.created:
+            changes.setdefault(name, []).append(_('financing_created'))
+        for name in self.deleted:
+            changes.setdefault(name, []).append(_('financing_deleted'))
+        for name, codes in self.added_countries.items():
+            changes.setdefault(name, []).append('+ {}'.format(', '.join(sorted(codes))))
+        for name, codes in self.removed_countries.items():
+            changes.setdefault(name, []).append('- {}'.format(', '.join(sorted(codes))))
+        return sorted(changes.items())
+
+
+class FinancingImporter:
+    """
+    Replace the financings of an academic year by the imported ones, only
+    writing the differences with the existing data
+
+    :param data: dict by funding type name of dicts with url, program and
+        countries (list of Country)
+    """
+
+    def __init__(self, academic_year, data):
+        self.academic_year = academic_year
+        self.data = data
+
+        # Funding types by name, the oldest one being used if duplicated
+        self.types = {}
+        for funding_type in FundingType.objects.filter(
+            name__in=list(data),
+        ).order_by('-pk'):
+            self.types[funding_type.name] = funding_type
+
+        # Existing financings of the year and their countries
+        self.financings = {
+            financing.type_id: financing
+            for financing in Financing.objects.filter(academic_year=academic_year)
+        }
+        self.countries = {}
+        for financing_id, country_id in FinancingCountry.objects.filter(
+            financing__academic_year=academic_year,
+        ).values_list('financing_id', 'country_id'):
+            self.countries.setdefault(financing_id, set()).add(country_id)
+
+    def get_diff(self):
+        diff = FinancingDiff()
+        imported_type_ids = set()
+        for name, obj in self.data.items():
+            funding_type = self.types.get(name)
+            if funding_type is None:
+                diff.created_types.append(name)
+                diff.created.append(name)
+                diff.added_countries[name] = {c.iso_code for c in obj['countries']}
+                continue
+            imported_type_ids.add(funding_type.pk)
+
+            fields = []
+            if funding_type.url != obj['url']:
+                fields.append('url')
+            if funding_type.program_id != obj['program'].pk:
+                fields.append('program')
+            if fields:
+                diff.updated_types[name] = fields
+
+            financing = self.financings.get(funding_type.pk)
+            if financing is None:
+                diff.created.append(name)
+            existing = self.countries.get(financing and financing.pk, set())
+            imported = {c.pk: c.iso_code for c in obj['countries']}
+            added = {imported[pk] for pk in set(imported) - existing}
+            if added:
+                diff.added_countries[name] = added
+            removed = existing - set(imported)
+            if removed:
+                diff.removed_countries[name] = removed
+
+        for type_id, financing in self.financings.items():
+            if type_id not in imported_type_ids:
+                diff.deleted.append(financing.type.name)
+        self._add_removed_iso_codes(diff)
+        return diff
+
+    @staticmethod
+    def _add_removed_iso_codes(diff):
+        country_ids = set().union(*diff.removed_countries.values())
+        iso_codes = dict(Country.objects.filter(
+            pk__in=country_ids,
+        ).values_list('pk', 'iso_code'))
+        for name, removed in diff.removed_countries.items():
+            diff.removed_countries[name] = {iso_codes[pk] for pk in removed}
+
+    @transaction.atomic
+    def apply(self):
+        """
+        Write the differences with the imported data
+
+        :return: the FinancingDiff applied
+        """
+        from partnership.signals import (
+            partnerships_of_countries,
+            refresh_api_snapshot,
+        )
+
+        diff = self.get_diff()
+        if not diff.has_changes:
+            return diff
+
+        # Funding types
+        new_types = FundingType.objects.bulk_create([
+            FundingType(
+                name=name,
+                url=self.data[name]['url'],
+                program=self.data[name]['program'],
+            ) for name in diff.created_types
+        ])
+        self.types.update({funding_type.name: funding_type for funding_type in new_types})
+        updated_types = []
+        for name in diff.updated_types:
+            funding_type = self.types[name]
+            funding_type.url = self.data[name]['url']
+            funding_type.program = self.data[name]['program']
+            updated_types.append(funding_type)
+        FundingType.objects.bulk_update(updated_types, ['url', 'program'])
+
+        # Financings
+        imported_type_ids = {self.types[name].pk for name in self.data}
+        deleted = [
+            financing for type_id, financing in self.financings.items()
+            if type_id not in imported_type_ids
+        ]
+        deleted_country_ids = set().union(*(
+            self.countries.get(financing.pk, set()) for financing in deleted
+        ))
+        Financing.objects.filter(pk__in=[financing.pk for financing in deleted]).delete()
+        new_financings = Financing.objects.bulk_create([
+            Financing(academic_year=self.academic_year, type=self.types[name])
+            for name in diff.created
+        ])
+        self.financings.update({financing.type_id: financing for financing in new_financings})
+
+        # Countries of the financings
+        added_rows = []
+        removed = Q(pk__in=[])
+        changed_country_ids = set(deleted_country_ids)
+        for name, obj in self.data.items():
+            financing = self.financings[self.types[name].pk]
+            existing = self.countries.get(financing.pk, set())
+            imported = {country.pk for country in obj['countries']}
+            added_rows.extend(
+                FinancingCountry(financing_id=financing.pk, country_id=country_id)
+                for country_id in imported - existing
+            )
+            if existing - imported:
+                removed |= Q(financing_id=financing.pk, country_id__in=existing - imported)
+            changed_country_ids |= imported ^ existing
+        FinancingCountry.objects.filter(removed).delete()
+        FinancingCountry.objects.bulk_create(added_rows)
+
+        # The funding shown for the countries of the updated types changed,
+        # in every academic year as for funding_type_changed()
+        changed_country_ids.update(FinancingCountry.objects.filter(
+            financing__type__in=updated_types,
+        ).values_list('country_id', flat=True))
+
+        # Bulk statements do not send the signals refreshing the derived data
+        bump_data_version(FINANCING_DATA)
+        refresh_api_snapshot(partnerships_of_countries(changed_country_ids))
+        bump_data_version(PARTNERSHIP_DATA)
+        return diff
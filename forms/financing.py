@@ -32,6 +32,10 @@ class FinancingImportForm(forms.Form):
         empty_label=_('academic_years'),
         required=True,
     )
+    dry_run = forms.BooleanField(
+        label=_('financing_import_dry_run'),
+        required=False,
+    )
 
     def clean_csv_file(self):
         csv_file = self.cleaned_data['csv_file']
@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from partnership.models import GeocodedAddress
+from partnership.utils import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+# Default number of concurrent requests to the geocoding service
+GEOCODING_WORKERS = 4
+
+# Default maximum number of requests per second to the geocoding service
+GEOCODING_RATE_LIMIT = 10
+
+# Retries of a request failing because of the network or an unavailable service
+GEOCODING_RETRIES = 3
+
+GeocodingResult = namedtuple('GeocodingResult', ['location', 'count'])
+
+
+def format_address(*parts):
+    """
+    Address string sent to the geocoding service
+    """
+    return ' '.join(str(part) for part in parts if part)
+
+
+def normalize_address(*parts):
+    """
+    Address string used as cache key, identical for addresses only differing
+    by case, accents or spaces
+    """
+    return normalize_search_text(format_address(*parts))
+
+
+def get_address_search(*parts):
+    """
+    :return: a tuple (cache key, address sent to the service), as expected by
+        Geocoder.geocode()
+    """
+    return normalize_address(*parts), format_address(*parts)
+
+
+class RateLimiter:
+    """
+    Space out the calls shared by several threads to a maximum rate
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_call = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Geocoder:
+    """
+    Geocode addresses with the ESB service, concurrently and through a
+    persistent cache
+    """
+
+    def __init__(self, workers=None, rate_limit=None):
+        self.workers = workers or getattr(
+            settings, 'PARTNERSHIP_GEOCODING_WORKERS', GEOCODING_WORKERS,
+        )
+        self.rate_limiter = RateLimiter(rate_limit or getattr(
+            settings, 'PARTNERSHIP_GEOCODING_RATE_LIMIT', GEOCODING_RATE_LIMIT,
+        ))
+        self.url = "{esb_api}/{endpoint}".format(
+            esb_api=settings.ESB_API_URL,
+            endpoint=settings.ESB_GEOCODING_ENDPOINT,
+        )
+        self.session = self.get_session()
+
+    def get_session(self):
+        retry = Retry(
+            total=GEOCODING_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=self.workers,
+            pool_maxsize=self.workers,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Authorization'] = settings.ESB_AUTHORIZATION
+        return session
+
+    def request(self, address):
+        """
+        Query the geocoding service for a single address
+
+        :return: GeocodingResult, with an empty location if not found
+        """
+        self.rate_limiter.wait()
+        response = self.session.get(self.url, params={'address': address})
+        response.raise_for_status()
+        results = response.json()['results']
+        if not results:
+            return GeocodingResult(None, 0)
+        location = results[0]['geometry']['location']
+        return GeocodingResult(
+            Point(location['lng'], location['lat']),
+            len(results),
+        )
+
+    def geocode(self, searches, refresh=False, callback=None):
+        """
+        Geocode addresses, only querying the service for the ones not cached
+
+        :param searches: iterable of (cache key, address) tuples, see
+            get_address_search()
+        :param refresh: query the service even for the cached addresses
+        :param callback: called with (done, total) after each address
+        :return: dict of GeocodingResult by cache key, failing addresses
+            being left out
+        """
+        addresses = {key: address for key, address in searches if key}
+        results = {}
+        if not refresh:
+            cached = GeocodedAddress.objects.filter(
+                address__in=list(addresses),
+            ).values_list('address', 'location', 'results_count')
+            for key, location, count in cached.iterator():
+                results[key] = GeocodingResult(location, count)
+
+        missing = set(addresses) - set(results)
+        total, done = len(addresses), len(results)
+        if callback:
+            callback(done, total)
+        found = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.request, addresses[key]): key
+                for key in missing
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    found[key] = future.result()
+                except (requests.RequestException, KeyError, ValueError):
+                    logger.exception("Geocoding failed for %s", addresses[key])
+                done += 1
+                if callback:
+                    callback(done, total)
+
+        # Stored from this thread, the workers never use the database
+        GeocodedAddress.objects.store(found)
+        results.update(found)
+        return results
+
+
+class StubGeocoder(Geocoder):
+    """
+    Geocoder answering from a dict instead of the ESB service, for tests
+
+    Usage: @override_settings(PARTNERSHIP_GEOCODER='partnership.geocoding.StubGeocoder')
+    and patch StubGeocoder.locations with (longitude, latitude) by address as
+    sent to the service.
+    """
+    locations = {}
+
+    def get_session(self):
+        return None
+
+    def request(self, address):
+        if address not in self.locations:
+            return GeocodingResult(None, 0)
+        return GeocodingResult(Point(*self.locations[address]), 1)
+
+
+def get_geocoder(**kwargs):
+    """
+    Get the geocoder configured by the PARTNERSHIP_GEOCODER setting
+    """
+    geocoder_class = import_string(getattr(
+        settings, 'PARTNERSHIP_GEOCODER', 'partnership.geocoding.Geocoder',
+    ))
+    return geocoder_class(**kwargs)
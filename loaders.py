@@ -0,0 +1,214 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from partnership.models import (
+    AgreementStatus,
+    EntityProxy,
+    Partner,
+    PartnershipAgreement,
+    PartnershipYear,
+)
+from partnership.utils import merge_agreement_ranges
+
+
+def iterate_in_chunks(queryset, loader_class, chunk_size, **kwargs):
+    """
+    Iterate over a queryset, loading the related data of each chunk at once
+
+    :param loader_class: class instantiated with the objects of each chunk and
+        kwargs
+    :return: generator of (object, loader) tuples
+    """
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        loader = loader_class(chunk, **kwargs)
+        for obj in chunk:
+            yield obj, loader
+
+
+class PartnershipExportLoader:
+    """
+    Data exported for partnership relations, loaded with a fixed number of
+    queries whatever the number of relations
+    """
+
+    def __init__(self, relations, academic_year=None):
+        partnership_ids = {rel.partnership_id for rel in relations}
+        organization_ids = {rel.entity.organization_id for rel in relations}
+
+        # First and last years of each partnership
+        self.first_years = {}
+        self.last_years = {}
+        years = PartnershipYear.objects.filter(
+            partnership_id__in=partnership_ids,
+        ).select_related('academic_year').only(
+            'partnership_id', 'academic_year',
+        ).order_by('academic_year__year')
+        for year in years:
+            self.first_years.setdefault(year.partnership_id, year.academic_year)
+            self.last_years[year.partnership_id] = year.academic_year
+
+        # Year of each partnership for the exported academic year
+        self.selected_years = {}
+        if academic_year is not None:
+            years = PartnershipYear.objects.filter(
+                partnership_id__in=partnership_ids,
+                academic_year=academic_year,
+            ).select_related(
+                'academic_year',
+                'funding_source',
+                'funding_program',
+                'funding_type',
+            ).prefetch_related(
+                Prefetch('entities', queryset=EntityProxy.objects.with_acronym()),
+                'education_levels',
+            )
+            self.selected_years = {year.partnership_id: year for year in years}
+
+        # Last validated agreement of each partnership
+        agreements = PartnershipAgreement.objects.filter(
+            partnership_id__in=partnership_ids,
+            status=AgreementStatus.VALIDATED.name,
+        ).select_related('end_academic_year').order_by(
+            'partnership_id', '-end_academic_year__end_date',
+        ).distinct('partnership_id')
+        self.last_valid_agreements = {
+            agreement.partnership_id: agreement for agreement in agreements
+        }
+
+        # Erasmus and PIC codes of partners
+        self.partner_codes = {
+            organization_id: (erasmus_code, pic_code)
+            for organization_id, erasmus_code, pic_code in Partner.objects.filter(
+                organization_id__in=organization_ids,
+            ).values_list('organization_id', 'erasmus_code', 'pic_code')
+        }
+
+    def get_first_year(self, partnership):
+        return self.first_years.get(partnership.pk)
+
+    def get_last_year(self, partnership):
+        return self.last_years.get(partnership.pk)
+
+    def get_selected_year(self, partnership):
+        return self.selected_years.get(partnership.pk)
+
+    def get_last_valid_agreement(self, partnership):
+        return self.last_valid_agreements.get(partnership.pk)
+
+    def get_partner_codes(self, organization):
+        """:return: tuple (erasmus_code, pic_code)"""
+        return self.partner_codes.get(organization.pk, (None, None))
+
+
+class PartnershipValidityLoader:
+    """
+    Validity of partnerships, computed with a fixed number of queries whatever
+    the number of partnerships, to fill their cached properties
+    """
+
+    # Cached properties of Partnership filled by populate()
+    PROPERTIES = [
+        'is_valid',
+        'valid_start_date',
+        'valid_end_date',
+        'valid_agreements_dates_ranges',
+        'start_partnership_year',
+        'end_partnership_year',
+        'current_year',
+    ]
+
+    def __init__(self, partnerships):
+        partnership_ids = {partnership.pk for partnership in partnerships}
+
+        # First, last and current years of each partnership
+        years = PartnershipYear.objects.filter(
+            partnership_id__in=partnership_ids,
+        ).select_related('academic_year')
+        self.start_years = self.get_years_by_partnership(
+            years.order_by('partnership_id', 'academic_year__year'),
+        )
+        self.end_years = self.get_years_by_partnership(
+            years.order_by('partnership_id', '-academic_year__year'),
+        )
+        now = timezone.now()
+        self.current_years = self.get_years_by_partnership(
+            years.filter(
+                academic_year__start_date__lte=now,
+                academic_year__end_date__gte=now,
+            ).order_by('partnership_id', 'academic_year__year').prefetch_related(
+                'education_fields', 'education_levels',
+            ),
+        )
+
+        # Validated agreements of each partnership, by start year
+        self.agreements = defaultdict(list)
+        self.valid_start_dates = {}
+        self.valid_end_dates = {}
+        agreements = PartnershipAgreement.objects.filter(
+            partnership_id__in=partnership_ids,
+            status=AgreementStatus.VALIDATED.name,
+        ).order_by('partnership_id', 'start_academic_year__year').values_list(
+            'partnership_id',
+            'start_academic_year__year',
+            'end_academic_year__year',
+            'start_academic_year__start_date',
+            'end_academic_year__end_date',
+        )
+        for partnership_id, start, end, start_date, end_date in agreements:
+            self.agreements[partnership_id].append({'start': start, 'end': end})
+            self.valid_start_dates[partnership_id] = min(
+                start_date, self.valid_start_dates.get(partnership_id, start_date),
+            )
+            self.valid_end_dates[partnership_id] = max(
+                end_date, self.valid_end_dates.get(partnership_id, end_date),
+            )
+
+    @staticmethod
+    def get_years_by_partnership(years):
+        """
+        :return: dict of the first year of each partnership in the ordering
+        """
+        return {year.partnership_id: year for year in years.distinct('partnership_id')}
+
+    def get_values(self, partnership):
+        """
+        :return: dict of the cached property values of a partnership
+        """
+        return {
+            'is_valid': partnership.is_project or partnership.pk in self.agreements,
+            'valid_start_date': self.valid_start_dates.get(partnership.pk),
+            'valid_end_date': self.valid_end_dates.get(partnership.pk),
+            'valid_agreements_dates_ranges': merge_agreement_ranges(
+                self.agreements.get(partnership.pk, []),
+            ),
+            'start_partnership_year': self.start_years.get(partnership.pk),
+            'end_partnership_year': self.end_years.get(partnership.pk),
+            'current_year': self.current_years.get(partnership.pk),
+        }
+
+    def populate(self, partnerships):
+        """
+        Fill the cached properties of the partnerships, the ones derived from
+        them (start_academic_year, has_missing_valid_years...) then being
+        computed without any query
+        """
+        for partnership in partnerships:
+            partnership.__dict__.update(self.get_values(partnership))
+
+    @classmethod
+    def load(cls, partnerships):
+        """
+        Compute and fill the validity of a list of partnerships
+
+        :return: the partnerships
+        """
+        partnerships = list(partnerships)
+        cls(partnerships).populate(partnerships)
+        return partnerships
@@ -0,0 +1,25 @@
+from django.core.management import BaseCommand
+
+from partnership.models import Partner
+from partnership.similarity import SIMILARITY_THRESHOLD, find_duplicate_clusters
+
+
+class Command(BaseCommand):
+    help = 'List the groups of partners which may be duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+
+    def handle(self, *args, threshold=SIMILARITY_THRESHOLD, **options):
+        clusters = find_duplicate_clusters(threshold)
+        partners = Partner.objects.in_bulk({pk for cluster in clusters for pk in cluster})
+        for cluster in clusters:
+            self.stdout.write('---')
+            for pk in sorted(cluster):
+                partner = partners[pk]
+                self.stdout.write('{} - {} ({})'.format(
+                    pk, partner.organization.name, partner.erasmus_code or '',
+                ))
+        self.stdout.write(self.style.SUCCESS(
+            '{} groups of possible duplicates'.format(len(clusters))
+        ))
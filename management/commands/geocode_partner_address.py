@@ -1,10 +1,11 @@
-import requests
-from django.conf import settings
-from django.contrib.gis.geos import Point
 from django.core.management import BaseCommand
+from django.db import transaction
 
 from base.models.entity_version_address import EntityVersionAddress
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version
+from partnership.geocoding import get_address_search, get_geocoder
 from partnership.management.commands.progress_bar import ProgressBarMixin
+from partnership.signals import addresses_changed
 
 
 class Command(ProgressBarMixin, BaseCommand):
@@ -15,6 +16,15 @@ class Command(ProgressBarMixin, BaseCommand):
             dest='overwrite',
             help='Update every partner location, even if already set'
         )
+        parser.add_argument(
+            '--refresh', action='store_true', default=False,
+            dest='refresh',
+            help='Query the geocoding service even for already geocoded addresses'
+        )
+        parser.add_argument(
+            '--workers', type=int, dest='workers',
+            help='Number of concurrent requests to the geocoding service'
+        )
 
     def handle(self, *args, **options):
         # Fill the address for the partners only
@@ -26,56 +36,50 @@ class Command(ProgressBarMixin, BaseCommand):
         if not options.get('overwrite'):
             queryset = queryset.filter(location__isnull=True)
 
-        count = queryset.count()
-
-        self.print_progress_bar(0, count)
-        url = "{esb_api}/{endpoint}".format(
-            esb_api=settings.ESB_API_URL,
-            endpoint=settings.ESB_GEOCODING_ENDPOINT,
-        )
-
-        # To prevent too many requests to geocoding, maintain a cache
-        cache = {}
-        not_found = []
-        obj_list = []
-        for i, address in enumerate(queryset, start=1):
-            parts = [
+        searches = {}
+        for address in queryset.iterator():
+            search = get_address_search(
                 address.street_number,
                 address.street,
                 address.postal_code,
                 address.city,
                 address.state,
                 address.country.name if address.country else '',
-            ]
-            search = ' '.join(filter(None, parts))
-            if not search:
-                continue
+            )
+            if search[0]:
+                searches[address] = search
+
+        geocoder = get_geocoder(workers=options.get('workers'))
+        results = geocoder.geocode(
+            searches.values(),
+            refresh=options.get('refresh'),
+            callback=lambda done, total: total and self.print_progress_bar(done, total),
+        )
 
-            if search not in cache:
-                response = requests.get(url, {'address': search}, headers={
-                    'Authorization': settings.ESB_AUTHORIZATION,
-                })
-                try:
-                    data = response.json()
-                    location = data['results'][0]['geometry']['location']
-                    address.location = cache[search] = Point(
-                        location['lng'],
-                        location['lat'],
-                    )
-                except IndexError:
-                    address.location = cache[search] = None
-                    not_found.append(search)
-            else:
-                address.location = cache[search]
+        obj_list = []
+        not_found = set()
+        failed = set()
+        for address, (key, search) in searches.items():
+            if key not in results:
+                failed.add(search)
+                continue
+            address.location = results[key].location
+            if address.location is None:
+                not_found.add(search)
             obj_list.append(address)
-            self.print_progress_bar(i, count)
 
         self.stdout.write('')
-        self.stdout.write("{} updated, {} not found".format(
+        self.stdout.write("{} updated, {} not found, {} failed".format(
             len(obj_list),
             len(not_found),
+            len(failed),
         ))
         if not_found:
-            self.stdout.write(" - " + "\n - ".join(not_found))
+            self.stdout.write(" - " + "\n - ".join(sorted(not_found)))
 
-        EntityVersionAddress.objects.bulk_update(obj_list, fields=['location'])
+        with transaction.atomic():
+            EntityVersionAddress.objects.bulk_update(
+                obj_list, fields=['location'], batch_size=500,
+            )
+            addresses_changed({address.entity_version_id for address in obj_list})
+        bump_data_version(PARTNERSHIP_DATA)
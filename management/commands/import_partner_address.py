@@ -1,22 +1,23 @@
 import argparse
 import csv
 import io
+import os
 from collections import defaultdict
 from datetime import date, timedelta
 
-import requests
-from django.conf import settings
-from django.contrib.gis.geos import Point
 from django.core.management import BaseCommand, CommandError
 from django.core.management.base import OutputWrapper
 from django.db import transaction
-from django.db.models import F, Subquery, OuterRef, Q
+from django.db.models import F, Q
 
 from base.models.entity import Entity
 from base.models.entity_version import EntityVersion
 from base.models.entity_version_address import EntityVersionAddress
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version
+from partnership.geocoding import get_address_search, get_geocoder
 from partnership.management.commands.progress_bar import ProgressBarMixin
-from partnership.models import Partner
+from partnership.models import EntityCurrentVersion, Partner
+from partnership.signals import addresses_changed
 from reference.models.country import Country
 
 ID = "ID"
@@ -36,23 +37,15 @@ class Command(ProgressBarMixin, BaseCommand):
         self.country_names = dict(Country.objects.values_list('name', 'pk'))
 
         # Partner entity id mapping
-        self.entity_ids = dict(Partner.objects.annotate(
-            entity_id=Subquery(
-                EntityVersion.objects.filter(
-                    entity__organization=OuterRef('organization_id'),
-                    parent__isnull=True,
-                ).order_by('-start_date').values('entity_id')[:1]
-            ),
-        ).values_list('pk', 'entity_id'))
+        self.entity_ids = dict(Partner.objects.values_list(
+            'pk', 'organization__root_version__entity_id',
+        ))
 
         # Existing partner addresses
         self.partners = self.get_existing_partner_addresses()
 
-        # Geocoding url
-        self.url = "{esb_api}/{endpoint}".format(
-            esb_api=settings.ESB_API_URL,
-            endpoint=settings.ESB_GEOCODING_ENDPOINT,
-        )
+        # Geocoding results by address
+        self.locations = {}
 
         self.counts = defaultdict(int)
         self.delayed_io = io.StringIO()
@@ -63,6 +56,23 @@ class Command(ProgressBarMixin, BaseCommand):
             'csv_file',
             type=argparse.FileType('r', encoding="utf-8-sig"),
         )
+        parser.add_argument(
+            '--workers', type=int, dest='workers',
+            help='Number of concurrent requests to the geocoding service'
+        )
+        parser.add_argument(
+            '--bulk', action='store_true', default=False, dest='bulk',
+            help='Import the changed addresses with batched statements'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500, dest='chunk_size',
+            help='Number of addresses imported per transaction in bulk mode'
+        )
+        parser.add_argument(
+            '--checkpoint', dest='checkpoint',
+            help='File keeping the imported partner ids in bulk mode, to '
+                 'resume an interrupted import'
+        )
 
     @staticmethod
     def check_file(reader):
@@ -106,27 +116,40 @@ class Command(ProgressBarMixin, BaseCommand):
     def handle(self, *args, **options):
         file: io.TextIOWrapper = options['csv_file']
 
-        # Read number of lines
-        total = sum(1 for _ in file) - 1
-        file.seek(0)
-
         reader = csv.DictReader(file, delimiter=';')
         self.check_file(reader)
+        rows = list(reader)
+        total = len(rows)
 
-        for i, row in enumerate(reader, start=1):
-            try:
-                self.import_address(row, options)
-            except AttributeError:
-                self.stdout_wrapper.write(self.style.ERROR(
-                    'Conflicting entity version for partner {:>4} (entity {})'.format(
-                        row[ID], self.entity_ids[int(row[ID])],
-                    )
-                ))
-                self.counts['skipped'] += 1
-            self.print_progress_bar(i, total)
-            self.counts['updated'] += 1
+        # Geocode the changed addresses all at once, before importing them
+        searches = [
+            self.get_search(row) for row in rows
+            if self.is_importable(row) and not self.is_unchanged(row)
+        ]
+        self.stdout.write('Geocoding addresses')
+        self.locations = get_geocoder(workers=options.get('workers')).geocode(
+            searches,
+            callback=lambda done, count: count and self.print_progress_bar(done, count),
+        )
+
+        if options['bulk']:
+            self.import_bulk(rows, options)
+        else:
+            for i, row in enumerate(rows, start=1):
+                try:
+                    self.import_address(row, options)
+                except AttributeError:
+                    self.stdout_wrapper.write(self.style.ERROR(
+                        'Conflicting entity version for partner {:>4} (entity {})'.format(
+                            row[ID], self.entity_ids[int(row[ID])],
+                        )
+                    ))
+                    self.counts['skipped'] += 1
+                self.print_progress_bar(i, total)
+                self.counts['updated'] += 1
+
+            self.print_progress_bar(total, total)
 
-        self.print_progress_bar(total, total)
         self.delayed_io.seek(0)
         self.stdout.write(self.delayed_io.read())
 
@@ -142,6 +165,40 @@ class Command(ProgressBarMixin, BaseCommand):
 
     @transaction.atomic
     def import_address(self, row, options):
+        result = self.check_row(row, options)
+        if result is None:
+            return
+        existing_address = self.partners.get(int(row[ID]))
+
+        # Handle entity version
+        last_version = None
+        if existing_address:
+            last_version = self._override_current_version(existing_address)
+
+        if not last_version:
+            entity_id = self.entity_ids[int(row[ID])]
+            entity = Entity.objects.select_related('organization').get(pk=entity_id)
+            # Create a new entity version
+            last_version = EntityVersion.objects.create(
+                title=entity.organization.name,
+                entity_id=entity_id,
+                parent=None,
+                start_date=date.today(),
+                end_date=None,
+            )
+
+        # Create the address
+        EntityVersionAddress.objects.create(
+            **self.get_address_values(row, result),
+            entity_version=last_version,
+        )
+
+    def check_row(self, row, options):
+        """
+        Check that the address of a row must be imported
+
+        :return: the GeocodingResult of the address, None if not imported
+        """
         # We need at least the street to update
         if not row[STREET]:
             if options['verbosity'] >= 2:
@@ -151,7 +208,7 @@ class Command(ProgressBarMixin, BaseCommand):
             return
 
         # Country name must exist
-        if row[COUNTRY] not in self.country_names:
+        if not self.is_importable(row):
             self.counts['skipped'] += 1
             self.stdout_wrapper.write(self.style.ERROR(
                 'Skipping partner id {}: country {} does not exist'.format(
@@ -161,11 +218,7 @@ class Command(ProgressBarMixin, BaseCommand):
             return
 
         # Check that the address has changed
-        existing_address = (
-            self.partners[int(row[ID])] if int(row[ID]) in self.partners
-            else None
-        )
-        if self._is_address_unchanged(row, existing_address):
+        if self.is_unchanged(row):
             if options['verbosity'] >= 2:
                 self.stdout_wrapper.write(self.style.WARNING(
                     'Skipping partner id {}: same address'.format(row[ID])
@@ -173,19 +226,18 @@ class Command(ProgressBarMixin, BaseCommand):
             self.counts['existing'] += 1
             return
 
-        parts = [
-            row[STREET_NUM],
-            row[STREET],
-            row[POSTAL_CODE],
-            row[CITY],
-            row[COUNTRY],
-        ]
-        search = ' '.join(filter(None, parts))
-        response = requests.get(self.url, {'address': search}, headers={
-            'Authorization': settings.ESB_AUTHORIZATION,
-        })
-        results = response.json()['results']
-        if not results:
+        key, search = self.get_search(row)
+        if key not in self.locations:
+            self.counts['skipped'] += 1
+            self.stdout_wrapper.write(self.style.ERROR(
+                'Geocoding failed for partner id {:>4}: {}'.format(
+                    row[ID], search,
+                )
+            ))
+            return
+
+        result = self.locations[key]
+        if result.location is None:
             self.counts['not_found'] += 1
             self.stdout_wrapper.write(self.style.ERROR(
                 'Address not found for partner id {:>4} not found: {}'.format(
@@ -194,50 +246,160 @@ class Command(ProgressBarMixin, BaseCommand):
             ))
             return
 
-        if len(results) > 1:
+        if result.count > 1:
             self.counts['warning'] += 1
             self.stdout_wrapper.write(self.style.WARNING(
                 'Multiple results for partner id {}'.format(row[ID])
             ))
-        location = results[0]['geometry']['location']
         if options['verbosity'] >= 2:
             self.stdout_wrapper.write(self.style.SUCCESS(
                 'Address found for partner id {:>4} : {}, {}'.format(
-                    row[ID], location['lat'], location['lng'],
+                    row[ID], result.location.y, result.location.x,
                 )
             ))
 
-        # Handle entity version
-        last_version = None
-        if existing_address:
-            last_version = self._override_current_version(existing_address)
-
-        if not last_version:
-            entity_id = self.entity_ids[int(row[ID])]
-            entity = Entity.objects.select_related('organization').get(pk=entity_id)
-            # Create a new entity version
-            last_version = EntityVersion.objects.create(
-                title=entity.organization.name,
-                entity_id=entity_id,
-                parent=None,
-                start_date=date.today(),
-                end_date=None,
-            )
+        return result
 
-        # Create the address
-        EntityVersionAddress.objects.create(
+    def get_address_values(self, row, result):
+        return dict(
             street_number=row[STREET_NUM],
             street=row[STREET],
             postal_code=row[POSTAL_CODE],
             city=row[CITY],
-            location=Point(
-                location['lng'],
-                location['lat'],
-            ),
+            location=result.location,
             country_id=self.country_names[row[COUNTRY]],
-            entity_version=last_version,
         )
 
+    def import_bulk(self, rows, options):
+        """
+        Import the changed addresses by chunks, each chunk being written with
+        a few statements in its own transaction, then saved in the checkpoint
+        """
+        checkpoint = options['checkpoint']
+        imported_ids = self.read_checkpoint(checkpoint)
+        if imported_ids:
+            self.stdout.write('Resuming import, {} partners already imported'.format(
+                len(imported_ids),
+            ))
+
+        # Last row of each partner, if imported
+        changes = {}
+        for row in rows:
+            if int(row[ID]) in imported_ids:
+                continue
+            result = self.check_row(row, options)
+            if result is not None:
+                changes[int(row[ID])] = (row, result)
+
+        changes = list(changes.items())
+        total = len(changes)
+        chunk_size = options['chunk_size']
+        for start in range(0, total, chunk_size):
+            chunk = dict(changes[start:start + chunk_size])
+            with transaction.atomic():
+                imported = self.import_chunk(chunk)
+            # Skipped partners are retried when resuming
+            self.write_checkpoint(checkpoint, imported)
+            self.print_progress_bar(min(start + chunk_size, total), total)
+
+        bump_data_version(PARTNERSHIP_DATA)
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    def import_chunk(self, chunk):
+        """
+        Same as import_address() for several rows, the partners whose new
+        version would conflict being skipped before anything is written
+
+        :param chunk: dict of (row, GeocodingResult) by partner id
+        :return: list of the imported partner ids
+        """
+        today = date.today()
+        ended_version_ids = {}
+        reused_version_ids = {}
+        for partner_id in chunk:
+            existing_address = self.partners.get(partner_id)
+            if not existing_address:
+                continue
+            if existing_address.entity_version.start_date != today:
+                ended_version_ids[partner_id] = existing_address.entity_version_id
+            else:
+                reused_version_ids[partner_id] = existing_address.entity_version_id
+
+        # New versions must not overlap the current ones once the previous
+        # versions are ended, as checked on save
+        entity_ids = {
+            partner_id: self.entity_ids.get(partner_id) for partner_id in chunk
+            if partner_id not in reused_version_ids
+        }
+        conflicting = set(EntityVersion.objects.filter(
+            Q(end_date__isnull=True) | Q(end_date__gte=today),
+            entity_id__in=entity_ids.values(),
+        ).exclude(
+            pk__in=ended_version_ids.values(),
+        ).values_list('entity_id', flat=True))
+        titles = dict(Entity.objects.filter(
+            pk__in=entity_ids.values(),
+        ).values_list('pk', 'organization__name'))
+        for partner_id, entity_id in list(entity_ids.items()):
+            if entity_id in conflicting or entity_id not in titles:
+                self.stdout_wrapper.write(self.style.ERROR(
+                    'Conflicting entity version for partner {:>4} (entity {})'.format(
+                        partner_id, entity_id,
+                    )
+                ))
+                self.counts['skipped'] += 1
+                del entity_ids[partner_id]
+                ended_version_ids.pop(partner_id, None)
+
+        # See _override_current_version()
+        EntityVersion.objects.filter(pk__in=ended_version_ids.values()).update(
+            end_date=today - timedelta(days=1),
+        )
+        EntityVersionAddress.objects.filter(
+            entity_version_id__in=reused_version_ids.values(),
+        ).delete()
+
+        new_versions = EntityVersion.objects.bulk_create([
+            EntityVersion(
+                title=titles[entity_id],
+                entity_id=entity_id,
+                parent=None,
+                start_date=today,
+                end_date=None,
+            ) for entity_id in entity_ids.values()
+        ])
+        version_ids = {
+            **reused_version_ids,
+            **dict(zip(entity_ids, (version.pk for version in new_versions))),
+        }
+        EntityVersionAddress.objects.bulk_create([
+            EntityVersionAddress(
+                **self.get_address_values(*chunk[partner_id]),
+                entity_version_id=version_id,
+            ) for partner_id, version_id in version_ids.items()
+        ])
+        self.counts['updated'] += len(version_ids)
+
+        # Bulk statements do not send the signals refreshing the derived data
+        EntityCurrentVersion.objects.refresh(list(entity_ids.values()))
+        addresses_changed([*version_ids.values(), *ended_version_ids.values()])
+        return list(version_ids)
+
+    @staticmethod
+    def read_checkpoint(checkpoint):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return set()
+        with open(checkpoint) as file:
+            return {int(line) for line in file if line.strip()}
+
+    @staticmethod
+    def write_checkpoint(checkpoint, partner_ids):
+        if not checkpoint:
+            return
+        with open(checkpoint, 'a') as file:
+            file.writelines('{}\n'.format(partner_id) for partner_id in partner_ids)
+
     @staticmethod
     def _override_current_version(existing_address):
         """
@@ -260,6 +422,28 @@ class Command(ProgressBarMixin, BaseCommand):
             last_version.entityversionaddress_set.all().delete()
         return last_version
 
+    def is_importable(self, row):
+        """
+        Check that the row has an address in an existing country
+        """
+        return bool(row[STREET]) and row[COUNTRY] in self.country_names
+
+    def is_unchanged(self, row):
+        return self._is_address_unchanged(row, self.partners.get(int(row[ID])))
+
+    @staticmethod
+    def get_search(row):
+        """
+        :return: a tuple (cache key, address sent to the geocoding service)
+        """
+        return get_address_search(
+            row[STREET_NUM],
+            row[STREET],
+            row[POSTAL_CODE],
+            row[CITY],
+            row[COUNTRY],
+        )
+
     @staticmethod
     def _is_address_unchanged(row, address):
         """
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from partnership.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = 'Delete export jobs and their files after some days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2)
+
+    def handle(self, *args, days=2, **options):
+        jobs = ExportJob.objects.filter(
+            created__lt=timezone.now() - timedelta(days=days),
+        )
+        count = 0
+        for job in jobs.iterator():
+            if job.file:
+                job.file.delete(save=False)
+            job.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            '{} export jobs deleted'.format(count)
+        ))
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from partnership.models import PartnershipApiSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the precomputed rows of the public partnerships API. '
+        'Should be run after changes not sending signals, e.g. bulk updates.'
+    )
+
+    def handle(self, *args, **options):
+        count = PartnershipApiSnapshot.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} partnership relations snapshotted'.format(count)
+        ))
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from partnership.models import EntityCurrentVersion, OrganizationRootVersion
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the latest version of entities and organizations'
+
+    def handle(self, *args, **options):
+        count = EntityCurrentVersion.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} entity versions stored'.format(count)
+        ))
+        count = OrganizationRootVersion.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} organization root versions stored'.format(count)
+        ))
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from partnership.models import EntityPath
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the acronym and title paths of UCL entities, to be run once '
+        'after migration 0106'
+    )
+
+    def handle(self, *args, **options):
+        count = EntityPath.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} entity paths stored'.format(count)
+        ))
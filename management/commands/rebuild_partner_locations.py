@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from partnership.models import PartnerLocation
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the map locations of partners'
+
+    def handle(self, *args, **options):
+        count = PartnerLocation.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} partner locations stored'.format(count)
+        ))
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+
+from partnership.models import PartnerBlockingKey, PartnerSearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search documents and duplicate blocking keys of partners'
+
+    def handle(self, *args, **options):
+        count = PartnerSearchDocument.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} partner search documents stored'.format(count)
+        ))
+        count = PartnerBlockingKey.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} partner blocking keys stored'.format(count)
+        ))
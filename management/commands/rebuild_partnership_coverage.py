@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from partnership.models import PartnershipYearCoverage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the coverage of academic years by partnership years and agreements'
+
+    def handle(self, *args, **options):
+        count = PartnershipYearCoverage.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            '{} partnership year coverages stored'.format(count)
+        ))
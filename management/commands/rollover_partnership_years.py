@@ -0,0 +1,79 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from base.models.academic_year import AcademicYear
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version
+from partnership.models import (
+    PartnershipApiSnapshot,
+    PartnershipType,
+    PartnershipYearCoverage,
+)
+from partnership.years import YearRollover
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the years of the partnerships from an academic year to the '
+        'next one, with their education fields, levels, entities, offers '
+        'and partner relation years. Only the partnerships ending after the '
+        'academic year or having a validated agreement covering the next one '
+        'are rolled over, the ones already having a year in the next academic '
+        'year being left untouched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'year', type=int,
+            help='Academic year to copy, e.g. 2023 for 2023-24',
+        )
+        parser.add_argument(
+            '--type', action='append', dest='types',
+            choices=PartnershipType.with_synced_dates(),
+            help='Only roll over this partnership type, can be repeated '
+                 '(default: every type whose dates are synced with its years)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', default=False,
+            dest='dry_run',
+            help='Report what would be copied without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        academic_years = AcademicYear.objects.filter(
+            year__in=[options['year'], options['year'] + 1],
+        ).order_by('year')
+        if len(academic_years) != 2:
+            raise CommandError('Academic years {} and {} must exist'.format(
+                options['year'], options['year'] + 1,
+            ))
+        rollover = YearRollover(
+            *academic_years,
+            options['types'] or PartnershipType.with_synced_dates(),
+        )
+
+        with transaction.atomic():
+            partnership_ids = rollover.get_partnership_ids()
+            counts = rollover.apply()
+            if options['dry_run']:
+                # Inserted to count the rows, then rolled back
+                transaction.set_rollback(True)
+
+        for partnership_type, ids in sorted(partnership_ids.items()):
+            self.stdout.write('{}: {} partnerships ({})'.format(
+                partnership_type, len(ids), ', '.join(str(pk) for pk in ids),
+            ))
+        for table, count in counts.items():
+            self.stdout.write('{}: {} rows'.format(table, count))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run, nothing written'))
+            return
+
+        # Bulk statements do not send the signals refreshing the derived data
+        PartnershipYearCoverage.objects.refresh()
+        PartnershipApiSnapshot.objects.refresh()
+        bump_data_version(PARTNERSHIP_DATA)
+        self.stdout.write(self.style.SUCCESS('{} partnerships rolled over to {}'.format(
+            sum(len(ids) for ids in partnership_ids.values()),
+            academic_years[1],
+        )))
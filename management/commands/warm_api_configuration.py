@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import translation
+
+from partnership.api.views.configuration import get_configuration_payload
+
+
+class Command(BaseCommand):
+    help = 'Build the cached configuration of the API for each language'
+
+    def handle(self, *args, **options):
+        for language, _ in settings.LANGUAGES:
+            with translation.override(language):
+                payload = get_configuration_payload()
+            self.stdout.write(self.style.SUCCESS(
+                'Configuration cached for {} ({} bytes)'.format(
+                    language, len(payload['content']),
+                )
+            ))
@@ -0,0 +1,37 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0103_update_migration_codiplomation_v2'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnershipApiSnapshot',
+            fields=[
+                ('relation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='api_snapshot', serialize=False, to='partnership.partnershippartnerrelation')),
+                ('country_continent_name', models.CharField(max_length=255, null=True)),
+                ('country_iso_code', models.CharField(max_length=4, null=True)),
+                ('country_name', models.CharField(max_length=255, null=True)),
+                ('city', models.CharField(max_length=255, null=True)),
+                ('location', django.contrib.gis.db.models.fields.PointField(null=True, srid=4326)),
+                ('has_years_in', models.BooleanField(default=False)),
+                ('has_valid_agreement_in_current_year', models.BooleanField(default=False)),
+                ('validity_end_year', models.IntegerField(null=True)),
+                ('start_year', models.CharField(max_length=20, null=True)),
+                ('end_year', models.CharField(max_length=20, null=True)),
+                ('funding_name', models.CharField(max_length=100, null=True)),
+                ('funding_url', models.URLField(null=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.academicyear')),
+                ('country', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reference.country')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='partnershipapisnapshot',
+            index=models.Index(fields=['academic_year', 'has_years_in', 'has_valid_agreement_in_current_year'], name='partnership_api_snapshot_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+POPULATE_ENTITY_CURRENT_VERSION = """
+INSERT INTO partnership_entitycurrentversion
+    (entity_id, version_id, title, acronym, start_date, end_date)
+SELECT DISTINCT ON (ev.entity_id)
+    ev.entity_id, ev.id, ev.title, ev.acronym, ev.start_date, ev.end_date
+FROM base_entityversion ev
+ORDER BY ev.entity_id, ev.start_date DESC
+"""
+
+POPULATE_ORGANIZATION_ROOT_VERSION = """
+INSERT INTO partnership_organizationrootversion
+    (organization_id, entity_id, version_id, title, acronym, website,
+     first_start_date, start_date, end_date, address_id)
+SELECT DISTINCT ON (e.organization_id)
+    e.organization_id, ev.entity_id, ev.id, ev.title, ev.acronym, e.website,
+    (
+        SELECT MIN(first_ev.start_date)
+        FROM base_entityversion first_ev
+        JOIN base_entity first_e ON first_e.id = first_ev.entity_id
+        WHERE first_e.organization_id = e.organization_id
+        AND first_ev.parent_id IS NULL
+    ),
+    ev.start_date, ev.end_date,
+    (
+        SELECT address.id
+        FROM base_entityversionaddress address
+        WHERE address.entity_version_id = ev.id
+        LIMIT 1
+    )
+FROM base_entityversion ev
+JOIN base_entity e ON e.id = ev.entity_id
+WHERE ev.parent_id IS NULL AND e.organization_id IS NOT NULL
+ORDER BY e.organization_id, ev.start_date DESC
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0104_partnershipapisnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityCurrentVersion',
+            fields=[
+                ('entity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_version', serialize=False, to='base.entity')),
+                ('title', models.CharField(max_length=255)),
+                ('acronym', models.CharField(max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(null=True)),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.entityversion')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrganizationRootVersion',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='root_version', serialize=False, to='base.organization')),
+                ('title', models.CharField(max_length=255)),
+                ('acronym', models.CharField(max_length=20)),
+                ('website', models.URLField(max_length=255, null=True)),
+                ('first_start_date', models.DateField(null=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(null=True)),
+                ('address', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.entityversionaddress')),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.entity')),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.entityversion')),
+            ],
+        ),
+        migrations.RunSQL(POPULATE_ENTITY_CURRENT_VERSION, migrations.RunSQL.noop),
+        migrations.RunSQL(POPULATE_ORGANIZATION_ROOT_VERSION, migrations.RunSQL.noop),
+    ]
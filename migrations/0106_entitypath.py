@@ -0,0 +1,26 @@
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The paths are computed by a recursive query of base, which is not
+# available on historical models: the table is created empty here and must
+# be filled with the rebuild_entity_paths command once migrated.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0105_current_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityPath',
+            fields=[
+                ('entity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='entity_path', serialize=False, to='base.entity')),
+                ('acronym_path', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), size=None)),
+                ('title_path', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), size=None)),
+                ('path_as_string', models.TextField()),
+            ],
+        ),
+    ]
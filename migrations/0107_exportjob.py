@@ -0,0 +1,33 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('partnership', '0106_entitypath'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('key', models.CharField(db_index=True, max_length=64)),
+                ('path', models.CharField(max_length=255)),
+                ('params', models.JSONField(default=dict)),
+                ('language', models.CharField(max_length=10, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'export_pending'), ('RUNNING', 'export_running'), ('DONE', 'export_done'), ('FAILED', 'export_failed')], default='PENDING', max_length=20)),
+                ('file', models.FileField(null=True, upload_to='partnerships/exports/')),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(null=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from partnership.utils import normalize_search_text
+
+
+def forward(apps, schema_editor):
+    Entity = apps.get_model('base', 'Entity')
+    Partner = apps.get_model('partnership', 'Partner')
+    PartnerSearchDocument = apps.get_model('partnership', 'PartnerSearchDocument')
+
+    former_names = defaultdict(list)
+    for partner_id, name in Partner.objects.filter(
+        now_known_as__isnull=False,
+    ).values_list('now_known_as_id', 'organization__name'):
+        former_names[partner_id].append(name)
+
+    rows = Entity.objects.filter(
+        organization__partner__isnull=False,
+    ).values_list(
+        'pk',
+        'organization__partner__id',
+        'organization__name',
+        'organization__code',
+        'organization__partner__erasmus_code',
+        'organization__partner__pic_code',
+        'partnerentity__name',
+    )
+    PartnerSearchDocument.objects.bulk_create([
+        PartnerSearchDocument(
+            entity_id=pk,
+            partner_id=partner_id,
+            document=normalize_search_text(' '.join(
+                value for value in [*values, *former_names[partner_id]] if value
+            )),
+        ) for pk, partner_id, *values in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0107_exportjob'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='PartnerSearchDocument',
+            fields=[
+                ('entity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='partner_search', serialize=False, to='base.entity')),
+                ('document', models.TextField()),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='partnership.partner')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['document'], name='partner_search_document_trgm', opclasses=['gin_trgm_ops'])],
+            },
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
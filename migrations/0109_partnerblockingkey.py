@@ -0,0 +1,40 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from partnership.utils import blocking_keys
+
+
+def forward(apps, schema_editor):
+    Partner = apps.get_model('partnership', 'Partner')
+    PartnerBlockingKey = apps.get_model('partnership', 'PartnerBlockingKey')
+
+    rows = Partner.objects.values_list(
+        'pk', 'organization__name', 'erasmus_code', 'pic_code',
+    )
+    PartnerBlockingKey.objects.bulk_create([
+        PartnerBlockingKey(partner_id=pk, key=key)
+        for pk, name, erasmus_code, pic_code in rows.iterator()
+        for key in blocking_keys(name, erasmus_code, pic_code)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0108_partnersearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerBlockingKey',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=255)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocking_keys', to='partnership.partner')),
+            ],
+            options={
+                'unique_together': {('partner', 'key')},
+            },
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+from partnership.models.partner.location import get_tile
+
+
+def forward(apps, schema_editor):
+    Partner = apps.get_model('partnership', 'Partner')
+    PartnerLocation = apps.get_model('partnership', 'PartnerLocation')
+
+    rows = Partner.objects.filter(
+        organization__root_version__address__location__isnull=False,
+    ).values_list('pk', 'organization__root_version__address__location')
+    locations = []
+    for pk, location in rows.iterator():
+        tile_x, tile_y = get_tile(location.x, location.y)
+        locations.append(PartnerLocation(
+            partner_id=pk,
+            location=location,
+            longitude=location.x,
+            latitude=location.y,
+            tile_x=tile_x,
+            tile_y=tile_y,
+        ))
+    PartnerLocation.objects.bulk_create(locations, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0109_partnerblockingkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerLocation',
+            fields=[
+                ('partner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='map_location', serialize=False, to='partnership.partner')),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('longitude', models.FloatField()),
+                ('latitude', models.FloatField()),
+                ('tile_x', models.IntegerField()),
+                ('tile_y', models.IntegerField()),
+            ],
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
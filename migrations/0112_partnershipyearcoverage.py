@@ -0,0 +1,55 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from partnership.models.coverage import get_coverage_rows
+
+
+def forward(apps, schema_editor):
+    AcademicYear = apps.get_model('base', 'AcademicYear')
+    PartnershipAgreement = apps.get_model('partnership', 'PartnershipAgreement')
+    PartnershipYear = apps.get_model('partnership', 'PartnershipYear')
+    PartnershipYearCoverage = apps.get_model('partnership', 'PartnershipYearCoverage')
+
+    rows = get_coverage_rows(
+        PartnershipYear.objects.values_list('partnership_id', 'academic_year_id').order_by(),
+        PartnershipAgreement.objects.values_list(
+            'partnership_id',
+            'status',
+            'start_academic_year__start_date',
+            'end_academic_year__end_date',
+        ).order_by(),
+        AcademicYear.objects.values_list('pk', 'start_date', 'end_date'),
+    )
+    PartnershipYearCoverage.objects.bulk_create([
+        PartnershipYearCoverage(
+            partnership_id=partnership_id,
+            academic_year_id=academic_year_id,
+            **flags
+        ) for (partnership_id, academic_year_id), flags in rows.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnership', '0111_geocodedaddress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnershipYearCoverage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('has_year', models.BooleanField(default=False)),
+                ('has_agreement', models.BooleanField(default=False)),
+                ('has_validated_agreement', models.BooleanField(default=False)),
+                ('is_last_agreement_year', models.BooleanField(default=False)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.academicyear')),
+                ('partnership', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coverage', to='partnership.partnership')),
+            ],
+            options={
+                'unique_together': {('academic_year', 'partnership')},
+            },
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,26 @@
 try:
     from .contact import *
+    from .current_version import *
     from .enums import *
     from .entity_proxy import *
+    from .entity_path import *
+    from .export_job import *
     from .financing import *
+    from .geocoding import *
     from .media import *
     from .partner import *
     from .partnership import *
     from .relation import *
     from .relation_year import *
+    from .api_snapshot import *
+    from .coverage import *
     from .ucl_management_entity import *
 
     # Prevent polluting the namespace with module names
-    for name in ['contact', 'financing', 'media', 'partner', 'entity_proxy',
-                 'partnership', 'ucl_management_entity', 'relation', 'relation_year']:
+    for name in ['contact', 'current_version', 'financing', 'media', 'partner',
+                 'entity_proxy', 'entity_path', 'export_job', 'geocoding', 'partnership',
+                 'ucl_management_entity', 'relation', 'relation_year',
+                 'api_snapshot', 'coverage']:
         del globals()[name]
 except RuntimeError as e:  # pragma: no cover
     # There's a weird bug when running tests, the test runner seeing a models
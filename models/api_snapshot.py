@@ -0,0 +1,129 @@
+from django.contrib.gis.db.models import PointField
+from django.db import models, transaction
+
+__all__ = ['PartnershipApiSnapshot']
+
+# Annotations of PartnershipPartnerRelationQuerySet.annotate_api_values()
+# which are stored in the snapshot, with the same name
+API_SNAPSHOT_FIELDS = (
+    'country_continent_name',
+    'country_iso_code',
+    'country_name',
+    'country_id',
+    'city',
+    'location',
+    'has_years_in',
+    'has_valid_agreement_in_current_year',
+    'validity_end_year',
+    'start_year',
+    'end_year',
+    'funding_name',
+    'funding_url',
+)
+
+
+class PartnershipApiSnapshotQuerySet(models.QuerySet):
+    def refresh(self, partnership_ids=None):
+        """
+        Recompute the snapshot rows for the configured API academic year
+
+        :param partnership_ids: restrict the refresh to the relations of these
+            partnerships, refresh everything if None
+        :return: the number of snapshot rows written
+        """
+        from partnership.models import (
+            PartnershipConfiguration,
+            PartnershipPartnerRelation,
+        )
+
+        # Do not use get_configuration(), it creates the configuration
+        configuration = PartnershipConfiguration.objects.select_related(
+            'partnership_api_year',
+        ).first()
+        academic_year = configuration and configuration.partnership_api_year
+
+        snapshots = self.all()
+        relations = PartnershipPartnerRelation.objects.all()
+        if partnership_ids is not None:
+            partnership_ids = list(partnership_ids)
+            snapshots = snapshots.filter(relation__partnership_id__in=partnership_ids)
+            relations = relations.filter(partnership_id__in=partnership_ids)
+
+        with transaction.atomic():
+            snapshots.delete()
+            if academic_year is None:
+                return 0
+            rows = (
+                relations
+                .annotate_api_values(academic_year)
+                .values('pk', *API_SNAPSHOT_FIELDS)
+                .order_by()
+            )
+            created = self.bulk_create([
+                PartnershipApiSnapshot(
+                    relation_id=row.pop('pk'),
+                    academic_year=academic_year,
+                    **row
+                ) for row in rows.iterator()
+            ], batch_size=1000)
+        return len(created)
+
+
+class PartnershipApiSnapshot(models.Model):
+    """
+    Valeurs précalculées d'une relation de partenariat pour l'API publique.
+
+    Une ligne par PartnershipPartnerRelation pour l'année académique de l'API,
+    maintenue par les signaux (voir partnership.signals) et reconstruite
+    entièrement par la commande rebuild_api_snapshot.
+    """
+    relation = models.OneToOneField(
+        'partnership.PartnershipPartnerRelation',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='api_snapshot',
+    )
+    academic_year = models.ForeignKey(
+        'base.AcademicYear',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    # Partner contact address
+    country_continent_name = models.CharField(max_length=255, null=True)
+    country_iso_code = models.CharField(max_length=4, null=True)
+    country_name = models.CharField(max_length=255, null=True)
+    country = models.ForeignKey(
+        'reference.Country',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+    )
+    city = models.CharField(max_length=255, null=True)
+    location = PointField(null=True)
+
+    # API visibility, see PartnershipPartnerRelationQuerySet.filter_for_api()
+    has_years_in = models.BooleanField(default=False)
+    has_valid_agreement_in_current_year = models.BooleanField(default=False)
+
+    # Status
+    validity_end_year = models.IntegerField(null=True)
+    start_year = models.CharField(max_length=20, null=True)
+    end_year = models.CharField(max_length=20, null=True)
+
+    # Funding based on country
+    funding_name = models.CharField(max_length=100, null=True)
+    funding_url = models.URLField(null=True)
+
+    objects = PartnershipApiSnapshotQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['academic_year', 'has_years_in', 'has_valid_agreement_in_current_year'],
+                name='partnership_api_snapshot_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.relation_id)
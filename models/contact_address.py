@@ -0,0 +1,30 @@
+from django.db import models
+from django.db.models import F
+
+
+class ContactAddressQuerySet(models.QuerySet):
+    """
+    Queryset able to annotate the contact address of an organization, which is
+    the address of the latest root entity version of the organization, as
+    stored in OrganizationRootVersion.
+
+    Subclasses must define the path to the organization.
+    """
+    contact_address_organization_path = 'organization'
+
+    def _annotate_contact_address(self, *fields):
+        """
+        Add annotations on contact address, joining them all at once
+
+        :param fields: list of fields relative to EntityVersionAddress
+            If a field contains a traversal, e.g. country__name, it will be
+            available as country_name
+        """
+        return self.annotate(**{
+            field.replace('__', '_'): F('{}__root_version__address__{}'.format(
+                self.contact_address_organization_path, field,
+            ))
+            for field in fields
+            # Do not compute twice what is already annotated
+            if field.replace('__', '_') not in self.query.annotations
+        })
@@ -0,0 +1,129 @@
+from collections import defaultdict
+
+from django.db import models, transaction
+
+from base.models.academic_year import AcademicYear
+from partnership.models.enums.agreement import AgreementStatus
+
+__all__ = ['PartnershipYearCoverage']
+
+
+def get_coverage_rows(years, agreements, academic_years):
+    """
+    Compute the coverage flags of partnerships
+
+    :param years: iterable of (partnership_id, academic_year_id)
+    :param agreements: iterable of (partnership_id, status, start date of
+        the start academic year, end date of the end academic year)
+    :param academic_years: iterable of (id, start_date, end_date)
+    :return: dict of flags by (partnership_id, academic_year_id)
+    """
+    rows = defaultdict(dict)
+    for partnership_id, academic_year_id in years:
+        rows[partnership_id, academic_year_id]['has_year'] = True
+
+    academic_years = list(academic_years)
+    last_end_dates = {}
+    for partnership_id, status, start_date, end_date in agreements:
+        for academic_year_id, year_start_date, year_end_date in academic_years:
+            if start_date <= year_start_date and year_end_date <= end_date:
+                row = rows[partnership_id, academic_year_id]
+                row['has_agreement'] = True
+                if status == AgreementStatus.VALIDATED.name:
+                    row['has_validated_agreement'] = True
+        last_end_dates[partnership_id] = max(
+            end_date, last_end_dates.get(partnership_id, end_date),
+        )
+    for partnership_id, end_date in last_end_dates.items():
+        for academic_year_id, _, year_end_date in academic_years:
+            if year_end_date == end_date:
+                rows[partnership_id, academic_year_id]['is_last_agreement_year'] = True
+    return rows
+
+
+class PartnershipYearCoverageQuerySet(models.QuerySet):
+    def refresh(self, partnership_ids=None):
+        """
+        Recompute the coverage of academic years by partnerships
+
+        :param partnership_ids: restrict the refresh to these partnerships,
+            refresh everything if None
+        :return: the number of rows written
+        """
+        from partnership.models import PartnershipAgreement, PartnershipYear
+
+        existing = self.all()
+        years = PartnershipYear.objects.all()
+        agreements = PartnershipAgreement.objects.all()
+        if partnership_ids is not None:
+            partnership_ids = list(partnership_ids)
+            existing = existing.filter(partnership_id__in=partnership_ids)
+            years = years.filter(partnership_id__in=partnership_ids)
+            agreements = agreements.filter(partnership_id__in=partnership_ids)
+
+        rows = get_coverage_rows(
+            years.values_list('partnership_id', 'academic_year_id').order_by(),
+            agreements.values_list(
+                'partnership_id',
+                'status',
+                'start_academic_year__start_date',
+                'end_academic_year__end_date',
+            ).order_by(),
+            AcademicYear.objects.values_list('pk', 'start_date', 'end_date'),
+        )
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                PartnershipYearCoverage(
+                    partnership_id=partnership_id,
+                    academic_year_id=academic_year_id,
+                    **flags
+                ) for (partnership_id, academic_year_id), flags in rows.items()
+            ], batch_size=1000)
+        return len(created)
+
+    def partnership_ids(self, academic_year, **flags):
+        """
+        Subquery of the partnerships covering an academic year
+
+        :param flags: values of the coverage flags, e.g. has_year=True
+        """
+        return self.filter(academic_year=academic_year, **flags).values('partnership_id')
+
+
+class PartnershipYearCoverage(models.Model):
+    """
+    Couverture d'une année académique par les années et les accords d'un
+    partenariat.
+
+    Une ligne par partenariat et par année académique ayant une année de
+    partenariat ou couverte par un accord, maintenue par les signaux (voir
+    partnership.signals) et reconstruite entièrement par la commande
+    rebuild_partnership_coverage.
+    """
+    partnership = models.ForeignKey(
+        'partnership.Partnership',
+        on_delete=models.CASCADE,
+        related_name='coverage',
+    )
+    academic_year = models.ForeignKey(
+        'base.AcademicYear',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    # The partnership has a PartnershipYear for the academic year
+    has_year = models.BooleanField(default=False)
+    # An agreement, validated or not, covers the academic year
+    has_agreement = models.BooleanField(default=False)
+    has_validated_agreement = models.BooleanField(default=False)
+    # The last agreement of the partnership ends with the academic year
+    is_last_agreement_year = models.BooleanField(default=False)
+
+    objects = PartnershipYearCoverageQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('academic_year', 'partnership')
+
+    def __str__(self):
+        return '{} - {}'.format(self.partnership_id, self.academic_year_id)
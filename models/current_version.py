@@ -0,0 +1,186 @@
+from django.db import models, transaction
+from django.db.models import F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Now
+
+from base.models.entity_version import EntityVersion
+from base.models.entity_version_address import EntityVersionAddress
+
+__all__ = [
+    'EntityCurrentVersion',
+    'OrganizationRootVersion',
+]
+
+
+class EntityCurrentVersionQuerySet(models.QuerySet):
+    def refresh(self, entity_ids=None):
+        """
+        Recompute the latest version of entities
+
+        :param entity_ids: restrict the refresh to these entities, refresh
+            everything if None
+        :return: the number of rows written
+        """
+        existing = self.all()
+        versions = EntityVersion.objects.all()
+        if entity_ids is not None:
+            entity_ids = list(entity_ids)
+            existing = existing.filter(entity_id__in=entity_ids)
+            versions = versions.filter(entity_id__in=entity_ids)
+
+        rows = versions.order_by(
+            'entity_id', '-start_date',
+        ).distinct('entity_id').values(
+            'entity_id',
+            'title',
+            'acronym',
+            'start_date',
+            'end_date',
+            version_id=F('pk'),
+        )
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                EntityCurrentVersion(**row) for row in rows.iterator()
+            ], batch_size=1000)
+        return len(created)
+
+
+class EntityCurrentVersion(models.Model):
+    """
+    Dernière version (par date de début) d'une entité.
+
+    Maintenue par les signaux (voir partnership.signals) et reconstruite
+    entièrement par la commande rebuild_current_versions.
+    """
+    entity = models.OneToOneField(
+        'base.Entity',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='current_version',
+    )
+    version = models.ForeignKey(
+        'base.EntityVersion',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    title = models.CharField(max_length=255)
+    acronym = models.CharField(max_length=20)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True)
+
+    objects = EntityCurrentVersionQuerySet.as_manager()
+
+    def __str__(self):
+        return self.acronym
+
+
+class OrganizationRootVersionQuerySet(models.QuerySet):
+    def refresh(self, organization_ids=None):
+        """
+        Recompute the latest root version of organizations
+
+        :param organization_ids: restrict the refresh to these organizations,
+            refresh everything if None
+        :return: the number of rows written
+        """
+        existing = self.all()
+        versions = EntityVersion.objects.filter(
+            parent__isnull=True,
+            entity__organization__isnull=False,
+        )
+        if organization_ids is not None:
+            organization_ids = list(organization_ids)
+            existing = existing.filter(organization_id__in=organization_ids)
+            versions = versions.filter(entity__organization_id__in=organization_ids)
+
+        rows = versions.annotate(
+            first_start_date=Subquery(EntityVersion.objects.filter(
+                entity__organization=OuterRef('entity__organization_id'),
+                parent__isnull=True,
+            ).values('entity__organization').annotate(
+                first=Min('start_date'),
+            ).values('first')[:1]),
+            address_id=Subquery(EntityVersionAddress.objects.filter(
+                entity_version=OuterRef('pk'),
+            ).values('pk')[:1]),
+        ).order_by(
+            'entity__organization_id', '-start_date',
+        ).distinct('entity__organization_id').values(
+            'entity_id',
+            'title',
+            'acronym',
+            'first_start_date',
+            'start_date',
+            'end_date',
+            'address_id',
+            organization_id=F('entity__organization_id'),
+            version_id=F('pk'),
+            website=F('entity__website'),
+        )
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                OrganizationRootVersion(**row) for row in rows.iterator()
+            ], batch_size=1000)
+        return len(created)
+
+
+class OrganizationRootVersion(models.Model):
+    """
+    Dernière version racine (sans parent) des entités d'une organisation.
+
+    Utilisée pour le site web, les dates et l'adresse de contact des
+    partenaires. Maintenue par les signaux (voir partnership.signals) et
+    reconstruite entièrement par la commande rebuild_current_versions.
+    """
+    organization = models.OneToOneField(
+        'base.Organization',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='root_version',
+    )
+    entity = models.ForeignKey(
+        'base.Entity',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    version = models.ForeignKey(
+        'base.EntityVersion',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    title = models.CharField(max_length=255)
+    acronym = models.CharField(max_length=20)
+    website = models.URLField(max_length=255, null=True)
+    # Start date of the first root version
+    first_start_date = models.DateField(null=True)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True)
+    address = models.ForeignKey(
+        'base.EntityVersionAddress',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+    )
+
+    objects = OrganizationRootVersionQuerySet.as_manager()
+
+    def __str__(self):
+        return self.acronym
+
+    @staticmethod
+    def is_current_q(prefix='', at_date=None):
+        """
+        Q object matching root versions valid at a date (default now)
+
+        :param prefix: path to the OrganizationRootVersion, e.g.
+            organization__root_version__
+        """
+        at_date = at_date or Now()
+        return Q(**{
+            prefix + 'start_date__lte': at_date,
+        }) & (Q(**{
+            prefix + 'end_date__isnull': True,
+        }) | Q(**{
+            prefix + 'end_date__gte': at_date,
+        }))
@@ -0,0 +1,97 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models, transaction
+from django.db.models import OuterRef, Q
+
+from base.models.entity import Entity
+from base.models.entity_version import EntityVersion
+from base.models.enums.organization_type import MAIN
+from base.utils.cte import CTESubquery
+
+__all__ = ['EntityPath']
+
+# Entities of the UCL tree, which may have no organization
+UCL_ENTITIES_Q = Q(organization__isnull=True) | Q(organization__type=MAIN)
+
+
+class EntityPathQuerySet(models.QuerySet):
+    def refresh(self, entity_ids=None):
+        """
+        Recompute the paths of UCL entities
+
+        :param entity_ids: restrict the refresh to these entities, refresh
+            everything if None
+        :return: the number of rows written
+        """
+        existing = self.all()
+        entities = Entity.objects.filter(UCL_ENTITIES_Q)
+        if entity_ids is not None:
+            entity_ids = list(entity_ids)
+            existing = existing.filter(entity_id__in=entity_ids)
+            entities = entities.filter(pk__in=entity_ids)
+
+        paths_qs = EntityVersion.objects.with_acronym_path(
+            entity_id=OuterRef('pk'),
+        )
+        rows = entities.annotate(
+            acronym_path=CTESubquery(paths_qs.values('acronym_path')[:1]),
+            title_path=CTESubquery(paths_qs.values('title_path')[:1]),
+            path_as_string=CTESubquery(
+                paths_qs.values('path_as_string')[:1],
+                output_field=models.TextField(),
+            ),
+        ).filter(acronym_path__isnull=False).values_list(
+            'pk', 'acronym_path', 'title_path', 'path_as_string',
+        )
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                EntityPath(
+                    entity_id=pk,
+                    acronym_path=acronym_path,
+                    title_path=title_path,
+                    path_as_string=path_as_string,
+                ) for pk, acronym_path, title_path, path_as_string in rows.iterator()
+            ], batch_size=1000)
+        return len(created)
+
+    def refresh_tree_of(self, entity_id, acronyms=()):
+        """
+        Recompute the path of an entity and of its descendants
+
+        Descendants are found by the acronym of the entity in their path, the
+        stored one and the new ones given in acronyms.
+        """
+        acronyms = set(acronyms)
+        stored = self.filter(entity_id=entity_id).values_list('acronym_path', flat=True).first()
+        if stored:
+            acronyms.add(stored[-1])
+        entity_ids = {entity_id}
+        if acronyms:
+            entity_ids.update(self.filter(
+                acronym_path__overlap=list(acronyms),
+            ).values_list('entity_id', flat=True))
+        return self.refresh(entity_ids)
+
+
+class EntityPath(models.Model):
+    """
+    Chemin d'une entité UCL dans l'arbre des entités.
+
+    Évite de calculer une requête récursive par ligne pour l'affichage et le
+    tri des entités. Maintenu par les signaux (voir partnership.signals) et
+    reconstruit entièrement par la commande rebuild_entity_paths.
+    """
+    entity = models.OneToOneField(
+        'base.Entity',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='entity_path',
+    )
+    acronym_path = ArrayField(models.CharField(max_length=20))
+    title_path = ArrayField(models.CharField(max_length=255))
+    path_as_string = models.TextField()
+
+    objects = EntityPathQuerySet.as_manager()
+
+    def __str__(self):
+        return self.path_as_string
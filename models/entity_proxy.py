@@ -31,7 +31,6 @@ from django.db import models
 from base.models.entity import Entity
 from base.models.entity_version import EntityVersion
 from base.models.organization import Organization
-from base.utils.cte import CTESubquery
 
 __all__ = ['EntityProxy']
 
@@ -49,33 +48,22 @@ class EntityQuerySet(models.QuerySet):
 
     def with_title(self):
         return self.annotate(
-            title=models.Subquery(
-                self.get_last_version().values('title')[:1]),
+            title=models.F('current_version__title'),
         )
 
     def with_acronym(self):
         return self.annotate(
-            acronym=models.Subquery(
-                self.get_last_version().values('acronym')[:1]),
+            acronym=models.F('current_version__acronym'),
         )
 
     def with_acronym_path(self):
         return self.annotate(
-            acronym_path=CTESubquery(
-                EntityVersion.objects.with_acronym_path(
-                    entity_id=models.OuterRef('pk'),
-                ).values('acronym_path')[:1]
-            ),
+            acronym_path=models.F('entity_path__acronym_path'),
         )
 
     def with_path_as_string(self):
         return self.annotate(
-            path_as_string=CTESubquery(
-                EntityVersion.objects.with_acronym_path(
-                    entity_id=models.OuterRef('pk'),
-                ).values('path_as_string')[:1],
-                output_field=models.TextField()
-            ),
+            path_as_string=models.F('entity_path__path_as_string'),
         )
 
     def only_roots(self, at_date=None):
@@ -94,18 +82,19 @@ class EntityQuerySet(models.QuerySet):
         """UCL entities which have a partnership"""
         return self.filter(partnerships__isnull=False).distinct()
 
+    def search_partners(self, q):
+        """Partner entities matching a search, annotated with search_rank"""
+        from partnership.models import partner_search_lookups
+        search_filter, rank = partner_search_lookups(q, 'partner_search__document')
+        return self.filter(search_filter).annotate(search_rank=rank)
+
     def with_partner_info(self):
-        from .partner.partner import Partner
         return self.annotate(
             partner_name=models.Subquery(Organization.objects.filter(
                 pk=models.OuterRef('organization_id'),
             ).values('name')[:1]),
-            partner_city=models.Subquery(Partner.objects.filter(
-                pk=models.OuterRef('organization__partner__id'),
-            ).annotate_address('city').values('city')[:1]),
-            partner_country=models.Subquery(Partner.objects.filter(
-                pk=models.OuterRef('organization__partner__id'),
-            ).annotate_address('country__name').values('country_name')[:1]),
+            partner_city=models.F('organization__root_version__address__city'),
+            partner_country=models.F('organization__root_version__address__country__name'),
         )
 
 
@@ -129,9 +118,12 @@ class EntityManager(models.Manager.from_queryset(EntityQuerySet)):
 
     def ucl_entities_parents(self):
         """UCL entity parents which children have a partnership"""
-        cte = EntityVersion.objects.with_children(entity__partnerships__isnull=False)
-        qs = cte.queryset().with_cte(cte).values('entity_id')
-        return self.get_queryset().filter(pk__in=qs)
+        from partnership.entity_tree import get_entity_tree
+        tree = get_entity_tree()
+        entity_ids = set()
+        for entity_id in self.get_queryset().ucl_entities().values_list('pk', flat=True):
+            entity_ids.update(tree.ancestors(entity_id))
+        return self.get_queryset().filter(pk__in=entity_ids)
 
 
 class EntityProxy(Entity):
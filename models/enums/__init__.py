@@ -1,8 +1,9 @@
 from .agreement import *
 from .contact import *
+from .export_job import *
 from .media import *
 from .partnership import *
 
 # Prevent polluting the namespace with module names
-for name in ['agreement', 'contact', 'media', 'partnership']:
+for name in ['agreement', 'contact', 'export_job', 'media', 'partnership']:
     del globals()[name]
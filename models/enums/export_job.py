@@ -0,0 +1,10 @@
+from django.utils.translation import gettext_lazy as _
+
+from base.models.utils.utils import ChoiceEnum
+
+
+class ExportJobStatus(ChoiceEnum):
+    PENDING = _('export_pending')
+    RUNNING = _('export_running')
+    DONE = _('export_done')
+    FAILED = _('export_failed')
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import get_language
+
+from partnership.models import ExportJobStatus
+
+__all__ = ['ExportJob']
+
+# Parameters not changing the content of the exported file
+IGNORED_EXPORT_PARAMETERS = ['async']
+
+# Seconds after which an unfinished job is considered lost, its worker
+# having been stopped with its process
+DEFAULT_EXPORT_JOB_TIMEOUT = 60 * 60
+
+
+class ExportJobQuerySet(models.QuerySet):
+    def for_request(self, request):
+        """
+        Get the job exporting the file for this request, creating it if no
+        identical export is available for the current data version
+
+        :return: a tuple (job, created)
+        """
+        from partnership.cache import PARTNERSHIP_DATA, get_data_version
+
+        params = {
+            key: sorted(values)
+            for key, values in request.GET.lists()
+            if key not in IGNORED_EXPORT_PARAMETERS
+        }
+        user = request.user if request.user.is_authenticated else None
+        key = hashlib.sha256(json.dumps([
+            request.path_info,
+            sorted(params.items()),
+            get_language(),
+            get_data_version(PARTNERSHIP_DATA),
+            user and user.pk,
+        ]).encode()).hexdigest()
+
+        self.filter(key=key).fail_stale()
+        job = self.filter(key=key).exclude(
+            status=ExportJobStatus.FAILED.name,
+        ).first()
+        if job is not None:
+            return job, False
+        return self.create(
+            key=key,
+            path=request.path_info,
+            params=params,
+            language=get_language(),
+            user=user,
+        ), True
+
+    def fail_stale(self):
+        """
+        Mark as failed the jobs still pending or running after the
+        PARTNERSHIP_EXPORT_JOB_TIMEOUT setting
+
+        :return: the number of failed jobs
+        """
+        timeout = getattr(settings, 'PARTNERSHIP_EXPORT_JOB_TIMEOUT', DEFAULT_EXPORT_JOB_TIMEOUT)
+        now = timezone.now()
+        return self.filter(
+            status__in=[ExportJobStatus.PENDING.name, ExportJobStatus.RUNNING.name],
+            created__lt=now - timedelta(seconds=timeout),
+        ).update(
+            status=ExportJobStatus.FAILED.name,
+            error='Timed out',
+            finished=now,
+        )
+
+
+class ExportJob(models.Model):
+    """
+    Génération en arrière-plan d'un fichier d'export.
+
+    Le fichier est réutilisé pour les demandes identiques tant que les données
+    ne changent pas.
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    key = models.CharField(max_length=64, db_index=True)
+    # Path resolved by the worker, without the script prefix
+    path = models.CharField(max_length=255)
+    params = models.JSONField(default=dict)
+    language = models.CharField(max_length=10, null=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=ExportJobStatus.choices(),
+        default=ExportJobStatus.PENDING.name,
+    )
+    file = models.FileField(upload_to='partnerships/exports/', null=True)
+    error = models.TextField(default='', blank=True)
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    finished = models.DateTimeField(null=True)
+
+    objects = ExportJobQuerySet.as_manager()
+
+    def __str__(self):
+        return '{} ({})'.format(self.path, self.get_status_display())
+
+    def get_absolute_url(self):
+        return reverse('partnerships:export_job', kwargs={'uuid': self.uuid})
+
+    def get_download_url(self):
+        return reverse('partnerships:export_job_download', kwargs={'uuid': self.uuid})
+
+    @property
+    def is_done(self):
+        return self.status == ExportJobStatus.DONE.name
+
+    def can_be_accessed_by(self, user):
+        return self.user_id is None or self.user_id == user.pk
@@ -0,0 +1,37 @@
+from django.contrib.gis.db.models import PointField
+from django.db import models
+
+__all__ = ['GeocodedAddress']
+
+
+class GeocodedAddressQuerySet(models.QuerySet):
+    def store(self, results):
+        """
+        Keep the geocoding results, replacing the previous ones
+
+        :param results: dict of GeocodingResult by normalized address
+        """
+        self.filter(address__in=list(results)).delete()
+        self.bulk_create([
+            self.model(
+                address=address,
+                location=result.location,
+                results_count=result.count,
+            ) for address, result in results.items()
+        ], batch_size=1000)
+
+
+class GeocodedAddress(models.Model):
+    """
+    Résultat du géocodage d'une adresse, conservé pour ne pas interroger à
+    nouveau le service de géocodage.
+    """
+    address = models.TextField(unique=True)
+    location = PointField(null=True)
+    results_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GeocodedAddressQuerySet.as_manager()
+
+    def __str__(self):
+        return self.address
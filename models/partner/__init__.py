@@ -1,9 +1,11 @@
 try:
     from .entity import *
+    from .location import *
     from .partner import *
+    from .search import *
 
     # Prevent polluting the namespace with module names
-    for name in ['entity', 'partner']:
+    for name in ['entity', 'location', 'partner', 'search']:
         del globals()[name]
 except RuntimeError as e:  # pragma: no cover
     # There's a weird bug when running tests, the test runner seeing a models
@@ -0,0 +1,114 @@
+import math
+
+from django.contrib.gis.db.models import PointField
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, Max, Min
+
+__all__ = ['PartnerLocation', 'MAP_MAX_ZOOM']
+
+# Zoom level of the stored tiles, tiles of lower levels are derived from them
+MAP_MAX_ZOOM = 20
+
+# Latitude limits of the Web Mercator projection
+MAX_LATITUDE = 85.0511287798
+
+
+def get_tile(longitude, latitude, zoom=MAP_MAX_ZOOM):
+    """
+    Web Mercator tile (as used by map libraries) containing a point
+
+    :return: tuple (x, y)
+    """
+    size = 2 ** zoom
+    latitude = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+    x = int((longitude + 180) / 360 * size)
+    y = int((1 - math.asinh(math.tan(latitude)) / math.pi) / 2 * size)
+    return min(max(x, 0), size - 1), min(max(y, 0), size - 1)
+
+
+class PartnerLocationQuerySet(models.QuerySet):
+    def refresh(self, organization_ids=None):
+        """
+        Recompute the location of partners from their contact address
+
+        :param organization_ids: restrict the refresh to the partners of these
+            organizations, refresh everything if None
+        :return: the number of rows written
+        """
+        from partnership.models import Partner
+
+        existing = self.all()
+        partners = Partner.objects.filter(
+            organization__root_version__address__location__isnull=False,
+        )
+        if organization_ids is not None:
+            organization_ids = list(organization_ids)
+            existing = existing.filter(partner__organization_id__in=organization_ids)
+            partners = partners.filter(organization_id__in=organization_ids)
+
+        rows = partners.values_list(
+            'pk', 'organization__root_version__address__location',
+        )
+        locations = []
+        for pk, location in rows.iterator():
+            tile_x, tile_y = get_tile(location.x, location.y)
+            locations.append(PartnerLocation(
+                partner_id=pk,
+                location=location,
+                longitude=location.x,
+                latitude=location.y,
+                tile_x=tile_x,
+                tile_y=tile_y,
+            ))
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create(locations, batch_size=1000)
+        return len(created)
+
+    def clusters(self, zoom):
+        """
+        Group locations by tile of a zoom level
+
+        :return: values with the tile, the number of partners, their center
+            and bounding box, and the id of the lowest partner
+        """
+        divisor = 2 ** (MAP_MAX_ZOOM - zoom)
+        return self.annotate(
+            x=F('tile_x') / divisor,
+            y=F('tile_y') / divisor,
+        ).values('x', 'y').annotate(
+            count=Count('pk'),
+            longitude=Avg('longitude'),
+            latitude=Avg('latitude'),
+            min_longitude=Min('longitude'),
+            min_latitude=Min('latitude'),
+            max_longitude=Max('longitude'),
+            max_latitude=Max('latitude'),
+            partner_id=Min('partner_id'),
+        ).order_by('x', 'y')
+
+
+class PartnerLocation(models.Model):
+    """
+    Position d'un partenaire sur la carte, selon son adresse de contact.
+
+    Indexée spatialement et découpée en tuiles pour regrouper les partenaires
+    par niveau de zoom. Maintenue par les signaux (voir partnership.signals)
+    et reconstruite par la commande rebuild_partner_locations.
+    """
+    partner = models.OneToOneField(
+        'partnership.Partner',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='map_location',
+    )
+    location = PointField()
+    longitude = models.FloatField()
+    latitude = models.FloatField()
+    tile_x = models.IntegerField()
+    tile_y = models.IntegerField()
+
+    objects = PartnerLocationQuerySet.as_manager()
+
+    def __str__(self):
+        return '{}, {}'.format(self.latitude, self.longitude)
@@ -2,7 +2,7 @@ import uuid
 from datetime import date, datetime
 
 from django.db import models
-from django.db.models import Prefetch, Subquery, OuterRef, Q
+from django.db.models import Case, F, Prefetch, Subquery, OuterRef, Q, When
 from django.db.models.functions import Now
 from django.urls import reverse
 from django.utils.functional import cached_property
@@ -12,6 +12,8 @@ from base.models.entity import Entity
 from base.models.entity_version import EntityVersion
 from base.models.entity_version_address import EntityVersionAddress
 from base.models.organization import Organization
+from partnership.models.contact_address import ContactAddressQuerySet
+from partnership.models.current_version import OrganizationRootVersion
 
 __all__ = [
     'Partner',
@@ -44,17 +46,27 @@ class PartnerTag(models.Model):
         return self.value
 
 
-class PartnerQueryset(models.QuerySet):
+class PartnerQueryset(ContactAddressQuerySet):
+    def search(self, q, ranked=False):
+        """
+        Partners matching a search on their names and codes
+
+        :param ranked: annotate search_rank, the similarity of the best
+            matching entity of each partner
+        """
+        from .search import PartnerSearchDocument
+        documents = PartnerSearchDocument.objects.search(q)
+        qs = self.filter(pk__in=documents.values('partner_id'))
+        if ranked:
+            qs = qs.annotate(search_rank=Subquery(
+                documents.filter(partner_id=OuterRef('pk')).order_by('-rank').values('rank')[:1]
+            ))
+        return qs
+
     def annotate_dates(self, filter_value=None):
         qs = self.annotate(
-            start_date=Subquery(EntityVersion.objects.filter(
-                entity__organization=OuterRef('organization_id'),
-                parent__isnull=True,
-            ).order_by('start_date').values('start_date')[:1]),
-            end_date=Subquery(EntityVersion.objects.filter(
-                entity__organization=OuterRef('organization_id'),
-                parent__isnull=True,
-            ).order_by('-start_date').values('end_date')[:1]),
+            start_date=F('organization__root_version__first_start_date'),
+            end_date=F('organization__root_version__end_date'),
         )
         if filter_value:
             return qs.filter(
@@ -67,14 +79,30 @@ class PartnerQueryset(models.QuerySet):
             )
         return qs
 
+    @staticmethod
+    def _current_root_versions(of_datetime):
+        # Latest root version valid at this date, only looked up when the
+        # stored latest root version is not valid yet (or anymore)
+        return EntityVersion.objects.current(of_datetime).filter(
+            entity__organization=OuterRef('organization_id'),
+            parent__isnull=True,
+        ).order_by('-start_date')
+
     def annotate_website(self, of_datetime=None):
         if not of_datetime:
             of_datetime = datetime.now()
         return self.annotate(
-            website=Subquery(EntityVersion.objects.current(of_datetime).filter(
-                entity__organization=OuterRef('organization_id'),
-                parent__isnull=True,
-            ).order_by('-start_date').values('entity__website')[:1]),
+            website=Case(
+                When(
+                    OrganizationRootVersion.is_current_q(
+                        'organization__root_version__', of_datetime,
+                    ),
+                    then=F('organization__root_version__website'),
+                ),
+                default=Subquery(self._current_root_versions(
+                    of_datetime,
+                ).values('entity__website')[:1]),
+            ),
         )
 
     def annotate_address(self, *fields):
@@ -85,28 +113,28 @@ class PartnerQueryset(models.QuerySet):
             If a field contains a traversal, e.g. country__name, it will be
             available as country_name
         """
-        contact_address_qs = EntityVersion.objects.filter(
-            entity__organization=OuterRef('organization'),
-            parent__isnull=True,
-        ).order_by('-start_date')
-        qs = self
-        for field in fields:
-            lookup = Subquery(contact_address_qs.values(
-                'entityversionaddress__{}'.format(field)
-            )[:1])
-            qs = qs.annotate(**{field.replace('__', '_'): lookup})
-        return qs
+        return self._annotate_contact_address(*fields)
 
     def annotate_partnerships_count(self):
         """ Add annotation for partnerships count """
+        now = datetime.now()
         return self.annotate(
-            partnerships_count=Subquery(
-                EntityVersion.objects.current(datetime.now()).filter(
-                    entity__organization=OuterRef('organization_id'),
-                    parent__isnull=True,
-                ).order_by('-start_date').annotate(
+            partnerships_count=Case(
+                When(
+                    OrganizationRootVersion.is_current_q(
+                        'organization__root_version__', now,
+                    ),
+                    then=Subquery(
+                        Entity.objects.filter(
+                            pk=OuterRef('organization__root_version__entity_id'),
+                        ).annotate(
+                            partnership_count=models.Count('partner_of'),
+                        ).values('partnership_count')[:1],
+                    ),
+                ),
+                default=Subquery(self._current_root_versions(now).annotate(
                     partnership_count=models.Count('entity__partner_of'),
-                ).values('partnership_count')[:1],
+                ).values('partnership_count')[:1]),
                 output_field=models.IntegerField(),
             ),
         )
@@ -311,7 +339,7 @@ class Partner(models.Model):
                 'media',
                 Prefetch(
                     'partnership',
-                    queryset=Partnership.objects.add_acronyms()
+                    queryset=Partnership.objects.add_acronyms().annotate_display()
                 ),
             )
         )
@@ -0,0 +1,186 @@
+from collections import defaultdict
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import models, transaction
+from django.db.models import Q
+
+from base.models.entity import Entity
+from partnership.utils import blocking_keys, normalize_search_text
+
+__all__ = ['PartnerBlockingKey', 'PartnerSearchDocument', 'partner_search_lookups']
+
+
+def partner_search_lookups(q, path='document'):
+    """
+    Filter and rank a search on a document, accents and case being ignored
+
+    :param path: path to the document field, e.g. 'partner_search__document'
+    :return: tuple (Q object, similarity expression)
+    """
+    q = normalize_search_text(q)
+    return Q(**{path + '__contains': q}), TrigramWordSimilarity(q, path)
+
+
+class PartnerSearchDocumentQuerySet(models.QuerySet):
+    def search(self, q):
+        """
+        Documents containing the search, ranked by similarity
+        """
+        search_filter, rank = partner_search_lookups(q)
+        return self.filter(search_filter).annotate(rank=rank)
+
+    def refresh(self, entity_ids=None):
+        """
+        Recompute the search documents of partner entities
+
+        :param entity_ids: restrict the refresh to these entities, refresh
+            everything if None
+        :return: the number of rows written
+        """
+        from partnership.models import Partner
+
+        existing = self.all()
+        entities = Entity.objects.filter(organization__partner__isnull=False)
+        if entity_ids is not None:
+            entity_ids = list(entity_ids)
+            existing = existing.filter(entity_id__in=entity_ids)
+            entities = entities.filter(pk__in=entity_ids)
+        rows = list(entities.values_list(
+            'pk',
+            'organization__partner__id',
+            'organization__name',
+            'organization__code',
+            'organization__partner__erasmus_code',
+            'organization__partner__pic_code',
+            'partnerentity__name',
+        ))
+
+        former_names = defaultdict(list)
+        for partner_id, name in Partner.objects.filter(
+            now_known_as_id__in={row[1] for row in rows},
+        ).values_list('now_known_as_id', 'organization__name'):
+            former_names[partner_id].append(name)
+
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                PartnerSearchDocument(
+                    entity_id=pk,
+                    partner_id=partner_id,
+                    document=normalize_search_text(' '.join(
+                        value for value in [*values, *former_names[partner_id]] if value
+                    )),
+                ) for pk, partner_id, *values in rows
+            ], batch_size=1000)
+        return len(created)
+
+    def refresh_partners(self, partner_ids):
+        """
+        Recompute the documents of the entities of partners
+        """
+        from partnership.models import Partner
+
+        partner_ids = set(partner_ids)
+        if not partner_ids:
+            return 0
+        # Former names are in the documents of the partner now known as
+        partner_ids.update(Partner.objects.filter(
+            pk__in=partner_ids,
+            now_known_as__isnull=False,
+        ).values_list('now_known_as_id', flat=True))
+        return self.refresh(Entity.objects.filter(
+            organization__partner__in=partner_ids,
+        ).values_list('pk', flat=True))
+
+
+class PartnerSearchDocument(models.Model):
+    """
+    Texte de recherche d'une entité partenaire.
+
+    Regroupe sans accents les noms, codes et anciens noms du partenaire, pour
+    une recherche indexée par trigrammes. Maintenu par les signaux (voir
+    partnership.signals) et reconstruit par la commande
+    rebuild_partner_search.
+    """
+    entity = models.OneToOneField(
+        'base.Entity',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='partner_search',
+    )
+    partner = models.ForeignKey(
+        'partnership.Partner',
+        on_delete=models.CASCADE,
+        related_name='search_documents',
+    )
+    document = models.TextField()
+
+    objects = PartnerSearchDocumentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=['document'],
+                name='partner_search_document_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return self.document
+
+
+class PartnerBlockingKeyQuerySet(models.QuerySet):
+    def refresh(self, partner_ids=None):
+        """
+        Recompute the blocking keys of partners
+
+        :param partner_ids: restrict the refresh to these partners, refresh
+            everything if None
+        :return: the number of rows written
+        """
+        from partnership.models import Partner
+
+        existing = self.all()
+        partners = Partner.objects.all()
+        if partner_ids is not None:
+            partner_ids = list(partner_ids)
+            existing = existing.filter(partner_id__in=partner_ids)
+            partners = partners.filter(pk__in=partner_ids)
+        rows = partners.values_list(
+            'pk', 'organization__name', 'erasmus_code', 'pic_code',
+        )
+        with transaction.atomic():
+            existing.delete()
+            created = self.bulk_create([
+                PartnerBlockingKey(partner_id=pk, key=key)
+                for pk, name, erasmus_code, pic_code in rows.iterator()
+                for key in blocking_keys(name, erasmus_code, pic_code)
+            ], batch_size=1000)
+        return len(created)
+
+
+class PartnerBlockingKey(models.Model):
+    """
+    Clé de regroupement d'un partenaire pour la détection de doublons.
+
+    Seuls les partenaires partageant une clé (mot distinctif du nom, code
+    erasmus ou PIC) sont comparés entre eux. Maintenu par les signaux (voir
+    partnership.signals) et reconstruit par la commande
+    rebuild_partner_search.
+    """
+    partner = models.ForeignKey(
+        'partnership.Partner',
+        on_delete=models.CASCADE,
+        related_name='blocking_keys',
+    )
+    key = models.CharField(max_length=255, db_index=True)
+
+    objects = PartnerBlockingKeyQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('partner', 'key')
+
+    def __str__(self):
+        return self.key
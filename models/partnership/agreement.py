@@ -3,14 +3,16 @@ from django.db import models
 from django.db.models import OuterRef, Subquery
 from django.utils.translation import gettext_lazy as _, pgettext_lazy
 
-from base.models.entity_version import EntityVersion
 from base.models.organization import Organization
 from partnership.models import AgreementStatus
+from partnership.models.contact_address import ContactAddressQuerySet
 
 __all__ = ['PartnershipAgreement']
 
 
-class PartnershipAgreementQuerySet(models.QuerySet):
+class PartnershipAgreementQuerySet(ContactAddressQuerySet):
+    contact_address_organization_path = 'partnership__partner_entities__organization'
+
     def annotate_partner_address(self, *fields):
         """
         Add annotations on partner contact address
@@ -19,17 +21,7 @@ class PartnershipAgreementQuerySet(models.QuerySet):
             If a field contains a traversal, e.g. country__name, it will be
             available as country_name
         """
-        contact_address_qs = EntityVersion.objects.filter(
-            entity__organization=OuterRef('partnership__partner_entities__organization'),
-            parent__isnull=True,
-        ).order_by('-start_date')
-        qs = self
-        for field in fields:
-            lookup = Subquery(contact_address_qs.values(
-                'entityversionaddress__{}'.format(field)
-            )[:1])
-            qs = qs.annotate(**{field.replace('__', '_'): lookup})
-        return qs
+        return self._annotate_contact_address(*fields)
 
     def annotate_partner_name(self):
         """Add annotation on partner name"""
@@ -2,7 +2,9 @@ import uuid
 
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Max, Min, Prefetch
+from django.db.models import Count, Max, Min, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.query import ModelIterable
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -10,8 +12,6 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _, pgettext_lazy
 
-from base.models.entity_version import EntityVersion
-from base.utils.cte import CTESubquery
 from partnership.models import (
     AgreementStatus,
     PartnershipType, )
@@ -39,23 +39,63 @@ class PartnershipTag(models.Model):
         return self.value
 
 
+# Annotations of PartnershipQuerySet.annotate_display(), used by __str__()
+DISPLAY_ANNOTATIONS = ('num_partners', 'first_partner_name')
+
+# Number of partnerships whose display values are loaded together
+DISPLAY_BATCH_SIZE = 100
+
+
+class PartnershipIterable(ModelIterable):
+    """
+    Share a batch between the fetched partnerships, so that the display
+    values missing on one of them are loaded for all of them
+    """
+
+    def __iter__(self):
+        batch = []
+        for obj in super().__iter__():
+            if len(batch) == DISPLAY_BATCH_SIZE:
+                batch = []
+            batch.append(obj)
+            obj._display_batch = batch
+            yield obj
+
+
 class PartnershipQuerySet(models.QuerySet):
-    def add_acronyms(self):
-        ref = models.OuterRef('ucl_entity_id')
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._iterable_class = PartnershipIterable
 
+    def annotate_display(self):
+        """
+        Add the number of partners and the name of the first one, used to
+        display partnerships
+        """
+        from partnership.models import PartnershipPartnerRelation
+        relations = PartnershipPartnerRelation.objects.filter(
+            partnership_id=OuterRef('pk'),
+        ).order_by()
         return self.annotate(
-            acronym_path=CTESubquery(
-                EntityVersion.objects.with_acronym_path(
-                    entity_id=ref
-                ).values('acronym_path')[:1]
+            num_partners=Coalesce(
+                Subquery(
+                    relations.values('partnership_id').annotate(
+                        count=Count('pk'),
+                    ).values('count'),
+                ),
+                0,
             ),
-            title_path=CTESubquery(
-                EntityVersion.objects.with_acronym_path(
-                    entity_id=ref
-                ).values('title_path')[:1]
+            first_partner_name=Subquery(
+                relations.values('entity__organization__name')[:1]
             ),
         )
 
+    def add_acronyms(self):
+        return self.annotate(
+            acronym_path=models.F('ucl_entity__entity_path__acronym_path'),
+            title_path=models.F('ucl_entity__entity_path__title_path'),
+        )
+
     def for_validity_end(self):
         from .agreement import PartnershipAgreement
         from .partnership_year import PartnershipYear
@@ -80,16 +120,7 @@ class PartnershipQuerySet(models.QuerySet):
 
 
 class PartnershipManager(models.Manager.from_queryset(PartnershipQuerySet)):
-    def get_queryset(self):
-        from partnership.models import PartnershipPartnerRelation
-        return super().get_queryset().annotate(
-            num_partners=models.Count('partner_entities'),
-            first_partner_name=models.Subquery(
-                PartnershipPartnerRelation.objects.filter(
-                    partnership_id=models.OuterRef('pk')
-                ).values('entity__organization__name')[:1]
-            ),
-        )
+    pass
 
 
 class Partnership(models.Model):
@@ -242,7 +273,7 @@ class Partnership(models.Model):
         base_manager_name = 'objects'
 
     def __str__(self):
-        if not hasattr(self, 'num_partners'):
+        if self.pk is None:
             # This is the case when using factory-boy, just return a string
             return 'Missing annotation'
         # When having multiple partner entities (from annotation), take project_acronym
@@ -259,6 +290,42 @@ class Partnership(models.Model):
             partner=self.first_partner_name,
         )
 
+    def __getattr__(self, name):
+        # Only called for missing attributes: load the display values if not
+        # annotated, for the whole batch the partnership was fetched with
+        if name not in DISPLAY_ANNOTATIONS or self.__dict__.get('id') is None:
+            raise AttributeError(name)
+        self.load_display_values(self.__dict__.get('_display_batch', [self]))
+        if name not in self.__dict__:
+            # Not found in the database, e.g. deleted meanwhile
+            raise AttributeError(name)
+        return self.__dict__[name]
+
+    def __getstate__(self):
+        # Do not pickle the other partnerships of the batch
+        state = super().__getstate__()
+        state.pop('_display_batch', None)
+        return state
+
+    @classmethod
+    def load_display_values(cls, partnerships):
+        """
+        Set the annotations of annotate_display() on the partnerships missing
+        them, with a single query
+        """
+        missing = {
+            partnership.pk: partnership for partnership in partnerships
+            if partnership.pk is not None and 'num_partners' not in partnership.__dict__
+        }
+        if not missing:
+            return
+        rows = cls.objects.filter(pk__in=list(missing)).annotate_display().values_list(
+            'pk', *DISPLAY_ANNOTATIONS,
+        )
+        for pk, num_partners, first_partner_name in rows:
+            missing[pk].num_partners = num_partners
+            missing[pk].first_partner_name = first_partner_name
+
     def get_absolute_url(self):
         return reverse('partnerships:detail', kwargs={'pk': self.pk})
 
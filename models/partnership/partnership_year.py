@@ -1,11 +1,10 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
-from django.db.models import OuterRef, Subquery
+from django.db.models import F
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from ordered_model.models import OrderedModel
 
-from base.models.entity_version import EntityVersion
 from ..enums.partnership import PartnershipType, PartnershipDiplomaWithUCL, PartnershipProductionSupplement, \
     PartnershipFlowDirection
 
@@ -179,18 +178,8 @@ class PartnershipYear(models.Model):
 
     def get_entities_with_titles(self):
         return self.entities.annotate(
-            most_recent_acronym=Subquery(
-                EntityVersion.objects
-                    .filter(entity=OuterRef('pk'))
-                    .order_by('-start_date')
-                    .values('acronym')[:1]
-            ),
-            most_recent_title=Subquery(
-                EntityVersion.objects
-                    .filter(entity=OuterRef('pk'))
-                    .order_by('-start_date')
-                    .values('title')[:1]
-            ),
+            most_recent_acronym=F('current_version__acronym'),
+            most_recent_title=F('current_version__title'),
         )
 
     def get_financing(self):
@@ -1,24 +1,20 @@
 from django.db import models
-from django.db.models import OuterRef, Subquery, Q
-from django.db.models.functions import Now
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Concat, Now, Right
 
-from base.models.entity_version import EntityVersion
-from base.utils.cte import CTESubquery
+from base.models.academic_year import AcademicYear
 from partnership.models import Financing, AgreementStatus, PartnershipType
+from partnership.models.contact_address import ContactAddressQuerySet
 
 __all__ = ['PartnershipPartnerRelation']
 
 
-class PartnershipPartnerRelationQuerySet(models.QuerySet):
-    def add_acronym_path(self):
-        ref = models.OuterRef('partnership__ucl_entity_id')
+class PartnershipPartnerRelationQuerySet(ContactAddressQuerySet):
+    contact_address_organization_path = 'entity__organization'
 
+    def add_acronym_path(self):
         return self.annotate(
-            acronym_path=CTESubquery(
-                EntityVersion.objects.with_acronym_path(
-                    entity_id=ref
-                ).values('acronym_path')[:1]
-            ),
+            acronym_path=F('partnership__ucl_entity__entity_path__acronym_path'),
         )
 
     def annotate_partner_address(self, *fields):
@@ -29,59 +25,92 @@ class PartnershipPartnerRelationQuerySet(models.QuerySet):
             If a field contains a traversal, e.g. country__name, it will be
             available as country_name
         """
-        contact_address_qs = EntityVersion.objects.filter(
-            entity__organization=OuterRef('entity__organization'),
-            parent__isnull=True,
-        ).order_by('-start_date')
-        qs = self
-        for field in fields:
-            lookup = Subquery(contact_address_qs.values(
-                'entityversionaddress__{}'.format(field)
-            )[:1])
-            qs = qs.annotate(**{field.replace('__', '_'): lookup})
-        return qs
-
-    def annotate_financing(self, academic_year):
+        return self._annotate_contact_address(*fields)
+
+    def annotate_api_values(self, academic_year):
         """
-        Add annotations to get funding for an academic year based on country
+        Add annotations needed by the public API for an academic year
+
+        Those values are stored in PartnershipApiSnapshot, prefer using
+        from_api_snapshot() when reading them.
         """
-        return self.annotate(
-            financing_source=Subquery(Financing.objects.filter(
-                countries=OuterRef('country_id'),
-                academic_year=academic_year,
-            ).values('type__program__source__name')[:1]),
-            financing_program=Subquery(Financing.objects.filter(
-                countries=OuterRef('country_id'),
-                academic_year=academic_year,
-            ).values('type__program__name')[:1]),
-            financing_type=Subquery(Financing.objects.filter(
-                countries=OuterRef('country_id'),
-                academic_year=academic_year,
-            ).values('type__name')[:1]),
+        from partnership.models import PartnershipYear
+        academic_year_repr = Concat(
+            Cast(F('academic_year__year'), models.CharField()),
+            Value('-'),
+            Right(
+                Cast(
+                    F('academic_year__year') + 1,
+                    output_field=models.CharField()
+                ),
+                2
+            ),
         )
-
-    def filter_for_api(self, academic_year):
-        from partnership.models import PartnershipYear, PartnershipAgreement
-        return self.annotate(
-            current_academic_year=models.Value(
-                academic_year.id, output_field=models.AutoField()
+        return self.annotate_partner_address(
+            'country__continent__name',
+            'country__iso_code',
+            'country__name',
+            'country_id',
+            'city',
+            'location',
+        ).annotate(
+            **self._api_coverage_annotations(academic_year),
+            validity_end_year=Subquery(
+                AcademicYear.objects
+                .filter(
+                    partnership_agreements_end__partnership=OuterRef('partnership_id'),
+                    partnership_agreements_end__status=AgreementStatus.VALIDATED.name
+                )
+                .order_by('-end_date')
+                .values('year')[:1]
             ),
-        ).alias(
-            has_years_in=models.Exists(
+            start_year=Subquery(
                 PartnershipYear.objects.filter(
                     partnership=OuterRef('partnership_id'),
-                    academic_year=academic_year,
-                )
+                ).annotate(
+                    name=academic_year_repr
+                ).order_by('academic_year').values('name')[:1]
             ),
-            has_valid_agreement_in_current_year=models.Exists(
-                PartnershipAgreement.objects.filter(
+            end_year=Subquery(
+                PartnershipYear.objects.filter(
                     partnership=OuterRef('partnership_id'),
-                    status=AgreementStatus.VALIDATED.name,
-                    start_academic_year__year__lte=academic_year.year,
-                    end_academic_year__year__gte=academic_year.year,
-                )
+                ).annotate(
+                    name=academic_year_repr
+                ).order_by('-academic_year').values('name')[:1]
             ),
-        ).filter(
+            agreement_end=self._agreement_end_annotation(),
+            funding_name=Subquery(
+                Financing.objects.filter(
+                    academic_year=academic_year,
+                    countries=OuterRef('country_id'),
+                ).values('type__name')[:1]
+            ),
+            funding_url=Subquery(
+                Financing.objects.filter(
+                    academic_year=academic_year,
+                    countries=OuterRef('country_id'),
+                ).values('type__url')[:1]
+            ),
+        )
+
+    @staticmethod
+    def _agreement_end_annotation():
+        """
+        End of the agreement running today, not stored in the snapshot as it
+        depends on the current date
+        """
+        from partnership.models import PartnershipAgreement
+        return Subquery(
+            PartnershipAgreement.objects.filter(
+                partnership=OuterRef('partnership_id'),
+                start_date__lte=Now(),
+                end_date__gte=Now(),
+            ).order_by('-end_date').values('end_date')[:1]
+        )
+
+    @staticmethod
+    def _api_visibility_filter():
+        return Q(
             # If mobility, should have agreement for current year
             # and have a partnership year for current year
             Q(
@@ -98,6 +127,46 @@ class PartnershipPartnerRelationQuerySet(models.QuerySet):
             partnership__is_public=True,
         )
 
+    @staticmethod
+    def _api_coverage_annotations(academic_year):
+        from partnership.models import PartnershipYearCoverage
+        coverage = PartnershipYearCoverage.objects.filter(
+            partnership=OuterRef('partnership_id'),
+            academic_year=academic_year,
+        )
+        return {
+            'has_years_in': models.Exists(coverage.filter(has_year=True)),
+            'has_valid_agreement_in_current_year': models.Exists(
+                coverage.filter(has_validated_agreement=True),
+            ),
+        }
+
+    def filter_for_api(self, academic_year):
+        return self.annotate(
+            current_academic_year=models.Value(
+                academic_year.id, output_field=models.AutoField()
+            ),
+        ).alias(
+            **self._api_coverage_annotations(academic_year),
+        ).filter(self._api_visibility_filter())
+
+    def from_api_snapshot(self, academic_year):
+        """
+        Same as filter_for_api() followed by annotate_api_values(), but reading
+        the precomputed values from PartnershipApiSnapshot
+        """
+        from partnership.models.api_snapshot import API_SNAPSHOT_FIELDS
+        return self.annotate(
+            current_academic_year=models.Value(
+                academic_year.id, output_field=models.AutoField()
+            ),
+            **{field: F('api_snapshot__{}'.format(field)) for field in API_SNAPSHOT_FIELDS},
+            agreement_end=self._agreement_end_annotation(),
+        ).filter(
+            self._api_visibility_filter(),
+            api_snapshot__academic_year=academic_year,
+        )
+
 
 class PartnershipPartnerRelation(models.Model):
     """
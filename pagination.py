@@ -0,0 +1,339 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404, JsonResponse
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from partnership.cache import PARTNERSHIP_DATA, get_data_version
+
+# Query parameters of the keyset pagination
+CURSOR_QUERY_PARAM = 'cursor'
+COUNT_QUERY_PARAM = 'count'
+
+# Annotations holding the ordering values of each row
+KEYSET_ANNOTATION = '_keyset_{}'
+
+COUNT_CACHE_KEY = 'partnership_count_{version}_{query}'
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def get_count_queryset(queryset):
+    """
+    Queryset only selecting the distinct primary keys, without the ordering
+    and the annotations not needed by the filters
+    """
+    count_queryset = queryset.order_by().values('pk')
+    if queryset.query.distinct:
+        # Distinct on the primary keys only, whatever the distinct fields
+        count_queryset = count_queryset.distinct()
+    return count_queryset
+
+
+def estimate_count(queryset):
+    """
+    Number of rows estimated by the PostgreSQL planner, without running the
+    query
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def get_count(queryset):
+    """
+    Count the rows of a filtered list, cached until the partnership data
+    changes
+
+    Above the PARTNERSHIP_COUNT_ESTIMATE_THRESHOLD setting (disabled by
+    default), the count is estimated by the planner instead.
+    """
+    count_queryset = get_count_queryset(queryset)
+    sql, params = count_queryset.query.sql_with_params()
+    key = COUNT_CACHE_KEY.format(
+        version=get_data_version(PARTNERSHIP_DATA),
+        query=hashlib.sha256(repr((sql, params)).encode()).hexdigest(),
+    )
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    threshold = getattr(settings, 'PARTNERSHIP_COUNT_ESTIMATE_THRESHOLD', None)
+    if threshold is not None:
+        estimate = estimate_count(count_queryset)
+        if estimate > threshold:
+            # Not cached: estimates are cheap and change with the statistics
+            return estimate
+
+    count = count_queryset.count()
+    cache.set(key, count, timeout=COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginator of the list views, counting the rows with get_count()
+    """
+
+    @cached_property
+    def count(self):
+        return get_count(self.object_list)
+
+
+class CountingLimitOffsetPagination(LimitOffsetPagination):
+    """
+    DRF pagination counting the rows with get_count()
+    """
+
+    def get_count(self, queryset):
+        return get_count(queryset)
+
+
+def encode_cursor(values, backwards=False):
+    data = json.dumps([values, backwards], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    :return: tuple (ordering values, backwards)
+    """
+    try:
+        values, backwards = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, bool(backwards)
+
+
+def get_keyset_ordering(queryset):
+    """
+    Ordering of a queryset, ended by the primary key so that each row has a
+    distinct position
+
+    :return: list of (field, descending)
+    """
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not all(isinstance(field, str) and field != '?' for field in ordering):
+        # Expressions can not be read back from the rows
+        ordering = []
+    fields = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+    pk_names = {'pk', queryset.model._meta.pk.name}
+    if not any(field in pk_names for field, _ in fields):
+        fields.append(('pk', False))
+    return fields
+
+
+def keyset_filter(fields, values):
+    """
+    Condition on the rows coming after the given ordering values, nulls being
+    last in ascending order and first in descending order (as PostgreSQL does)
+
+    :param fields: list of (field, descending)
+    """
+    condition = None
+    same = Q()
+    for (field, descending), value in zip(fields, values):
+        if value is None:
+            after = Q(**{'{}__isnull'.format(field): False}) if descending else None
+            equal = Q(**{'{}__isnull'.format(field): True})
+        else:
+            lookup = '{}__lt' if descending else '{}__gt'
+            after = Q(**{lookup.format(field): value})
+            if not descending:
+                after |= Q(**{'{}__isnull'.format(field): True})
+            equal = Q(**{field: value})
+        if after is not None:
+            condition = same & after if condition is None else condition | (same & after)
+        same &= equal
+    return condition if condition is not None else Q(pk__in=[])
+
+
+class KeysetPage:
+    """
+    Page of a queryset starting after (or ending before) the row of a
+    cursor, which does not require to read the previous rows like an offset
+    """
+
+    def __init__(self, queryset, cursor, page_size):
+        fields = get_keyset_ordering(queryset)
+        values, backwards = decode_cursor(cursor) if cursor else (None, False)
+        if values is not None and len(values) != len(fields):
+            raise InvalidCursor(cursor)
+
+        # Going backwards reverses the ordering, then the rows
+        fields_in_query = [
+            (field, descending != backwards) for field, descending in fields
+        ]
+        queryset = queryset.order_by(*[
+            '-' + field if descending else field
+            for field, descending in fields_in_query
+        ]).annotate(**{
+            KEYSET_ANNOTATION.format(i): F(field)
+            for i, (field, _) in enumerate(fields)
+        })
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(fields_in_query, values))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+        self.object_list = rows
+        self.field_count = len(fields)
+
+        if backwards:
+            self.has_previous = has_more
+            self.has_next = bool(rows)
+        else:
+            self.has_previous = values is not None and bool(rows)
+            self.has_next = has_more
+
+    def get_values(self, obj):
+        return [
+            getattr(obj, KEYSET_ANNOTATION.format(i))
+            for i in range(self.field_count)
+        ]
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            return encode_cursor(self.get_values(self.object_list[-1]))
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            return encode_cursor(self.get_values(self.object_list[0]), backwards=True)
+        return None
+
+
+def is_count_requested(params):
+    return params.get(COUNT_QUERY_PARAM, '').lower() in ['1', 'true']
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination with opaque cursors, the total count being only computed
+    if requested with the count parameter
+    """
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE or 20
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = KeysetPage(
+                queryset,
+                request.query_params.get(CURSOR_QUERY_PARAM),
+                self.page_size,
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        self.count = get_count(queryset) if is_count_requested(request.query_params) else None
+        return self.page.object_list
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, CURSOR_QUERY_PARAM, cursor)
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetPaginationAPIMixin:
+    """
+    Use the keyset pagination in a DRF list view when a cursor parameter is
+    given, even empty for the first page
+    """
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and CURSOR_QUERY_PARAM in self.request.query_params:
+            self._paginator = KeysetPagination()
+        return super().paginator
+
+
+class KeysetPaginationMixin:
+    """
+    Same as KeysetPaginationAPIMixin for list views rendering JSON with
+    SearchMixin, the response having object_list, next and previous cursors
+    and total if the count is requested
+    """
+
+    def is_keyset_paginated(self):
+        return (
+            "application/json" in self.request.headers.get("Accept", "")
+            and CURSOR_QUERY_PARAM in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_keyset_paginated():
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = KeysetPage(queryset, self.request.GET.get(CURSOR_QUERY_PARAM), page_size)
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        self.keyset_count = get_count(queryset) if is_count_requested(self.request.GET) else None
+        return None, page, page.object_list, page.has_next or page.has_previous
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.is_keyset_paginated() or not context.get('page_obj'):
+            return super().render_to_response(context, **response_kwargs)
+        page = context['page_obj']
+        serializer = self.serializer_class(
+            page.object_list,
+            context={'request': self.request},
+            many=True,
+        )
+        data = {
+            'object_list': serializer.data,
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        }
+        if self.keyset_count is not None:
+            data['total'] = self.keyset_count
+        return JsonResponse(data)
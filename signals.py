@@ -0,0 +1,257 @@
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from base.models.entity import Entity
+from base.models.entity_version import EntityVersion
+from base.models.entity_version_address import EntityVersionAddress
+from base.models.organization import Organization
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version
+from partnership.entity_tree import ENTITY_TREE_DATA
+from partnership.financings import FINANCING_DATA
+from partnership.models import (
+    EntityCurrentVersion,
+    EntityPath,
+    ExportJob,
+    Financing,
+    FundingProgram,
+    FundingSource,
+    FundingType,
+    GeocodedAddress,
+    OrganizationRootVersion,
+    Partner,
+    PartnerBlockingKey,
+    PartnerEntity,
+    PartnerLocation,
+    PartnerSearchDocument,
+    Partnership,
+    PartnershipAgreement,
+    PartnershipApiSnapshot,
+    PartnershipConfiguration,
+    PartnershipPartnerRelation,
+    PartnershipYear,
+    PartnershipYearCoverage,
+)
+from partnership.models.entity_path import UCL_ENTITIES_Q
+from reference.models.continent import Continent
+from reference.models.country import Country
+
+
+# Models outside of the app whose data is displayed or exported
+EXTERNAL_DATA_MODELS = (
+    Continent,
+    Country,
+    Entity,
+    EntityVersion,
+    EntityVersionAddress,
+    Organization,
+)
+
+# Tables computed from the others or not holding data
+DERIVED_MODELS = (
+    EntityCurrentVersion,
+    EntityPath,
+    ExportJob,
+    GeocodedAddress,
+    OrganizationRootVersion,
+    PartnerBlockingKey,
+    PartnerLocation,
+    PartnerSearchDocument,
+    PartnershipApiSnapshot,
+    PartnershipYearCoverage,
+)
+
+
+def refresh_api_snapshot(partnership_ids):
+    partnership_ids = set(partnership_ids)
+    if partnership_ids:
+        PartnershipApiSnapshot.objects.refresh(partnership_ids)
+
+
+def partnerships_of_organizations(organization_ids):
+    return PartnershipPartnerRelation.objects.filter(
+        entity__organization_id__in=organization_ids,
+    ).values_list('partnership_id', flat=True)
+
+
+def partnerships_of_countries(country_ids):
+    return PartnershipApiSnapshot.objects.filter(
+        country_id__in=country_ids,
+    ).values_list('relation__partnership_id', flat=True)
+
+
+def data_changed(sender, **kwargs):
+    # Invalidate what is cached for the current data version, e.g. exports
+    bump_data_version(PARTNERSHIP_DATA)
+
+
+# Connected to each model rather than to all senders, so that other models
+# keep their fast deletes
+for model in [
+    *apps.get_app_config('partnership').get_models(include_auto_created=True),
+    *EXTERNAL_DATA_MODELS,
+]:
+    if model not in DERIVED_MODELS:
+        for signal in [post_save, post_delete, m2m_changed]:
+            signal.connect(data_changed, sender=model)
+
+
+@receiver(post_save, sender=PartnershipConfiguration)
+def configuration_changed(sender, instance, **kwargs):
+    # The API year may have changed, rebuild everything
+    PartnershipApiSnapshot.objects.refresh()
+
+
+@receiver(post_save, sender=Partnership)
+def partnership_changed(sender, instance, **kwargs):
+    refresh_api_snapshot([instance.pk])
+
+
+# Connected before partnership_child_changed, the coverage being read when
+# refreshing the API snapshot
+@receiver([post_save, post_delete], sender=PartnershipYear)
+@receiver([post_save, post_delete], sender=PartnershipAgreement)
+def partnership_coverage_changed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Partnership) or getattr(origin, 'model', None) is Partnership:
+        # Deleted with its partnership, and so is its coverage
+        return
+    PartnershipYearCoverage.objects.refresh([instance.partnership_id])
+
+
+@receiver([post_save, post_delete], sender=PartnershipYear)
+@receiver([post_save, post_delete], sender=PartnershipAgreement)
+@receiver([post_save, post_delete], sender=PartnershipPartnerRelation)
+def partnership_child_changed(sender, instance, **kwargs):
+    refresh_api_snapshot([instance.partnership_id])
+
+
+@receiver(m2m_changed, sender=Partnership.partner_entities.through)
+def partner_entities_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+    if not reverse:
+        refresh_api_snapshot([instance.pk])
+    elif pk_set:
+        refresh_api_snapshot(pk_set)
+    else:
+        refresh_api_snapshot(partnerships_of_organizations([instance.organization_id]))
+
+
+@receiver([post_save, post_delete], sender=Financing)
+@receiver([post_save, post_delete], sender=FundingType)
+@receiver([post_save, post_delete], sender=FundingProgram)
+@receiver([post_save, post_delete], sender=FundingSource)
+@receiver(m2m_changed, sender=Financing.countries.through)
+def financing_data_changed(sender, **kwargs):
+    # Invalidate the financing lookup
+    bump_data_version(FINANCING_DATA)
+
+
+@receiver(pre_delete, sender=Financing)
+def financing_deleting(sender, instance, **kwargs):
+    # Keep the countries before they are deleted with the financing
+    instance._deleted_country_ids = list(instance.countries.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Financing)
+@receiver(post_delete, sender=Financing)
+def financing_changed(sender, instance, **kwargs):
+    country_ids = getattr(instance, '_deleted_country_ids', None)
+    if country_ids is None:
+        country_ids = instance.countries.values_list('pk', flat=True)
+    refresh_api_snapshot(partnerships_of_countries(country_ids))
+
+
+@receiver(m2m_changed, sender=Financing.countries.through)
+def financing_countries_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Keep the countries before they are removed
+        if reverse:
+            instance._cleared_country_ids = [instance.pk]
+        else:
+            instance._cleared_country_ids = list(instance.countries.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        country_ids = getattr(instance, '_cleared_country_ids', [])
+        refresh_api_snapshot(partnerships_of_countries(country_ids))
+    elif action in ['post_add', 'post_remove']:
+        country_ids = [instance.pk] if reverse else pk_set
+        refresh_api_snapshot(partnerships_of_countries(country_ids))
+
+
+@receiver(post_save, sender=FundingType)
+def funding_type_changed(sender, instance, **kwargs):
+    country_ids = Financing.countries.through.objects.filter(
+        financing__type=instance,
+    ).values_list('country_id', flat=True)
+    refresh_api_snapshot(partnerships_of_countries(country_ids))
+
+
+@receiver([post_save, post_delete], sender=EntityVersion)
+def entity_version_changed(sender, instance, **kwargs):
+    organization_ids = list(Entity.objects.filter(
+        pk=instance.entity_id,
+    ).values_list('organization_id', flat=True))
+    EntityCurrentVersion.objects.refresh([instance.entity_id])
+    if Entity.objects.filter(UCL_ENTITIES_Q, pk=instance.entity_id).exists():
+        # The UCL entity tree changed
+        EntityPath.objects.refresh_tree_of(instance.entity_id, [instance.acronym])
+        bump_data_version(ENTITY_TREE_DATA)
+    OrganizationRootVersion.objects.refresh(organization_ids)
+    PartnerLocation.objects.refresh(organization_ids)
+    refresh_api_snapshot(partnerships_of_organizations(organization_ids))
+
+
+@receiver(post_save, sender=Entity)
+def entity_changed(sender, instance, **kwargs):
+    # Website or organization may have changed
+    organization_ids = {instance.organization_id}
+    organization_ids.update(OrganizationRootVersion.objects.filter(
+        entity=instance,
+    ).values_list('organization_id', flat=True))
+    OrganizationRootVersion.objects.refresh(organization_ids)
+    PartnerLocation.objects.refresh(organization_ids)
+    # The entity may have left or joined the UCL tree
+    EntityPath.objects.refresh([instance.pk])
+    bump_data_version(ENTITY_TREE_DATA)
+    PartnerSearchDocument.objects.refresh([instance.pk])
+
+
+def addresses_changed(entity_version_ids):
+    """
+    Refresh what depends on the addresses of these entity versions, to be
+    called after bulk operations which do not send signals
+    """
+    organization_ids = list(EntityVersion.objects.filter(
+        pk__in=entity_version_ids,
+    ).values_list('entity__organization_id', flat=True).distinct())
+    OrganizationRootVersion.objects.refresh(organization_ids)
+    PartnerLocation.objects.refresh(organization_ids)
+    refresh_api_snapshot(partnerships_of_organizations(organization_ids))
+
+
+@receiver([post_save, post_delete], sender=EntityVersionAddress)
+def entity_version_address_changed(sender, instance, **kwargs):
+    addresses_changed([instance.entity_version_id])
+
+
+@receiver(post_save, sender=Partner)
+def partner_changed(sender, instance, **kwargs):
+    PartnerSearchDocument.objects.refresh_partners([instance.pk])
+    PartnerBlockingKey.objects.refresh([instance.pk])
+    if kwargs.get('created'):
+        PartnerLocation.objects.refresh([instance.organization_id])
+
+
+@receiver([post_save, post_delete], sender=PartnerEntity)
+def partner_entity_changed(sender, instance, **kwargs):
+    PartnerSearchDocument.objects.refresh([instance.entity_id])
+
+
+@receiver(post_save, sender=Organization)
+def organization_changed(sender, instance, **kwargs):
+    PartnerSearchDocument.objects.refresh(Entity.objects.filter(
+        organization=instance,
+    ).values_list('pk', flat=True))
+    PartnerBlockingKey.objects.refresh(Partner.objects.filter(
+        organization=instance,
+    ).values_list('pk', flat=True))
@@ -0,0 +1,158 @@
+from collections import namedtuple
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db.models import Count
+
+from partnership.models import Partner, PartnerBlockingKey
+from partnership.utils import (
+    blocking_keys,
+    name_tokens,
+    normalize_code,
+    normalize_search_text,
+)
+
+# Partners considered as duplicates from this score
+SIMILARITY_THRESHOLD = 0.8
+
+# Keys shared by more partners are too common to tell duplicates apart
+MAX_BLOCK_SIZE = 200
+
+PartnerFingerprint = namedtuple('PartnerFingerprint', [
+    'pk', 'tokens', 'erasmus_code', 'pic_code', 'city', 'country',
+])
+
+
+def fingerprint(pk, name, erasmus_code=None, pic_code=None, city=None, country=None):
+    return PartnerFingerprint(
+        pk=pk,
+        tokens=name_tokens(name),
+        erasmus_code=normalize_code(erasmus_code),
+        pic_code=normalize_code(pic_code),
+        city=normalize_search_text(city),
+        country=normalize_search_text(country),
+    )
+
+
+def name_similarity(tokens, other_tokens):
+    """
+    Token set similarity of two names: word order does not matter and
+    spelling differences are partially accounted
+    """
+    if not tokens or not other_tokens:
+        return 0
+    jaccard = len(tokens & other_tokens) / len(tokens | other_tokens)
+    ratio = SequenceMatcher(
+        None,
+        ' '.join(sorted(tokens)),
+        ' '.join(sorted(other_tokens)),
+    ).ratio()
+    return max(jaccard, ratio)
+
+
+def similarity(partner, other):
+    """
+    Score between 0 and 1 of two partner fingerprints being the same partner
+    """
+    if partner.erasmus_code and partner.erasmus_code == other.erasmus_code:
+        return 1
+    if partner.pic_code and partner.pic_code == other.pic_code:
+        return 1
+    score = name_similarity(partner.tokens, other.tokens)
+    if partner.country and other.country:
+        score += 0.1 if partner.country == other.country else -0.3
+    if partner.city and other.city and partner.city == other.city:
+        score += 0.1
+    return max(0, min(1, score))
+
+
+def get_fingerprints(partners):
+    """
+    :param partners: Partner queryset
+    :return: dict of fingerprints by partner id
+    """
+    rows = partners.annotate_address('city', 'country__iso_code').values_list(
+        'pk', 'organization__name', 'erasmus_code', 'pic_code', 'city', 'country_iso_code',
+    )
+    return {row[0]: fingerprint(*row) for row in rows}
+
+
+def _frequent_keys(keys):
+    frequent = PartnerBlockingKey.objects.filter(
+        key__in=keys,
+    ).values('key').annotate(count=Count('pk')).filter(
+        count__gt=MAX_BLOCK_SIZE,
+    ).values_list('key', flat=True)
+    return set(frequent)
+
+
+def find_similar_partners(name, erasmus_code=None, pic_code=None, city=None,
+                          country=None, threshold=SIMILARITY_THRESHOLD, exclude=None):
+    """
+    Partners which may be the same as the described one, only comparing
+    the ones sharing a blocking key
+
+    :param country: ISO code of the country
+    :param exclude: id of a partner to ignore, e.g. the edited one
+    :return: list of (score, partner id), best scores first
+    """
+    keys = blocking_keys(name, erasmus_code, pic_code)
+    keys -= {key for key in _frequent_keys(keys) if key.startswith('name:')}
+    if not keys:
+        return []
+    candidates = Partner.objects.filter(
+        pk__in=PartnerBlockingKey.objects.filter(key__in=keys).values('partner_id'),
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(pk=exclude)
+    searched = fingerprint(None, name, erasmus_code, pic_code, city, country)
+    scores = [
+        (similarity(searched, candidate), pk)
+        for pk, candidate in get_fingerprints(candidates).items()
+    ]
+    return sorted(
+        (score_and_pk for score_and_pk in scores if score_and_pk[0] >= threshold),
+        key=lambda score_and_pk: (-score_and_pk[0], score_and_pk[1]),
+    )
+
+
+def find_duplicate_clusters(threshold=SIMILARITY_THRESHOLD):
+    """
+    Groups of partners which may be duplicates, across all partners
+
+    Partners sharing a blocking key are compared pairwise, similar pairs
+    being then merged into clusters.
+
+    :return: list of sets of partner ids
+    """
+    fingerprints = get_fingerprints(Partner.objects.all())
+    blocks = {}
+    for key, partner_id in PartnerBlockingKey.objects.order_by(
+        'key', 'partner_id',
+    ).values_list('key', 'partner_id').iterator():
+        blocks.setdefault(key, []).append(partner_id)
+
+    # Union-find of similar partners
+    parents = {}
+
+    def find(pk):
+        while parents.get(pk, pk) != pk:
+            pk = parents[pk]
+        return pk
+
+    compared = set()
+    for key, partner_ids in blocks.items():
+        if len(partner_ids) < 2 or len(partner_ids) > MAX_BLOCK_SIZE:
+            continue
+        for pair in combinations(partner_ids, 2):
+            if pair in compared:
+                continue
+            compared.add(pair)
+            first, second = (fingerprints.get(pk) for pk in pair)
+            if first and second and similarity(first, second) >= threshold:
+                parents[find(pair[1])] = find(pair[0])
+
+    clusters = {}
+    for pk in parents:
+        clusters.setdefault(find(pk), {find(pk)}).add(pk)
+    return sorted(clusters.values(), key=lambda cluster: min(cluster))
@@ -13,8 +13,13 @@
         if (val.length < 3) {
             return ;
         }
-        var url = $similar.data('url') + '?search=' + val;
-        xhr = $.get(url, function(data) {
+        var params = {
+            search: val,
+            erasmus_code: $('#id_partner-erasmus_code').val() || '',
+            pic_code: $('#id_partner-pic_code').val() || '',
+            city: $('#id_contact_address-city').val() || ''
+        };
+        xhr = $.get($similar.data('url'), params, function(data) {
             $similar.html(data);
         }).fail(function(error) {
             console.error(error);
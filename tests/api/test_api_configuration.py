@@ -90,6 +90,26 @@ class ConfigurationApiViewTest(TestCase):
         with self.assertNumQueriesLessThan(13):
             self.client.get(self.url)
 
+    def test_cached(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueriesLessThan(4):
+            cached_response = self.client.get(self.url)
+        self.assertEqual(cached_response.content, response.content)
+
+        # Changing data invalidates the cache
+        PartnershipFactory()
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['partners']), 4)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
     def test_continents(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.gis.geos import Point
 from django.test import tag
 from django.urls import reverse
@@ -108,29 +110,33 @@ class PartnersApiViewTest(TestCase):
             ucl_entity=EntityFactory(),
         )
 
+    @staticmethod
+    def get_data(response):
+        return json.loads(b''.join(response.streaming_content))
+
     @tag('perf')
     def test_get(self):
         with self.assertNumQueriesLessThan(8):
             response = self.client.get(self.url)
+            data = self.get_data(response)
         self.assertEqual(response.status_code, 200)
-        data = response.json()
         self.assertEqual(len(data), 2)
 
     def test_ordering_partner(self):
         response = self.client.get(self.url + '?ordering=partner')
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['uuid'], str(self.partner_2_uuid))
 
     def test_ordering_country_en(self):
         response = self.client.get(self.url + '?ordering=country_en')
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
     def test_ordering_city(self):
         response = self.client.get(self.url + '?ordering=city')
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['uuid'], str(self.partner_2_uuid))
 
@@ -138,7 +144,7 @@ class PartnersApiViewTest(TestCase):
         response = self.client.get(self.url, {
             'continent': self.continent.name,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
@@ -146,13 +152,13 @@ class PartnersApiViewTest(TestCase):
         response = self.client.get(self.url, {
             'country': self.country.iso_code,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
     def test_filter_city(self):
         response = self.client.get(self.url, {'city': "Lusaka"})
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_2_uuid))
 
@@ -160,7 +166,7 @@ class PartnersApiViewTest(TestCase):
         response = self.client.get(self.url, {
             'partner': self.partner_uuid,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
@@ -168,7 +174,7 @@ class PartnersApiViewTest(TestCase):
         response = self.client.get(self.url, {
             'ucl_entity': self.partnership.ucl_entity.uuid,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
@@ -176,26 +182,26 @@ class PartnersApiViewTest(TestCase):
         response = self.client.get(self.url, {
             'education_field': self.education_field.uuid,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
     def test_filter_mobility_type(self):
         response = self.client.get(self.url + '?mobility_type=student')
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_uuid))
 
         response = self.client.get(self.url + '?mobility_type=staff')
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 0)
 
     def test_filter_funding(self):
         response = self.client.get(self.url, {
             'funding_type':  self.financing.type_id,
         })
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['uuid'], str(self.partner_2_uuid))
 
@@ -218,10 +224,30 @@ class PartnersApiViewTest(TestCase):
         partner = partnership.partner_entities.first().organization.partner
         response = self.client.get(self.url + '?partner=' + str(partner.uuid))
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.get_data(response)
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['partnerships_count'], 1)
 
+    def test_clusters(self):
+        url = reverse('partnership_api_v1:partners_clusters')
+        response = self.client.get(url, {'zoom': 3, 'country': self.country.iso_code})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['count'], 1)
+        self.assertEqual(data[0]['partner'], str(self.partner_uuid))
+        self.assertEqual(data[0]['center'], [19.8186, 41.3275])
+        self.assertEqual(data[0]['tile'], [3, 4, 2])
+
+        response = self.client.get(url, {'zoom': 3, 'bbox': '0,0,1,1'})
+        self.assertEqual(response.json(), [])
+
+    def test_clusters_malformed_bbox(self):
+        url = reverse('partnership_api_v1:partners_clusters')
+        for bbox in ['0,0,1', '0,0,1,1,2', 'a,b,c,d']:
+            response = self.client.get(url, {'zoom': 3, 'bbox': bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+
 
 class InternshipPartnerListApiViewTest(TestCase):
     client_class = APIClient
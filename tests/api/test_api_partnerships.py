@@ -1,10 +1,13 @@
-from datetime import date
+from datetime import date, timedelta
+from io import BytesIO
 
 import freezegun
 from django.contrib.gis.geos import Point
-from django.test import tag
+from django.test import override_settings, tag
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from openpyxl import load_workbook
 
 from base.models.enums.organization_type import ACADEMIC_PARTNER
 from base.tests.factories.academic_year import AcademicYearFactory
@@ -12,9 +15,15 @@ from base.tests.factories.entity import EntityWithVersionFactory
 from base.tests.factories.entity_version import EntityVersionFactory
 from base.tests.factories.person import PersonFactory
 from osis_common.document.xls_build import CONTENT_TYPE_XLS
+from partnership.exports import run_export_job
 from partnership.models import (
     AgreementStatus,
+    ExportJob,
+    ExportJobStatus,
+    PartnershipAgreement,
+    PartnershipApiSnapshot,
     PartnershipConfiguration,
+    PartnershipPartnerRelation,
     PartnershipType,
 )
 from partnership.tests import TestCase
@@ -205,6 +214,14 @@ class PartnershipApiViewTest(TestCase):
         data = response.json()
         self.assertEqual(len(data['results']), PARTNERSHIP_COUNT)
 
+    def test_get_cursor(self):
+        response = self.client.get(self.url, {'cursor': '', 'count': 'true'})
+        data = response.json()
+        self.assertEqual(data['count'], PARTNERSHIP_COUNT)
+        self.assertEqual(len(data['results']), PARTNERSHIP_COUNT)
+        self.assertIsNone(data['next'])
+        self.assertIsNone(data['previous'])
+
     def test_filter_continent(self):
         response = self.client.get(self.url, {'continent': self.continent.name})
         self.assertEqual(response.status_code, 200)
@@ -228,6 +245,16 @@ class PartnershipApiViewTest(TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['uuid'], str(self.partnership.uuid))
 
+    def test_filter_city_after_address_change(self):
+        address = self.partner_2.contact_address
+        address.city = "Livingstone"
+        address.save()
+        response = self.client.get(self.url, {'city': "Livingstone"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['uuid'], str(self.partnership_2.uuid))
+
     def test_filter_partner(self):
         response = self.client.get(self.url, {
             'partner': self.partner.uuid,
@@ -289,6 +316,27 @@ class PartnershipApiViewTest(TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['uuid'], str(self.partnership_2.uuid))
 
+    def test_financing_deleted(self):
+        snapshot = PartnershipApiSnapshot.objects.get(relation__partnership=self.partnership_2)
+        self.assertEqual(snapshot.funding_name, self.financing.type.name)
+        self.financing.delete()
+        snapshot.refresh_from_db()
+        self.assertIsNone(snapshot.funding_name)
+        self.assertIsNone(snapshot.funding_url)
+
+    def test_agreement_end_not_stored(self):
+        relations = PartnershipPartnerRelation.objects.from_api_snapshot(self.current_academic_year)
+        relation = relations.get(partnership=self.partnership_general)
+        self.assertEqual(relation.agreement_end, date(self.current_academic_year.year + 7, 10, 1))
+
+        # Ended without any signal refreshing the snapshot
+        PartnershipAgreement.objects.filter(partnership=self.partnership_general).update(
+            start_date=date(2000, 1, 1),
+            end_date=date(2000, 1, 2),
+        )
+        relation = relations.get(partnership=self.partnership_general)
+        self.assertIsNone(relation.agreement_end)
+
     def test_filter_funding_overridden(self):
         response = self.client.get(self.url,  {
             'funding_source': self.funding_source.pk,
@@ -356,3 +404,67 @@ class PartnershipApiViewTest(TestCase):
         with self.assertNumQueriesLessThan(22):
             response = self.client.get(url)
             self.assertEqual(response['Content-Type'], CONTENT_TYPE_XLS)
+
+    def test_export_content(self):
+        url = reverse('partnership_api_v1:export')
+        response = self.client.get(url)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.worksheets[0].values)
+        # Header and one row per partnership relation
+        self.assertEqual(len(rows), PARTNERSHIP_COUNT + 1)
+        self.assertIn(str(self.partnership.pk), [str(row[0]) for row in rows])
+
+    def test_export_async(self):
+        url = reverse('partnership_api_v1:export')
+        response = self.client.get(url, {'async': 1, 'country': self.country.iso_code})
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get()
+        self.assertEqual(response.json()['status'], ExportJobStatus.PENDING.name)
+
+        # Same request reuses the job, pending download tells to wait
+        response = self.client.get(url, {'country': self.country.iso_code, 'async': 1})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ExportJob.objects.count(), 1)
+        response = self.client.get(job.get_download_url())
+        self.assertEqual(response.status_code, 202)
+
+        run_export_job(job.pk)
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.json()['status'], ExportJobStatus.DONE.name)
+        response = self.client.get(job.get_download_url())
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE_XLS)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(list(workbook.worksheets[0].values)), 2)
+        job.file.delete()
+
+    def test_export_async_script_prefix(self):
+        url = reverse('partnership_api_v1:export')
+        response = self.client.get(
+            url, {'async': 1, 'country': self.country.iso_code},
+            SCRIPT_NAME='/prefix',
+        )
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.path, url)
+        job = run_export_job(job.pk)
+        self.assertEqual(job.status, ExportJobStatus.DONE.name)
+        job.file.delete()
+
+    @override_settings(PARTNERSHIP_EXPORT_JOB_TIMEOUT=60)
+    def test_export_async_stale(self):
+        url = reverse('partnership_api_v1:export')
+        self.client.get(url, {'async': 1, 'country': self.country.iso_code})
+        job = ExportJob.objects.get()
+
+        # The worker running the job was stopped
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJobStatus.RUNNING.name,
+            created=timezone.now() - timedelta(seconds=61),
+        )
+        response = self.client.get(url, {'async': 1, 'country': self.country.iso_code})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ExportJob.objects.count(), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJobStatus.FAILED.name)
+        new_job = ExportJob.objects.exclude(pk=job.pk).get()
+        self.assertEqual(new_job.status, ExportJobStatus.PENDING.name)
@@ -0,0 +1,9 @@
+"""
+Benchmarks of the public API, disabled unless PARTNERSHIP_BENCHMARK is set
+
+Run them with, e.g.:
+
+    PARTNERSHIP_BENCHMARK=1000,10000,50000 \
+    PARTNERSHIP_BENCHMARK_REPORT=benchmark.json \
+    ./manage.py test partnership.tests.benchmarks --tag=benchmark
+"""
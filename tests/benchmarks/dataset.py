@@ -0,0 +1,129 @@
+from itertools import cycle
+
+from base.tests.factories.entity_version import EntityVersionFactory
+from partnership.models import AgreementStatus, PartnershipType
+from partnership.tests.factories import (
+    FundingTypeFactory,
+    PartnerFactory,
+    PartnershipAgreementFactory,
+    PartnershipFactory,
+    PartnershipTagFactory,
+    UCLManagementEntityFactory,
+)
+from reference.models.continent import Continent
+from reference.tests.factories.country import CountryFactory
+
+__all__ = ['BenchmarkDataset']
+
+# Number of relations sharing the same partner
+RELATIONS_PER_PARTNER = 10
+
+
+class BenchmarkDataset:
+    """
+    Synthetic partnerships for the current API academic year, growing
+    incrementally to reach the requested number of relations
+    """
+
+    def __init__(self, academic_year):
+        self.academic_year = academic_year
+        self.relation_count = 0
+        self.partners = []
+
+        continents = [
+            Continent.objects.create(code=code, name=name)
+            for code, name in [('EU', 'Europe'), ('AS', 'Asia'), ('AF', 'Africa')]
+        ]
+        self.countries = [
+            CountryFactory(iso_code='Z{}'.format(chr(ord('A') + i)), continent=continent)
+            for i, continent in enumerate(continents * 4)
+        ]
+        self.cities = ['City {}'.format(i) for i in range(20)]
+
+        root = EntityVersionFactory(parent=None, entity_type='', acronym='UCL').entity
+        self.sectors = [
+            EntityVersionFactory(parent=root, acronym='SEC{}'.format(i)).entity
+            for i in range(3)
+        ]
+        self.faculties = [
+            EntityVersionFactory(parent=sector, acronym='FAC{}{}'.format(i, j)).entity
+            for i, sector in enumerate(self.sectors)
+            for j in range(4)
+        ]
+        for faculty in self.faculties:
+            UCLManagementEntityFactory(entity=faculty)
+
+        self.funding_types = [FundingTypeFactory() for _ in range(3)]
+        self.tags = [PartnershipTagFactory() for _ in range(5)]
+        self._faculty = cycle(self.faculties)
+        self._funding_type = cycle(self.funding_types)
+        self._tag = cycle(self.tags)
+
+    def create_partner(self):
+        i = len(self.partners)
+        partner = PartnerFactory(
+            contact_address__country=self.countries[i % len(self.countries)],
+            contact_address__city=self.cities[i % len(self.cities)],
+        )
+        self.partners.append(partner)
+        return partner
+
+    def grow(self, relation_count):
+        """Create relations until the dataset has relation_count of them"""
+        for i in range(self.relation_count, relation_count):
+            if i % RELATIONS_PER_PARTNER == 0:
+                partner = self.create_partner()
+            else:
+                partner = self.partners[-1]
+            is_mobility = i % 5 != 0
+            funding_type = next(self._funding_type)
+            partnership = PartnershipFactory(
+                partnership_type=(
+                    PartnershipType.MOBILITY.name if is_mobility
+                    else PartnershipType.PROJECT.name
+                ),
+                ucl_entity=next(self._faculty),
+                partner_entity=partner._entity,
+                years__academic_year=self.academic_year,
+                years__is_sms=i % 2 == 0,
+                years__is_smp=i % 3 == 0,
+                years__is_sta=i % 4 == 0,
+                years__funding_source=funding_type.program.source,
+                years__funding_program=funding_type.program,
+                years__funding_type=funding_type,
+                tags=[next(self._tag)],
+            )
+            PartnershipAgreementFactory(
+                partnership=partnership,
+                start_academic_year=self.academic_year,
+                end_academic_year__year=self.academic_year.year + 1,
+                status=AgreementStatus.VALIDATED.name,
+            )
+        self.relation_count = max(self.relation_count, relation_count)
+
+    def filter_combinations(self):
+        """
+        Representative parameters of PartnershipPartnerRelationFilter, as used
+        by the portal
+        """
+        partner = self.partners[0]
+        return {
+            'none': {},
+            'continent': {'continent': 'Europe'},
+            'country': {'country': self.countries[0].iso_code},
+            'city': {'country': self.countries[0].iso_code, 'city': self.cities[0]},
+            'partner': {'partner': str(partner.uuid)},
+            'ucl_entity': {'ucl_entity': str(self.faculties[0].uuid)},
+            'ucl_entity_children': {
+                'ucl_entity': str(self.sectors[0].uuid),
+                'with_children': 'true',
+            },
+            'type': {'type': PartnershipType.MOBILITY.name},
+            'mobility_type': {'mobility_type': 'student'},
+            'funding_type': {'funding_type': self.funding_types[0].pk},
+            'combined': {
+                'continent': 'Europe',
+                'type': PartnershipType.MOBILITY.name,
+                'mobility_type': 'staff',
+            },
+        }
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+import unittest
+
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from base.tests.factories.academic_year import AcademicYearFactory
+from partnership.models import PartnershipConfiguration
+from partnership.tests import TestCase
+from .dataset import BenchmarkDataset
+
+BENCHMARK_SCALES = [
+    int(scale) for scale in
+    os.environ.get('PARTNERSHIP_BENCHMARK', '').split(',') if scale.strip()
+]
+BENCHMARK_REPORT = os.environ.get(
+    'PARTNERSHIP_BENCHMARK_REPORT',
+    'partnership-benchmark.json',
+)
+BENCHMARK_REPEAT = int(os.environ.get('PARTNERSHIP_BENCHMARK_REPEAT', 3))
+
+# Endpoints of api/url_v1.py and whether they accept partnership filters
+BENCHMARK_ENDPOINTS = [
+    ('partnership_api_v1:configuration', False),
+    ('partnership_api_v1:partnerships', True),
+    ('partnership_api_v1:partners', True),
+    ('partnership_api_v1:export', True),
+]
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@tag('benchmark')
+@unittest.skipUnless(BENCHMARK_SCALES, "PARTNERSHIP_BENCHMARK is not set")
+class ApiBenchmarkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        AcademicYearFactory.produce_in_future(quantity=3)
+        config = PartnershipConfiguration.get_configuration()
+        cls.academic_year = config.get_current_academic_year_for_api()
+
+    def measure(self, url, params):
+        """
+        Request an endpoint several times
+
+        :return: dict of the number of queries, the median times (SQL and
+            the remaining serialization time) and the peak memory
+        """
+        sql_times = []
+        serialization_times = []
+        peak_memory = 0
+        for _ in range(BENCHMARK_REPEAT):
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = self.client.get(url, params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                else:
+                    response.content
+                total_time = time.perf_counter() - start
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self.assertEqual(response.status_code, 200, url)
+
+            sql_time = sum(float(query['time']) for query in context.captured_queries)
+            sql_times.append(sql_time)
+            serialization_times.append(total_time - sql_time)
+        return {
+            'queries': len(context.captured_queries),
+            'sql_time': statistics.median(sql_times),
+            'serialization_time': statistics.median(serialization_times),
+            'peak_memory': peak_memory,
+        }
+
+    def test_api_benchmark(self):
+        dataset = BenchmarkDataset(self.academic_year)
+        results = []
+        for scale in sorted(BENCHMARK_SCALES):
+            dataset.grow(scale)
+            for url_name, filterable in BENCHMARK_ENDPOINTS:
+                url = reverse(url_name)
+                combinations = dataset.filter_combinations() if filterable else {'none': {}}
+                for name, params in combinations.items():
+                    results.append({
+                        'endpoint': url_name.split(':')[1],
+                        'scale': scale,
+                        'filters': name,
+                        'params': params,
+                        **self.measure(url, params),
+                    })
+
+        with open(BENCHMARK_REPORT, 'w') as f:
+            json.dump({
+                'commit': get_commit(),
+                'date': timezone.now().isoformat(),
+                'repeat': BENCHMARK_REPEAT,
+                'results': results,
+            }, f, indent=2)
@@ -0,0 +1,62 @@
+from base.tests.factories.academic_year import AcademicYearFactory
+from partnership.models import AgreementStatus, PartnershipYearCoverage
+from partnership.tests import TestCase
+from partnership.tests.factories import (
+    PartnershipAgreementFactory,
+    PartnershipFactory,
+    PartnershipYearFactory,
+)
+
+
+class PartnershipYearCoverageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.years = [AcademicYearFactory(year=year) for year in range(2190, 2194)]
+        cls.partnership = PartnershipFactory(years=[])
+
+    def get_coverage(self):
+        return {
+            coverage.academic_year_id: coverage
+            for coverage in PartnershipYearCoverage.objects.filter(partnership=self.partnership)
+        }
+
+    def test_coverage(self):
+        PartnershipYearFactory(partnership=self.partnership, academic_year=self.years[0])
+        PartnershipAgreementFactory(
+            partnership=self.partnership,
+            start_academic_year=self.years[1],
+            end_academic_year=self.years[2],
+            status=AgreementStatus.VALIDATED.name,
+        )
+        PartnershipAgreementFactory(
+            partnership=self.partnership,
+            start_academic_year=self.years[2],
+            end_academic_year=self.years[3],
+            status=AgreementStatus.WAITING.name,
+        )
+        coverage = self.get_coverage()
+
+        self.assertTrue(coverage[self.years[0].pk].has_year)
+        self.assertFalse(coverage[self.years[0].pk].has_agreement)
+        self.assertTrue(coverage[self.years[1].pk].has_validated_agreement)
+        self.assertFalse(coverage[self.years[1].pk].has_year)
+        self.assertTrue(coverage[self.years[2].pk].has_agreement)
+        self.assertTrue(coverage[self.years[2].pk].has_validated_agreement)
+        self.assertTrue(coverage[self.years[3].pk].has_agreement)
+        self.assertFalse(coverage[self.years[3].pk].has_validated_agreement)
+        self.assertTrue(coverage[self.years[3].pk].is_last_agreement_year)
+        self.assertFalse(coverage[self.years[2].pk].is_last_agreement_year)
+
+    def test_refreshed_on_delete(self):
+        agreement = PartnershipAgreementFactory(
+            partnership=self.partnership,
+            start_academic_year=self.years[1],
+            end_academic_year=self.years[1],
+        )
+        self.assertIn(self.years[1].pk, self.get_coverage())
+        agreement.delete()
+        self.assertEqual(self.get_coverage(), {})
+
+        PartnershipYearFactory(partnership=self.partnership, academic_year=self.years[0])
+        self.partnership.delete()
+        self.assertFalse(PartnershipYearCoverage.objects.exists())
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from base.tests.factories.entity_version import EntityVersionFactory
+from partnership.models import EntityCurrentVersion, OrganizationRootVersion, Partner
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnerFactory, PartnershipFactory
+
+
+class CurrentVersionsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.partner = PartnerFactory()
+        cls.entity = cls.partner._entity
+        cls.entity.website = 'https://example.com'
+        cls.entity.save()
+        PartnershipFactory(partner_entity=cls.entity)
+
+    def get_partner(self):
+        return Partner.objects.annotate_website().annotate_partnerships_count().get(
+            pk=self.partner.pk,
+        )
+
+    def test_refresh(self):
+        root_version = OrganizationRootVersion.objects.get(organization=self.partner.organization)
+        self.assertEqual(root_version.version_id, self.partner._entity_version.pk)
+        self.assertEqual(root_version.website, 'https://example.com')
+        self.assertEqual(
+            EntityCurrentVersion.objects.get(entity=self.entity).version_id,
+            self.partner._entity_version.pk,
+        )
+
+        # Refreshed by the signals when a newer version is added
+        version = EntityVersionFactory(
+            entity=self.entity,
+            parent=None,
+            start_date=timezone.now() - timedelta(days=1),
+        )
+        root_version.refresh_from_db()
+        self.assertEqual(root_version.version_id, version.pk)
+        self.assertEqual(EntityCurrentVersion.objects.get(entity=self.entity).version_id, version.pk)
+
+        # And rebuilt from scratch
+        OrganizationRootVersion.objects.all().delete()
+        self.assertGreaterEqual(OrganizationRootVersion.objects.refresh(), 1)
+        root_version = OrganizationRootVersion.objects.get(organization=self.partner.organization)
+        self.assertEqual(root_version.version_id, version.pk)
+
+    def test_annotations(self):
+        partner = self.get_partner()
+        self.assertEqual(partner.website, 'https://example.com')
+        self.assertEqual(partner.partnerships_count, 1)
+
+    def test_annotations_future_root_version(self):
+        # The latest root version is not valid yet, the current one is used
+        EntityVersionFactory(
+            entity=self.entity,
+            parent=None,
+            start_date=timezone.now() + timedelta(days=30),
+        )
+        self.assertGreater(
+            OrganizationRootVersion.objects.get(organization=self.partner.organization).start_date,
+            timezone.now().date(),
+        )
+        partner = self.get_partner()
+        self.assertEqual(partner.website, 'https://example.com')
+        self.assertEqual(partner.partnerships_count, 1)
+
+    def test_annotations_no_current_root_version(self):
+        partner = PartnerFactory(dates__end=timezone.now() - timedelta(days=1))
+        partner = Partner.objects.annotate_website().annotate_partnerships_count().get(
+            pk=partner.pk,
+        )
+        self.assertIsNone(partner.website)
+        self.assertIsNone(partner.partnerships_count)
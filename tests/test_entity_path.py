@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management import call_command
+
+from base.tests.factories.entity_version import EntityVersionFactory
+from partnership.api.serializers.agreement import PartnershipAgreementAdminSerializer
+from partnership.models import EntityPath, EntityProxy, Partnership
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnershipFactory
+
+
+class EntityPathTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = EntityVersionFactory(
+            entity__organization=None, parent=None, acronym='UCL', title='Université',
+        ).entity
+        cls.sector = EntityVersionFactory(
+            entity__organization=None, parent=cls.root, acronym='SST', title='Secteur',
+        ).entity
+        cls.faculty = EntityVersionFactory(
+            entity__organization=None, parent=cls.sector, acronym='EPL', title='École',
+        ).entity
+        cls.other_faculty = EntityVersionFactory(
+            entity__organization=None, parent=cls.sector, acronym='AGRO', title='Faculté',
+        ).entity
+        cls.partnership = PartnershipFactory(ucl_entity=cls.faculty)
+
+    def get_path(self, entity):
+        return EntityPath.objects.get(entity=entity).acronym_path
+
+    def test_refreshed_by_signals(self):
+        self.assertEqual(self.get_path(self.faculty), ['UCL', 'SST', 'EPL'])
+
+        # Renaming an entity refreshes the paths of its descendants
+        version = self.sector.entityversion_set.get()
+        version.acronym = 'SSH'
+        version.save()
+        self.assertEqual(self.get_path(self.sector), ['UCL', 'SSH'])
+        self.assertEqual(self.get_path(self.faculty), ['UCL', 'SSH', 'EPL'])
+        self.assertEqual(self.get_path(self.other_faculty), ['UCL', 'SSH', 'AGRO'])
+
+    def test_rebuild(self):
+        EntityPath.objects.all().delete()
+        call_command('rebuild_entity_paths', stdout=mock.Mock())
+        path = EntityPath.objects.get(entity=self.faculty)
+        self.assertEqual(path.acronym_path, ['UCL', 'SST', 'EPL'])
+        self.assertEqual(path.title_path, ['Université', 'Secteur', 'École'])
+        self.assertFalse(EntityPath.objects.filter(
+            entity=self.partnership.partner_entity,
+        ).exists())
+
+    def test_ordering(self):
+        entities = EntityProxy.objects.filter(
+            pk__in=[self.faculty.pk, self.other_faculty.pk, self.sector.pk],
+        ).with_acronym_path().order_by('acronym_path')
+        self.assertEqual(
+            [entity.pk for entity in entities],
+            [self.sector.pk, self.other_faculty.pk, self.faculty.pk],
+        )
+
+    def test_serialization(self):
+        partnership = Partnership.objects.add_acronyms().get(pk=self.partnership.pk)
+        self.assertEqual(partnership.title_path, ['Université', 'Secteur', 'École'])
+        agreement = SimpleNamespace(
+            acronym_path=partnership.acronym_path,
+            title_path=partnership.title_path,
+        )
+        self.assertEqual(
+            PartnershipAgreementAdminSerializer.get_entities_acronyms(agreement),
+            '<abbr title="Secteur">SST</abbr> / <abbr title="École">EPL</abbr>',
+        )
@@ -0,0 +1,40 @@
+import uuid
+
+from django.test import SimpleTestCase
+
+from base.models.enums.entity_type import FACULTY, SECTOR
+from partnership.entity_tree import EntityTree
+
+
+class EntityTreeTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.uuid = uuid.uuid4()
+        cls.tree = EntityTree([
+            (1, uuid.uuid4(), None, '', 'UCL'),
+            (2, uuid.uuid4(), 1, SECTOR, 'SST'),
+            (3, cls.uuid, 2, FACULTY, 'EPL'),
+            (4, uuid.uuid4(), 3, 'SCHOOL', 'ELEC'),
+            (5, uuid.uuid4(), 2, FACULTY, 'SC'),
+        ])
+
+    def test_descendants(self):
+        self.assertEqual(self.tree.descendants(2), {2, 3, 4, 5})
+        self.assertEqual(self.tree.descendants(3, include_self=False), {4})
+        self.assertEqual(self.tree.descendants(42), {42})
+
+    def test_ancestors(self):
+        self.assertEqual(self.tree.ancestors(4), [4, 3, 2, 1])
+        self.assertEqual(self.tree.ancestors('4', include_self=False), [3, 2, 1])
+
+    def test_ancestor_of_type(self):
+        self.assertEqual(self.tree.ancestor_of_type(4, FACULTY), 3)
+        self.assertEqual(self.tree.ancestor_of_type(3, FACULTY), 3)
+        self.assertEqual(self.tree.ancestor_of_type(4, SECTOR), 2)
+        self.assertIsNone(self.tree.ancestor_of_type(1, FACULTY))
+
+    def test_get_id(self):
+        self.assertEqual(self.tree.get_id(self.uuid), 3)
+        self.assertEqual(self.tree.get_id(str(self.uuid)), 3)
+        self.assertIsNone(self.tree.get_id(uuid.uuid4()))
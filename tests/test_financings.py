@@ -0,0 +1,70 @@
+from base.tests.factories.academic_year import AcademicYearFactory
+from partnership.financings import FinancingImporter, get_financing_lookup
+from partnership.models import PartnershipApiSnapshot
+from partnership.tests import TestCase
+from partnership.tests.factories import FinancingFactory, PartnershipFactory
+from partnership.tests.factories.partnership import PartnershipConfigurationFactory
+from reference.tests.factories.country import CountryFactory
+
+
+class FinancingLookupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = CountryFactory()
+        cls.other_country = CountryFactory()
+        cls.academic_year = AcademicYearFactory(year=2040)
+        cls.financing = FinancingFactory(
+            type__name="Erasmus",
+            type__url="http://erasmus.example.com",
+            academic_year=cls.academic_year,
+        )
+        cls.financing.countries.set([cls.country])
+
+    def test_lookup(self):
+        lookup = get_financing_lookup()
+        funding = lookup.get(self.country.pk, self.academic_year.pk)
+        self.assertEqual(funding.type, "Erasmus")
+        self.assertEqual(funding.url, "http://erasmus.example.com")
+        self.assertEqual(funding.program_id, self.financing.type.program_id)
+        self.assertIsNone(lookup.get(self.other_country.pk, self.academic_year.pk))
+        self.assertEqual(
+            lookup.country_ids(self.academic_year.pk, type_id=self.financing.type_id),
+            [self.country.pk],
+        )
+
+        # Rebuilt when the financings change
+        self.financing.countries.add(self.other_country)
+        lookup = get_financing_lookup()
+        self.assertIsNotNone(lookup.get(self.other_country.pk, self.academic_year.pk))
+
+
+class FinancingImporterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.api_year = AcademicYearFactory(year=2041)
+        cls.imported_year = AcademicYearFactory(year=2042)
+        PartnershipConfigurationFactory(partnership_api_year=cls.api_year)
+        cls.country = CountryFactory()
+        cls.financing = FinancingFactory(
+            type__url="http://old.example.com",
+            academic_year=cls.api_year,
+        )
+        cls.financing.countries.set([cls.country])
+        cls.partnership = PartnershipFactory(partner__contact_address__country=cls.country)
+
+    def test_type_updated_in_other_year(self):
+        snapshot = PartnershipApiSnapshot.objects.get(relation__partnership=self.partnership)
+        self.assertEqual(snapshot.funding_url, "http://old.example.com")
+
+        funding_type = self.financing.type
+        FinancingImporter(self.imported_year, {
+            funding_type.name: {
+                'url': "http://new.example.com",
+                'program': funding_type.program,
+                'countries': [CountryFactory()],
+            },
+        }).apply()
+
+        # The type is shared by the financing of the API year
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.funding_url, "http://new.example.com")
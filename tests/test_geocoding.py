@@ -0,0 +1,139 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from base.models.entity_version import EntityVersion
+from base.tests.factories.entity_version import EntityVersionFactory
+
+from partnership.geocoding import (
+    GeocodingResult,
+    StubGeocoder,
+    format_address,
+    get_address_search,
+    normalize_address,
+)
+from partnership.management.commands.import_partner_address import Command as ImportAddressCommand
+from partnership.models import GeocodedAddress, Partner, PartnerLocation
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnerFactory
+
+
+@override_settings(PARTNERSHIP_GEOCODER='partnership.geocoding.StubGeocoder')
+class GeocodingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.partner = PartnerFactory(
+            contact_address__street="Place de l'Université",
+            contact_address__street_number='1',
+            contact_address__postal_code='1348',
+            contact_address__city='Louvain-la-Neuve',
+            contact_address__country__name='Belgique',
+            contact_address__location=None,
+        )
+        cls.key, cls.address = get_address_search(
+            '1', "Place de l'Université", '1348', 'Louvain-la-Neuve', 'Belgique',
+        )
+
+    def test_normalize_address(self):
+        self.assertEqual(
+            normalize_address('1', " Place de l'Université ", None, 'LOUVAIN'),
+            "1 place de l'universite louvain",
+        )
+
+    def test_geocode_cached(self):
+        geocoder = StubGeocoder()
+        with mock.patch.dict(StubGeocoder.locations, {self.address: (4.61, 50.67)}):
+            results = geocoder.geocode([(self.key, self.address), ('unknown', 'Unknown')])
+        self.assertEqual(results[self.key].location.coords, (4.61, 50.67))
+        self.assertIsNone(results['unknown'].location)
+        self.assertEqual(GeocodedAddress.objects.count(), 2)
+
+        # The service is not queried anymore, even for a differently written address
+        with mock.patch.object(StubGeocoder, 'request') as request:
+            results = geocoder.geocode([get_address_search(
+                '1', "PLACE DE L'UNIVERSITE", '1348', 'Louvain-la-Neuve', 'Belgique',
+            )])
+        request.assert_not_called()
+        self.assertEqual(results[self.key].location.coords, (4.61, 50.67))
+
+    def test_geocode_original_address_sent(self):
+        geocoder = StubGeocoder()
+        with mock.patch.object(StubGeocoder, 'request', return_value=GeocodingResult(None, 0)) as request:
+            geocoder.geocode([(self.key, self.address)])
+        request.assert_called_once_with("1 Place de l'Université 1348 Louvain-la-Neuve Belgique")
+
+    def test_geocode_partner_address(self):
+        with mock.patch.dict(StubGeocoder.locations, {self.address: (4.61, 50.67)}):
+            call_command('geocode_partner_address', stdout=mock.Mock())
+        location = PartnerLocation.objects.get(partner=self.partner)
+        self.assertEqual(location.location.coords, (4.61, 50.67))
+
+    def import_bulk(self, directory, checkpoint):
+        csv_file = os.path.join(directory, 'addresses.csv')
+        with open(csv_file, 'w') as file:
+            file.write(
+                'ID;Code Erasmus;Numero de rue;Adresse;Code postal;Ville;Pays\n'
+                '{};;2;Place de l\'Université;1348;Louvain-la-Neuve;Belgique\n'.format(
+                    self.partner.pk,
+                )
+            )
+        search = format_address(
+            '2', "Place de l'Université", '1348', 'Louvain-la-Neuve', 'Belgique',
+        )
+        with mock.patch.dict(StubGeocoder.locations, {search: (4.62, 50.67)}):
+            call_command(
+                'import_partner_address', csv_file, '--bulk',
+                '--checkpoint', checkpoint, stdout=mock.Mock(),
+            )
+
+    def test_import_partner_address_bulk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'checkpoint')
+            self.import_bulk(directory, checkpoint)
+            # The checkpoint is removed once the import is complete
+            self.assertFalse(os.path.exists(checkpoint))
+
+        partner = Partner.objects.get(pk=self.partner.pk)
+        self.assertEqual(partner.contact_address.street_number, '2')
+        location = PartnerLocation.objects.get(partner=self.partner)
+        self.assertEqual(location.location.coords, (4.62, 50.67))
+
+    def test_import_partner_address_bulk_conflicting(self):
+        # A future version of the partner entity conflicts with the new one
+        current_version = EntityVersion.objects.get(
+            entityversionaddress__street_number='1',
+            entity__organization=self.partner.organization,
+        )
+        EntityVersion.objects.bulk_create([EntityVersionFactory.build(
+            entity=current_version.entity,
+            parent=None,
+            start_date=date.today() + timedelta(days=30),
+            end_date=None,
+        )])
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'checkpoint')
+            with mock.patch.object(ImportAddressCommand, 'write_checkpoint') as write_checkpoint:
+                self.import_bulk(directory, checkpoint)
+        write_checkpoint.assert_called_once_with(checkpoint, [])
+
+        # Nothing was written for the skipped partner
+        current_version.refresh_from_db()
+        self.assertIsNone(current_version.end_date)
+        partner = Partner.objects.get(pk=self.partner.pk)
+        self.assertEqual(partner.contact_address.street_number, '1')
+
+    def test_import_partner_address_bulk_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'checkpoint')
+            with open(checkpoint, 'w') as file:
+                file.write('{}\n'.format(self.partner.pk))
+            self.import_bulk(directory, checkpoint)
+            self.assertFalse(os.path.exists(checkpoint))
+
+        # The partner was imported before the interruption
+        partner = Partner.objects.get(pk=self.partner.pk)
+        self.assertEqual(partner.contact_address.street_number, '1')
@@ -0,0 +1,56 @@
+from base.tests.factories.academic_year import AcademicYearFactory
+from partnership.loaders import PartnershipValidityLoader
+from partnership.models import AgreementStatus, Partnership
+from partnership.tests import TestCase
+from partnership.tests.factories import (
+    PartnershipAgreementFactory,
+    PartnershipFactory,
+    PartnershipYearFactory,
+)
+
+
+class PartnershipValidityLoaderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_years = [AcademicYearFactory(year=year) for year in range(2200, 2205)]
+        cls.partnership = PartnershipFactory(years=[])
+        for academic_year in cls.academic_years:
+            PartnershipYearFactory(partnership=cls.partnership, academic_year=academic_year)
+        for start, end in [(0, 1), (2, 2), (4, 4)]:
+            PartnershipAgreementFactory(
+                partnership=cls.partnership,
+                start_academic_year=cls.academic_years[start],
+                end_academic_year=cls.academic_years[end],
+                status=AgreementStatus.VALIDATED.name,
+            )
+        cls.other = PartnershipFactory(years=[])
+        PartnershipAgreementFactory(
+            partnership=cls.other,
+            start_academic_year=cls.academic_years[0],
+            end_academic_year=cls.academic_years[1],
+            status=AgreementStatus.WAITING.name,
+        )
+
+    def test_same_values_as_properties(self):
+        partnerships = list(Partnership.objects.filter(pk__in=[self.partnership.pk, self.other.pk]))
+        with self.assertNumQueriesLessThan(8):
+            PartnershipValidityLoader.load(partnerships)
+        for partnership in partnerships:
+            expected = Partnership.objects.get(pk=partnership.pk)
+            with self.assertNumQueries(0):
+                values = {
+                    name: getattr(partnership, name)
+                    for name in PartnershipValidityLoader.PROPERTIES + ['has_missing_valid_years']
+                }
+            for name, value in values.items():
+                self.assertEqual(value, getattr(expected, name), name)
+
+    def test_merged_ranges(self):
+        partnership, = PartnershipValidityLoader.load([self.partnership])
+        self.assertEqual(partnership.valid_agreements_dates_ranges, [
+            {'start': 2200, 'end': 2202},
+            {'start': 2204, 'end': 2204},
+        ])
+        self.assertTrue(partnership.has_missing_valid_years)
+        self.assertEqual(partnership.start_academic_year, self.academic_years[0])
+        self.assertEqual(partnership.end_academic_year, self.academic_years[-1])
@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from partnership.models import Partner
+from partnership.pagination import get_count
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnerFactory
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.partner = PartnerFactory()
+        cls.other_partner = PartnerFactory()
+
+    def get_queryset(self):
+        return Partner.objects.annotate_partnerships_count().filter(
+            pk__in=[self.partner.pk, self.other_partner.pk],
+        ).distinct().order_by('pk')
+
+    def test_count_cached(self):
+        self.assertEqual(get_count(self.get_queryset()), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_count(self.get_queryset()), 2)
+
+        # Counted again once the data changed
+        self.other_partner.delete()
+        self.assertEqual(get_count(self.get_queryset()), 1)
+
+    def test_count_filters(self):
+        queryset = self.get_queryset().filter(pk=self.partner.pk)
+        self.assertEqual(get_count(queryset), 1)
+
+    @override_settings(PARTNERSHIP_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_count_estimated(self):
+        with mock.patch('partnership.pagination.estimate_count', return_value=5000):
+            self.assertEqual(get_count(self.get_queryset()), 5000)
+        with mock.patch('partnership.pagination.estimate_count', return_value=5):
+            self.assertEqual(get_count(self.get_queryset()), 2)
@@ -0,0 +1,43 @@
+from partnership.models import Partnership
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnershipFactory
+
+
+class PartnershipDisplayTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.partnerships = [PartnershipFactory() for _ in range(3)]
+        cls.partnership = cls.partnerships[0]
+        cls.partner_name = cls.partnership.partner_entity.organization.name
+
+    def test_annotate_display(self):
+        partnership = Partnership.objects.annotate_display().get(pk=self.partnership.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(partnership.num_partners, 1)
+            self.assertEqual(partnership.first_partner_name, self.partner_name)
+            self.assertIn(self.partner_name, str(partnership))
+
+    def test_lazy_display_values(self):
+        partnerships = list(Partnership.objects.filter(
+            pk__in=[partnership.pk for partnership in self.partnerships],
+        ))
+        self.assertNotIn('num_partners', partnerships[0].__dict__)
+        # The values are loaded for the whole list in one query
+        with self.assertNumQueries(1):
+            for partnership in partnerships:
+                str(partnership)
+        self.assertEqual(
+            {partnership.first_partner_name for partnership in partnerships},
+            {partnership.partner_entity.organization.name for partnership in self.partnerships},
+        )
+
+    def test_unsaved(self):
+        self.assertEqual(str(Partnership()), 'Missing annotation')
+        with self.assertRaises(AttributeError):
+            Partnership().num_partners
+
+    def test_deleted(self):
+        partnership = Partnership.objects.get(pk=self.partnerships[1].pk)
+        Partnership.objects.filter(pk=partnership.pk).delete()
+        with self.assertRaises(AttributeError):
+            partnership.num_partners
@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase
+
+from partnership.similarity import (
+    blocking_keys,
+    find_duplicate_clusters,
+    find_similar_partners,
+    fingerprint,
+    name_tokens,
+    similarity,
+)
+from partnership.tests import TestCase
+from partnership.tests.factories import PartnerFactory
+
+
+class SimilarityTest(SimpleTestCase):
+    def test_name_tokens(self):
+        self.assertEqual(name_tokens("Univ. of Liège"), {'university', 'liege'})
+        self.assertEqual(name_tokens("Université de Liège"), {'university', 'liege'})
+
+    def test_blocking_keys(self):
+        self.assertEqual(
+            blocking_keys("University of Liège", 'B LIEGE01', None),
+            {'name:liege', 'erasmus:bliege01'},
+        )
+        self.assertEqual(blocking_keys("Technical University"), {
+            'name:technical',
+        })
+
+    def test_similarity(self):
+        partner = fingerprint(1, "University of Oslo", city="Oslo", country="NO")
+        self.assertEqual(similarity(partner, fingerprint(2, "Oslo University")), 1)
+        self.assertLess(similarity(partner, fingerprint(4, "Oslo University", country="US")), 0.8)
+        self.assertEqual(similarity(
+            fingerprint(5, "Foo", erasmus_code='N OSLO01'),
+            fingerprint(6, "Bar", erasmus_code='n-oslo01'),
+        ), 1)
+
+
+class SimilarPartnersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.partner = PartnerFactory(organization__name="Université de Liège")
+        cls.duplicate = PartnerFactory(organization__name="Liege University")
+        cls.other = PartnerFactory(organization__name="University of Namur")
+
+    def test_find_similar_partners(self):
+        similar = find_similar_partners("Univ. Liège")
+        self.assertEqual({pk for score, pk in similar}, {self.partner.pk, self.duplicate.pk})
+        self.assertEqual(find_similar_partners("Foo", erasmus_code=self.other.erasmus_code), [
+            (1, self.other.pk),
+        ])
+
+    def test_find_duplicate_clusters(self):
+        self.assertEqual(find_duplicate_clusters(), [{self.partner.pk, self.duplicate.pk}])
@@ -10,6 +10,7 @@ from partnership.utils import (
     merge_agreement_ranges,
     get_attribute,
     generate_partner_prefix,
+    normalize_search_text,
 )
 
 
@@ -117,3 +118,9 @@ class UtilGenerateAcronymTest(TestCase):
         EntityVersionFactory(acronym='XLIDA')
         self.assertEqual(generate_partner_prefix('Lorem ipsum dolor amet'), 'XLIDAA')
         self.assertEqual(generate_partner_prefix('Lorem ipsum dolor amet et'), 'XLIDAE')
+
+
+class NormalizeSearchTextTest(TestCase):
+    def test_normalize_search_text(self):
+        self.assertEqual(normalize_search_text(' Université  de\tLiège '), 'universite de liege')
+        self.assertEqual(normalize_search_text(None), '')
@@ -0,0 +1,180 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from base.tests.factories.academic_year import AcademicYearFactory
+from partnership.models import (
+    AgreementStatus,
+    PartnershipPartnerRelationYear,
+    PartnershipType,
+    PartnershipYear,
+)
+from partnership.tests import TestCase
+from partnership.tests.factories import (
+    PartnershipAgreementFactory,
+    PartnershipFactory,
+    PartnershipYearEducationLevelFactory,
+    PartnershipYearFactory,
+)
+from partnership.tests.factories.parternship_partner_relation import (
+    PartnershipPartnerRelationYearFactory,
+)
+from partnership.years import YearMaterializer, get_year_values
+from reference.tests.factories.domain_isced import DomainIscedFactory
+
+
+class YearMaterializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_years = [
+            AcademicYearFactory(year=year) for year in range(2160, 2170)
+        ]
+        cls.partnership = PartnershipFactory(years=[])
+        cls.education_field = DomainIscedFactory()
+        cls.other_education_field = DomainIscedFactory()
+        cls.education_level = PartnershipYearEducationLevelFactory()
+
+    def test_save_years(self):
+        materializer = YearMaterializer(self.partnership)
+        values = get_year_values(PartnershipYear(is_sms=True))
+        with self.assertNumQueriesLessThan(15):
+            materializer.save_years(self.academic_years, values, {
+                'education_fields': [self.education_field],
+                'education_levels': [self.education_level],
+            })
+        years = self.partnership.years.all()
+        self.assertEqual(years.count(), 10)
+        self.assertTrue(all(year.is_sms for year in years))
+        self.assertEqual(
+            PartnershipYear.education_fields.through.objects.filter(
+                partnershipyear__partnership=self.partnership,
+            ).count(),
+            10,
+        )
+
+        # Existing years are updated and their relations replaced
+        values['is_sms'] = False
+        materializer.save_years(self.academic_years[5:], values, {
+            'education_fields': [self.other_education_field],
+        })
+        self.assertEqual(self.partnership.years.count(), 10)
+        last_year = self.partnership.years.last()
+        self.assertFalse(last_year.is_sms)
+        self.assertEqual(list(last_year.education_fields.all()), [self.other_education_field])
+        self.assertEqual(list(last_year.education_levels.all()), [self.education_level])
+        first_year = self.partnership.years.first()
+        self.assertTrue(first_year.is_sms)
+        self.assertEqual(list(first_year.education_fields.all()), [self.education_field])
+
+    def test_copy_first_year(self):
+        year = PartnershipYearFactory(
+            partnership=self.partnership,
+            academic_year=self.academic_years[-1],
+            is_stt=True,
+        )
+        year.education_fields.set([self.education_field])
+        YearMaterializer(self.partnership).copy_first_year(2160)
+        years = self.partnership.years.all()
+        self.assertEqual(years.count(), 10)
+        self.assertTrue(all(year.is_stt for year in years))
+        self.assertEqual(list(years.first().education_fields.all()), [self.education_field])
+
+
+class RolloverPartnershipYearsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.from_academic_year = AcademicYearFactory(year=2180)
+        cls.to_academic_year = AcademicYearFactory(year=2181)
+        cls.education_field = DomainIscedFactory()
+
+        cls.mobility = PartnershipFactory(
+            partnership_type=PartnershipType.MOBILITY.name,
+            end_date=cls.to_academic_year.end_date,
+            years=[],
+        )
+        year = PartnershipYearFactory(
+            partnership=cls.mobility,
+            academic_year=cls.from_academic_year,
+            is_sms=True,
+        )
+        year.education_fields.set([cls.education_field])
+
+        cls.course = PartnershipFactory(
+            partnership_type=PartnershipType.COURSE.name,
+            end_date=cls.to_academic_year.end_date,
+            years=[],
+        )
+        PartnershipYearFactory(partnership=cls.course, academic_year=cls.from_academic_year)
+        PartnershipPartnerRelationYearFactory(
+            partnership_relation__partnership=cls.course,
+            academic_year=cls.from_academic_year,
+        )
+
+        # Ended with the academic year
+        cls.ended = PartnershipFactory(
+            partnership_type=PartnershipType.MOBILITY.name,
+            end_date=cls.from_academic_year.end_date,
+            years=[],
+        )
+        PartnershipYearFactory(partnership=cls.ended, academic_year=cls.from_academic_year)
+
+        # Ended with the academic year, but extended by a validated agreement
+        cls.extended = PartnershipFactory(
+            partnership_type=PartnershipType.MOBILITY.name,
+            end_date=cls.from_academic_year.end_date,
+            years=[],
+        )
+        PartnershipYearFactory(partnership=cls.extended, academic_year=cls.from_academic_year)
+        PartnershipAgreementFactory(
+            partnership=cls.extended,
+            start_academic_year=cls.from_academic_year,
+            end_academic_year=cls.to_academic_year,
+            status=AgreementStatus.VALIDATED.name,
+        )
+
+        # Already rolled over
+        cls.rolled = PartnershipFactory(
+            partnership_type=PartnershipType.MOBILITY.name,
+            end_date=cls.to_academic_year.end_date,
+            years=[],
+        )
+        for academic_year in [cls.from_academic_year, cls.to_academic_year]:
+            PartnershipYearFactory(partnership=cls.rolled, academic_year=academic_year)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command('rollover_partnership_years', '2180', '--dry-run', stdout=out)
+        self.assertIn('MOBILITY: 2 partnerships ({}, {})'.format(
+            self.mobility.pk, self.extended.pk,
+        ), out.getvalue())
+        self.assertIn('COURSE: 1 partnerships ({})'.format(self.course.pk), out.getvalue())
+        self.assertFalse(PartnershipYear.objects.filter(
+            academic_year=self.to_academic_year,
+        ).exclude(partnership=self.rolled).exists())
+
+    def test_rollover(self):
+        call_command('rollover_partnership_years', '2180', stdout=StringIO())
+        year = self.mobility.years.get(academic_year=self.to_academic_year)
+        self.assertTrue(year.is_sms)
+        self.assertEqual(list(year.education_fields.all()), [self.education_field])
+        self.assertTrue(self.course.years.filter(academic_year=self.to_academic_year).exists())
+        self.assertTrue(PartnershipPartnerRelationYear.objects.filter(
+            partnership_relation__partnership=self.course,
+            academic_year=self.to_academic_year,
+        ).exists())
+        self.assertEqual(self.rolled.years.count(), 2)
+        self.assertTrue(self.extended.years.filter(academic_year=self.to_academic_year).exists())
+
+        # Ended partnerships are not extended
+        self.assertFalse(self.ended.years.filter(academic_year=self.to_academic_year).exists())
+        self.ended.refresh_from_db()
+        self.assertEqual(self.ended.end_date, self.from_academic_year.end_date)
+
+    def test_rollover_type(self):
+        call_command(
+            'rollover_partnership_years', '2180',
+            '--type', PartnershipType.COURSE.name,
+            stdout=StringIO(),
+        )
+        self.assertFalse(self.mobility.years.filter(academic_year=self.to_academic_year).exists())
+        self.assertTrue(self.course.years.filter(academic_year=self.to_academic_year).exists())
@@ -26,6 +26,19 @@ class PartnerEntityAutocompleteTestCase(TestCase):
         results = response.json()['results']
         self.assertEqual(len(results), 3)
 
+    def test_partner_entity_autocomplete_search(self):
+        self.client.force_login(self.user)
+        # Accents are ignored
+        response = self.client.get(self.url, {'q': 'UNIVERSITE de nan'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        # Codes and former names are searched
+        response = self.client.get(self.url, {'q': self.partner.erasmus_code})
+        self.assertEqual(len(response.json()['results']), 3)
+        PartnerFactory(organization__name="Ancienne université", now_known_as=self.partner)
+        response = self.client.get(self.url, {'q': 'ancienne universite'})
+        self.assertEqual(len(response.json()['results']), 4)
+
     def test_partner_entity_autocomplete_filter(self):
         self.client.force_login(self.user)
         url = reverse('partnerships:autocomplete:partner_entity_partnerships_filter')
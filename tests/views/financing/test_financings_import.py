@@ -58,11 +58,12 @@ class FinancingsImportViewTest(TestCase):
         cls.academic_year = AcademicYearFactory()
         cls.url = reverse('partnerships:financings:import')
 
-    def submit_scv(self, file):
+    def submit_scv(self, file, **kwargs):
         with open(file, 'r') as f:
             data = {
                 'csv_file': f,
                 'import_academic_year': self.academic_year.pk,
+                **kwargs,
             }
             return self.client.post(self.url, data, follow=True)
 
@@ -100,6 +101,27 @@ class FinancingsImportViewTest(TestCase):
         self.assertIn(self.country_4, countries)
         self.assertTemplateUsed(response, 'partnerships/financings/financing_list.html')
 
+    def test_import_dry_run(self):
+        self.client.force_login(self.user_adri)
+        response = self.submit_scv(self.filename_1, dry_run=True)
+        self.assertTemplateUsed(response, 'partnerships/financings/financing_import.html')
+        self.assertFalse(Financing.objects.exists())
+        report = dict(response.context['diff'].get_report())
+        self.assertEqual(set(report), {'foo', 'bar'})
+        self.assertIn('+ C1, C3', report['foo'])
+
+    def test_import_unchanged(self):
+        self.client.force_login(self.user_adri)
+        self.submit_scv(self.filename_1)
+        financing = Financing.objects.get(type__name='foo')
+
+        # Importing the same file again keeps the existing rows
+        response = self.submit_scv(self.filename_1, dry_run=True)
+        self.assertFalse(response.context['diff'].has_changes)
+        self.submit_scv(self.filename_1)
+        self.assertEqual(Financing.objects.get(type__name='foo').pk, financing.pk)
+        self.assertEqual(FundingType.objects.filter(name='foo').count(), 1)
+
     def test_import_as_adri_invalid(self):
         self.client.force_login(self.user_adri)
         data = {'import_academic_year': self.academic_year.pk}
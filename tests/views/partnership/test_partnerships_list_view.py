@@ -1,7 +1,9 @@
 from datetime import date
 
+from django.db import connection
 from django.shortcuts import resolve_url
 from django.test import tag
+from django.test.utils import CaptureQueriesContext
 
 from base.models.academic_year import AcademicYear
 from base.models.enums.entity_type import FACULTY, SECTOR
@@ -351,6 +353,30 @@ class PartnershipsListViewTest(TestCase):
         self.assertEqual(results[0]['uuid'], str(self.partnership_city.uuid))
         self.assertEqual(results[1]['uuid'], str(self.partnership_partner.uuid))
 
+    def test_get_list_cursor(self):
+        self.client.force_login(self.user)
+        headers = {"accept": 'application/json'}
+        response = self.client.get(self.url, {'ordering': 'country', 'cursor': '', 'count': 1}, headers=headers)
+        data = response.json()
+        self.assertEqual(data['total'], 30)
+        self.assertEqual(len(data['object_list']), 20)
+        self.assertEqual(data['object_list'][0]['uuid'], str(self.partnership_city.uuid))
+        self.assertIsNone(data['previous'])
+        first_page = [row['uuid'] for row in data['object_list']]
+
+        response = self.client.get(self.url, {'ordering': 'country', 'cursor': data['next']}, headers=headers)
+        data = response.json()
+        self.assertNotIn('total', data)
+        self.assertEqual(len(data['object_list']), 10)
+        self.assertFalse(set(first_page) & {row['uuid'] for row in data['object_list']})
+        self.assertIsNone(data['next'])
+
+        response = self.client.get(self.url, {'ordering': 'country', 'cursor': data['previous']}, headers=headers)
+        self.assertEqual([row['uuid'] for row in response.json()['object_list']], first_page)
+
+        response = self.client.get(self.url, {'cursor': 'invalid'}, headers=headers)
+        self.assertEqual(response.status_code, 404)
+
     def test_get_list_ordering_ucl(self):
         self.client.force_login(self.user)
         response = self.client.get(self.url + '?ordering=ucl', headers={"accept": 'application/json'})
@@ -741,3 +767,35 @@ class PartnershipsListViewTest(TestCase):
             response = self.client.get(url)
             self.assertEqual(response['Content-Type'], CONTENT_TYPE_XLS)
         self.assertTemplateNotUsed(response, 'partnerships/partnership/partnership_list.html')
+
+    @tag('perf')
+    def test_export_constant_queries(self):
+        self.client.force_login(self.user)
+        year = AcademicYearFactory(year=2138)
+        url = resolve_url('partnerships:export', academic_year_pk=year.pk)
+
+        def create_partnerships(count):
+            for i in range(count):
+                partnership = BasePartnershipFactory(
+                    years__academic_year=year,
+                    partner__contact_address=True,
+                )
+                partnership.years.first().education_levels.add(
+                    PartnershipYearEducationLevelFactory(),
+                )
+                BasePartnershipAgreementFactory(
+                    partnership=partnership,
+                    status=AgreementStatus.VALIDATED.name,
+                    start_academic_year=year,
+                    end_academic_year__year=2139,
+                )
+
+        create_partnerships(2)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        num_queries = len(context.captured_queries)
+
+        create_partnerships(10)
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], CONTENT_TYPE_XLS)
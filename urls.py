@@ -16,6 +16,8 @@ urlpatterns = [
     path('agreements/', PartnershipAgreementListView.as_view(), name="agreements-list"),
     path('export/<int:academic_year_pk>/', PartnershipExportView.as_view(), name="export"),
     path('export_agreements/', PartnershipAgreementExportView.as_view(), name="export_agreements"),
+    path('exports/<uuid:uuid>/', ExportJobView.as_view(), name="export_job"),
+    path('exports/<uuid:uuid>/download/', ExportJobDownloadView.as_view(), name="export_job_download"),
     path('configuration/', PartnershipConfigurationUpdateView.as_view(), name='configuration_update'),
     path('<int:pk>/', PartnershipDetailView.as_view(), name="detail"),
     path('complement/<int:pk>/update', PartnershipPartnerRelationUpdateView.as_view(), name="complement"),
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 from itertools import product
 from string import ascii_uppercase
 
@@ -8,6 +9,61 @@ from base.models.entity_version import EntityVersion
 
 RE_FIRST_LETTERS = re.compile(r'\b[a-z]', re.IGNORECASE)
 
+# Variants and abbreviations of the same word
+SYNONYMS = {
+    'univ': 'university',
+    'uni': 'university',
+    'universite': 'university',
+    'universiteit': 'university',
+    'universitat': 'university',
+    'universitaet': 'university',
+    'universita': 'university',
+    'universidad': 'university',
+    'universidade': 'university',
+    'uniwersytet': 'university',
+    'inst': 'institute',
+    'institut': 'institute',
+    'instituto': 'institute',
+    'istituto': 'institute',
+    'tech': 'technology',
+    'technol': 'technology',
+    'technologie': 'technology',
+    'tecnologia': 'technology',
+    'st': 'saint',
+    'sankt': 'saint',
+    'san': 'saint',
+    'ste': 'sainte',
+    'natl': 'national',
+    'nationale': 'national',
+    'nacional': 'national',
+    'nazionale': 'national',
+    'ecole': 'school',
+    'escuela': 'school',
+    'scuola': 'school',
+    'hochschule': 'school',
+    'college': 'school',
+    'polytechnique': 'polytechnic',
+    'politecnico': 'polytechnic',
+    'politecnica': 'polytechnic',
+    'superieure': 'higher',
+    'superior': 'higher',
+}
+
+# Words ignored when comparing names
+STOPWORDS = {
+    'of', 'the', 'and', 'for', 'at', 'in',
+    'de', 'du', 'des', 'la', 'le', 'les', 'et', 'l', 'd',
+    'di', 'del', 'della', 'degli', 'da', 'do', 'dos', 'das', 'y', 'e',
+    'der', 'die', 'fur', 'und',
+}
+
+# Words too frequent in partner names to be used as blocking keys
+GENERIC_WORDS = {
+    'university', 'institute', 'school', 'technology', 'national', 'higher',
+    'polytechnic', 'saint', 'sainte', 'centre', 'center', 'faculty',
+    'academy', 'college', 'research', 'sciences', 'science', 'state',
+}
+
 
 def academic_years(start_year, end_year):
     if start_year or end_year:
@@ -101,3 +157,43 @@ def format_partner_entity(entity):
         entity.organization.name,
         entity.organization.code,
     )
+
+
+def normalize_search_text(value):
+    """
+    Lowercase a text without accents nor repeated spaces, to be searched
+    """
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.lower().split())
+
+
+def name_tokens(name):
+    """Words of a normalized name, without stopwords"""
+    words = re.findall(r'\w+', normalize_search_text(name))
+    return frozenset(
+        SYNONYMS.get(word, word) for word in words if word not in STOPWORDS
+    )
+
+
+def normalize_code(code):
+    return re.sub(r'\W', '', normalize_search_text(code))
+
+
+def blocking_keys(name, erasmus_code=None, pic_code=None):
+    """
+    Keys grouping partners to compare, two similar partners having at least
+    one key in common
+    """
+    keys = {
+        'name:{}'.format(token) for token in name_tokens(name)
+        if token not in GENERIC_WORDS and len(token) > 2
+    }
+    if not keys:
+        # Only generic words, e.g. "Technical University"
+        keys = {'name:{}'.format(token) for token in name_tokens(name)}
+    if normalize_code(erasmus_code):
+        keys.add('erasmus:{}'.format(normalize_code(erasmus_code)))
+    if normalize_code(pic_code):
+        keys.add('pic:{}'.format(normalize_code(pic_code)))
+    return keys
@@ -26,7 +26,7 @@ class PartnershipAgreementExportView(ExportView, PartnershipAgreementListView):
         ]
 
     def get_xls_data(self):
-        for agreement in self.filterset.qs:
+        for agreement in self.filterset.qs.iterator(chunk_size=self.chunk_size):
             years = academic_years(agreement.start_academic_year, agreement.end_academic_year)
             parts = agreement.acronym_path or []
             yield [
@@ -1,6 +1,6 @@
 from dal import autocomplete
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.db.models import Q, F
+from django.db.models import F
 
 from partnership.models import EntityProxy, PartnershipPartnerRelation
 from partnership.utils import format_partner_entity
@@ -16,18 +16,15 @@ class PartnerEntityAutocompleteView(PermissionRequiredMixin, autocomplete.Select
     permission_required = 'partnership.can_access_partners'
 
     def get_queryset(self):
-        qs = EntityProxy.objects.partner_entities().order_by(
+        qs = EntityProxy.objects.partner_entities()
+        ordering = [
             'organization__name',
             F('partnerentity__name').asc(nulls_first=True),
-        )
-
+        ]
         if self.q:
-            qs = qs.filter(
-                Q(organization__name__icontains=self.q)
-                | Q(partnerentity__name__icontains=self.q)
-                | Q(organization__code__icontains=self.q)
-            )
-        return qs.distinct()
+            qs = qs.search_partners(self.q)
+            ordering.insert(0, '-search_rank')
+        return qs.order_by(*ordering)
 
     def get_result_label(self, result):
         return format_partner_entity(result)
@@ -4,7 +4,6 @@ from django.db.models import Q, F
 from base.models.academic_year import AcademicYear
 from datetime import datetime
 from base.models.education_group_year import EducationGroupYear
-from base.models.entity_version import EntityVersion
 from base.models.enums.entity_type import DOCTORAL_COMMISSION, FACULTY, SECTOR
 from partnership.models import (
     EntityProxy,
@@ -13,6 +12,7 @@ from partnership.models import (
     PartnershipSubtype,
     PartnershipType,
 )
+from partnership.entity_tree import get_entity_tree
 from partnership.utils import format_partner_entity
 from .faculty import FacultyEntityAutocompleteView
 
@@ -32,10 +32,7 @@ def get_parent_id(entity_id, entity_type):
     :param entity_id: The child id from where to search
     :param entity_type: The type of parent to find
     """
-    cte = EntityVersion.objects.with_children(entity=entity_id)
-    return cte.join(EntityVersion, id=cte.col.id).with_cte(cte).filter(
-        entity_type=entity_type
-    ).values_list('entity_id', flat=True).first()
+    return get_entity_tree().ancestor_of_type(entity_id, entity_type)
 
 
 class PartnershipAutocompleteView(PermissionRequiredMixin, autocomplete.Select2QuerySetView):
@@ -43,7 +40,7 @@ class PartnershipAutocompleteView(PermissionRequiredMixin, autocomplete.Select2Q
     permission_required = 'partnership.can_access_partnerships'
 
     def get_queryset(self):
-        qs = Partnership.objects.all()
+        qs = Partnership.objects.annotate_display()
         if self.q:
             qs = qs.filter(
                 Q(partner_entity__organization__name__icontains=self.q)
@@ -74,10 +71,11 @@ class PartnershipYearEntitiesAutocompleteView(FacultyEntityAutocompleteView):
             # Get faculty (entity if faculty, or parent if not faculty)
             parent_id = get_parent_id(entity_id, FACULTY)
 
-        cte = EntityVersion.objects.with_parents(entity_id=parent_id)
-        cte_qs = cte.queryset().with_cte(cte).values('entity_id')
-
-        qs = super().get_queryset().filter(pk__in=cte_qs)
+        if parent_id is None:
+            return EntityProxy.objects.none()
+        qs = super().get_queryset().filter(
+            pk__in=get_entity_tree().descendants(parent_id),
+        )
 
         if partnership_type == PartnershipType.DOCTORATE.name:
             # Only return doctoral commissions for this type
@@ -150,17 +148,15 @@ class PartnerEntityAutocompletePartnershipsFilterView(PermissionRequiredMixin, a
     permission_required = 'partnership.can_access_partnerships'
 
     def get_queryset(self):
-        qs = EntityProxy.objects.partners_having_partnership().order_by(
+        qs = EntityProxy.objects.partners_having_partnership()
+        ordering = [
             'organization__name',
             F('partnerentity__name').asc(nulls_first=True),
-        )
+        ]
         if self.q:
-            qs = qs.filter(
-                Q(organization__name__icontains=self.q)
-                | Q(partnerentity__name__icontains=self.q)
-                | Q(organization__code__icontains=self.q)
-            )
-        return qs.distinct()
+            qs = qs.search_partners(self.q)
+            ordering.insert(0, '-search_rank')
+        return qs.order_by(*ordering)
 
     def get_result_label(self, result):
         return format_partner_entity(result)
@@ -177,13 +173,13 @@ class YearsEntityAutocompleteFilterView(FacultyEntityAutocompleteView):
 
         # Get all children of faculty
         faculty = get_parent_id(entity, FACULTY)
-        cte = EntityVersion.objects.with_parents(entity=faculty)
-        qs = cte.queryset().with_cte(cte).values('entity_id')
+        if faculty is None:
+            return EntityProxy.objects.none()
 
         # Must have partnership_years associated
         return super().get_queryset().filter(
             partnerships_years__isnull=False,
-            pk__in=qs,
+            pk__in=get_entity_tree().descendants(faculty),
         )
 
 
@@ -1,15 +1,38 @@
+import os
+import tempfile
 from collections import OrderedDict
+from datetime import date, datetime
 
+from django.core.exceptions import PermissionDenied
 from django.db.models import QuerySet
+from django.http import FileResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext
 from django.views import View
 from django.views.generic.edit import FormMixin
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 
 from base.models.education_group_year import EducationGroupYear
 from osis_common.document import xls_build
+from partnership.exports import enqueue_export
+from partnership.models import ExportJob
+
+__all__ = [
+    'ExportView',
+    'ExportJobView',
+    'ExportJobDownloadView',
+]
+
+# Excel limits sheet titles to 31 characters
+MAX_SHEET_TITLE_LENGTH = 31
 
 
 class ExportView(FormMixin, View):
     login_url = 'access_denied'
+    # Number of rows fetched (and prefetched) at once by get_xls_data()
+    chunk_size = 500
 
     def get_xls_headers(self):
         raise NotImplementedError
@@ -40,22 +63,108 @@ class ExportView(FormMixin, View):
             return filters
         return OrderedDict()
 
-    def generate_xls(self):
-        working_sheets_data = self.get_xls_data()
-        parameters = {
-            xls_build.DESCRIPTION: self.get_title(),
-            xls_build.USER: str(self.request.user),
-            xls_build.FILENAME: self.get_filename(),
-            xls_build.HEADER_TITLES: self.get_xls_headers(),
-            xls_build.WS_TITLE: self.get_title(),
-        }
+    @staticmethod
+    def get_xls_value(value):
+        """Convert a value to a type openpyxl can write"""
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, date):
+            return value
+        return str(value)
+
+    def write_xls(self, file):
+        """
+        Write the workbook in a file, rows are written as soon as they are
+        generated so that memory usage does not depend on the number of rows
+        """
+        workbook = Workbook(write_only=True)
+        workbook.properties.title = str(self.get_title())
+        workbook.properties.creator = str(self.request.user)
+        bold = Font(bold=True)
+
+        worksheet = workbook.create_sheet(
+            str(self.get_title())[:MAX_SHEET_TITLE_LENGTH],
+        )
+        header = []
+        for title in self.get_xls_headers():
+            cell = WriteOnlyCell(worksheet, value=str(title))
+            cell.font = bold
+            header.append(cell)
+        worksheet.append(header)
+        for row in self.get_xls_data():
+            worksheet.append([self.get_xls_value(value) for value in row])
+
         filters = self.get_xls_filters()
-        response = xls_build.generate_xls(
-            xls_build.prepare_xls_parameters_list(working_sheets_data, parameters),
-            filters,
+        if filters:
+            worksheet = workbook.create_sheet(gettext('Filters'))
+            for label, value in filters.items():
+                cell = WriteOnlyCell(worksheet, value=str(label))
+                cell.font = bold
+                worksheet.append([cell, str(value)])
+
+        workbook.save(file)
+
+    def generate_xls(self):
+        file = tempfile.TemporaryFile()
+        self.write_xls(file)
+        file.seek(0)
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename='{}.xlsx'.format(self.get_filename()),
+            content_type=xls_build.CONTENT_TYPE_XLS,
         )
-        return response
 
     def get(self, request, *args, **kwargs):
+        if request.GET.get('async'):
+            # Build the file in the background, the client polls the job
+            job = enqueue_export(request)
+            return JsonResponse(
+                get_export_job_data(request, job),
+                status=200 if job.is_done else 202,
+            )
         self.filterset = self.get_filterset(self.get_filterset_class())
         return self.generate_xls()
+
+
+def get_export_job_data(request, job):
+    data = {
+        'status': job.status,
+        'url': request.build_absolute_uri(job.get_absolute_url()),
+    }
+    if job.is_done:
+        data['download_url'] = request.build_absolute_uri(job.get_download_url())
+    return data
+
+
+class ExportJobView(View):
+    """
+    Status of an export job
+    """
+
+    def get(self, request, uuid):
+        job = get_object_or_404(ExportJob, uuid=uuid)
+        if not job.can_be_accessed_by(request.user):
+            raise PermissionDenied
+        return JsonResponse(get_export_job_data(request, job))
+
+
+class ExportJobDownloadView(View):
+    """
+    File of an export job, or its status while it is not ready
+    """
+
+    def get(self, request, uuid):
+        job = get_object_or_404(ExportJob, uuid=uuid)
+        if not job.can_be_accessed_by(request.user):
+            raise PermissionDenied
+        if not job.is_done:
+            return JsonResponse(get_export_job_data(request, job), status=202)
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(job.file.name),
+            content_type=xls_build.CONTENT_TYPE_XLS,
+        )
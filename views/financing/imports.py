@@ -5,18 +5,15 @@ from collections import defaultdict
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from django.db import transaction
 from django.shortcuts import redirect, resolve_url
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.edit import FormMixin, ProcessFormView
 
 from osis_role.contrib.views import PermissionRequiredMixin
+from partnership.financings import FinancingImporter
 from partnership.forms import FinancingImportForm
-from partnership.models import (
-    Financing, FundingProgram, FundingSource,
-    FundingType,
-)
+from partnership.models import FundingProgram, FundingSource
 from reference.models.country import Country
 
 __all__ = [
@@ -107,27 +104,11 @@ class FinancingImportView(PermissionRequiredMixin, TemplateResponseMixin, FormMi
 
         return results
 
-    @transaction.atomic
-    def update_financings(self, academic_year, data):
-        # Deleting existing data for the year
-        Financing.objects.filter(academic_year=academic_year).delete()
-
-        financing_list = []
-        for name, obj in data.items():
-            # Create/update the funding type if not existing
-            funding, _ = FundingType.objects.update_or_create(defaults=dict(
-                url=obj['url'],
-                program=obj['program'],
-            ), name=name)
-
-            financing_list.append(Financing(
-                academic_year=academic_year,
-                type=funding,
-            ))
-
-        objects = Financing.objects.bulk_create(financing_list)
-        for financing in objects:
-            financing.countries.set(data[financing.type.name]['countries'])
+    def update_financings(self, academic_year, data, dry_run=False):
+        importer = FinancingImporter(academic_year, data)
+        if dry_run:
+            return importer.get_diff()
+        return importer.apply()
 
     def form_valid(self, form):
         academic_year = form.cleaned_data.get('import_academic_year')
@@ -139,7 +120,17 @@ class FinancingImportView(PermissionRequiredMixin, TemplateResponseMixin, FormMi
             messages.error(self.request, _('financings_imported_error'))
             return redirect(self.get_success_url(academic_year))
 
-        self.update_financings(academic_year, results)
+        dry_run = form.cleaned_data.get('dry_run')
+        diff = self.update_financings(academic_year, results, dry_run=dry_run)
+        if dry_run:
+            return self.render_to_response(self.get_context_data(
+                form=form,
+                diff=diff,
+                academic_year=academic_year,
+            ))
 
-        messages.success(self.request, _('financings_imported'))
+        if diff.has_changes:
+            messages.success(self.request, _('financings_imported'))
+        else:
+            messages.info(self.request, _('financings_imported_unchanged'))
         return redirect(self.get_success_url(academic_year))
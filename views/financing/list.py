@@ -1,4 +1,3 @@
-from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404, redirect, resolve_url
 from django.views.generic.edit import FormMixin
 from django_filters.views import FilterView
@@ -8,9 +7,9 @@ from base.utils.search import SearchMixin
 from osis_role.contrib.views import PermissionRequiredMixin
 from partnership.api.serializers.financing import FinancingSerializer
 from partnership.filter import FinancingAdminFilter
+from partnership.financings import get_financing_lookup
 from partnership.forms import FinancingFilterForm, FinancingImportForm
 from partnership.models import (
-    Financing,
     PartnershipConfiguration,
     FundingSource,
 )
@@ -70,14 +69,11 @@ class FinancingListView(PermissionRequiredMixin, SearchMixin, FormMixin, FilterV
         return resolve_url('partnerships:financings:list', year=year)
 
     def get_queryset(self):
-        qs = Financing.objects.filter(
-            countries=OuterRef('pk'),
-            academic_year=self.academic_year,
-        )
+        financing = get_financing_lookup()
         return Country.objects.annotate(
-            financing_name=Subquery(qs.values('type__name')[:1]),
-            financing_url=Subquery(qs.values('type__url')[:1]),
-        ).distinct()
+            financing_name=financing.case(self.academic_year.pk, 'type', 'pk'),
+            financing_url=financing.case(self.academic_year.pk, 'url', 'pk'),
+        )
 
     def form_valid(self, form):
         academic_year = form.cleaned_data.get('year', None)
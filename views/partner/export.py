@@ -59,7 +59,7 @@ class PartnersExportView(ExportView, PartnersListView):
                 'tags_list',
             )
         )
-        return queryset.distinct()
+        return queryset.distinct().iterator(chunk_size=self.chunk_size)
 
     def get_description(self):
         return _('partners')
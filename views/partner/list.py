@@ -3,6 +3,7 @@ from django_filters.views import FilterView
 
 from base.utils.search import SearchMixin
 from partnership.models import Partner
+from partnership.pagination import CountingPaginator
 from ...api.serializers import PartnerAdminSerializer
 from ...filter import PartnerAdminFilter
 
@@ -18,6 +19,7 @@ class PartnersListView(PermissionRequiredMixin, SearchMixin, FilterView):
     template_name = 'partnerships/partners/partners_list.html'
     filterset_class = PartnerAdminFilter
     serializer_class = PartnerAdminSerializer
+    paginator_class = CountingPaginator
     cache_search = False
 
     def get_queryset(self):
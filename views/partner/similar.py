@@ -1,7 +1,9 @@
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.db.models import Case, When
 from django.views.generic import ListView
 
 from partnership.models import Partner
+from partnership.similarity import find_similar_partners
 
 
 class SimilarPartnerView(PermissionRequiredMixin, ListView):
@@ -9,10 +11,27 @@ class SimilarPartnerView(PermissionRequiredMixin, ListView):
     context_object_name = 'similar_partners'
     login_url = 'access_denied'
     permission_required = 'partnership.can_access_partnerships'
+    max_results = 10
 
     def get_queryset(self):
         search = self.request.GET.get('search', '')
         # Don't query for small searches
         if len(search) < 3:
             return Partner.objects.none()
-        return Partner.objects.filter(organization__name__icontains=search)[:10]
+
+        # Probable duplicates first, then partners containing the search
+        similar_ids = [pk for score, pk in find_similar_partners(
+            search,
+            erasmus_code=self.request.GET.get('erasmus_code'),
+            pic_code=self.request.GET.get('pic_code'),
+            city=self.request.GET.get('city'),
+        )]
+        searched_ids = Partner.objects.search(search, ranked=True).order_by(
+            '-search_rank',
+        ).values_list('pk', flat=True)[:self.max_results]
+        ids = list(dict.fromkeys([*similar_ids, *searched_ids]))[:self.max_results]
+        if not ids:
+            return Partner.objects.none()
+        return Partner.objects.filter(pk__in=ids).order_by(Case(*[
+            When(pk=pk, then=position) for position, pk in enumerate(ids)
+        ]))
@@ -12,10 +12,10 @@ from base.models.academic_year import find_academic_years
 from osis_role.contrib.views import PermissionRequiredMixin
 from partnership.auth.predicates import is_linked_to_adri_entity
 from partnership.forms.partnership.year import PartnerRelationYearFormSet, PartnershipRelationYearWithoutDatesForm
-from partnership.models import Partnership, PartnershipType, PartnershipPartnerRelation, PartnershipConfiguration, \
-    PartnershipYearOffers
+from partnership.models import Partnership, PartnershipType, PartnershipConfiguration
 from partnership.models.relation_year import PartnershipPartnerRelationYear
 from partnership.views.mixins import NotifyAdminMailMixin
+from partnership.years import YearMaterializer, get_year_m2m, get_year_values
 
 __all__ = [
     'PartnershipCreateView',
@@ -97,33 +97,20 @@ class PartnershipCreateView(NotifyAdminMailMixin,
         # Create years
         start_year = start_academic_year.year
         end_year = end_academic_year.year
-        academic_years = find_academic_years(start_year=start_year, end_year=end_year)
-        for academic_year in academic_years:
-            partnership_year = form_year.save(commit=False)
-            partnership_year.id = None  # Force the creation of a new PartnershipYear
-            partnership_year.partnership = partnership
-            partnership_year.academic_year = academic_year
-            partnership_year.save()
-            form_year.save_m2m()
-            if self.partnership_type == PartnershipType.COURSE.name:
-                # to create a system for displaying co-diplomas in the annualised training catalogue
-                for offer in form_year.cleaned_data["offers"]:
-                    obj, created = PartnershipYearOffers.objects.update_or_create(
-                        partnershipyear=partnership_year,
-                        educationgroupyear=offer,
-                    )
-                    obj.educationgroup = offer.education_group
-                    obj.save()
+        academic_years = list(find_academic_years(start_year=start_year, end_year=end_year))
+        is_course = self.partnership_type == PartnershipType.COURSE.name
+        # to create a system for displaying co-diplomas in the annualised training catalogue
+        materializer = YearMaterializer(partnership, with_offer_education_groups=is_course)
+        materializer.save_years(
+            academic_years,
+            get_year_values(form_year.save(commit=False)),
+            get_year_m2m(form_year),
+        )
 
         # create partnershiprelationyear
-        if self.partnership_type == PartnershipType.COURSE.name:
-            entities = PartnershipPartnerRelation.objects.filter(partnership=partnership)
-            for entity in entities:
-                for academic_year in academic_years:
-                    PartnershipPartnerRelationYear.objects.create(
-                        partnership_relation_id=entity.pk,
-                        academic_year=academic_year
-                    )
+        if is_course:
+            materializer.save_relation_years(academic_years)
+        materializer.refresh()
 
         messages.success(self.request, _('partnership_success'))
 
@@ -136,7 +123,7 @@ class PartnershipCreateView(NotifyAdminMailMixin,
                 partnership.ucl_entity.most_recent_acronym
             )
             self.notify_admin_mail(title, 'partnership_creation.html', {
-                'partnership': Partnership.objects.get(pk=partnership.pk),  # Reload to get annotations
+                'partnership': Partnership.objects.annotate_display().get(pk=partnership.pk),
             })
 
         return redirect(partnership)
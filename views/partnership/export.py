@@ -1,18 +1,17 @@
 from django.contrib.postgres.aggregates import StringAgg
-from django.db.models import Case, Exists, OuterRef, Prefetch, When
+from django.db.models import Case, Exists, OuterRef, When
 from django.db.models.expressions import Subquery
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
 from django.utils.translation import gettext, gettext_lazy as _, pgettext
 
 from base.models.academic_year import AcademicYear
+from partnership.financings import get_financing_lookup
+from partnership.loaders import PartnershipExportLoader, iterate_in_chunks
 from partnership.models import (
-    EntityProxy,
     Partnership,
-    PartnershipAgreement,
     PartnershipType,
-    PartnershipYear,
-    AgreementStatus,
+    PartnershipYearCoverage,
 )
 from .list import PartnershipsListView
 from ..export import ExportView
@@ -69,18 +68,8 @@ class PartnershipExportView(ExportView, PartnershipsListView):
 
     def get_xls_data(self):
         queryset = self.filterset.qs
-        year_qs = PartnershipYear.objects.select_related(
-            'academic_year',
-            'funding_source',
-            'funding_program',
-            'funding_type',
-        ).prefetch_related(
-            Prefetch('entities', queryset=EntityProxy.objects.with_acronym()),
-            'education_levels',
-        ).filter(academic_year=self.academic_year).order_by('-academic_year__year')
         queryset = (
             queryset
-            .annotate_financing(self.academic_year)
             .annotate_partner_address('country__continent__name')
             .annotate(
                 tags_list=Subquery(
@@ -94,42 +83,39 @@ class PartnershipExportView(ExportView, PartnershipsListView):
                         then=True,
                     ),
                     default=Exists(
-                        PartnershipAgreement.objects.filter(
+                        PartnershipYearCoverage.objects.filter(
                             partnership=OuterRef('partnership_id'),
-                            status=AgreementStatus.VALIDATED.name,
-                            start_academic_year__year__lte=self.academic_year.year,
-                            end_academic_year__year__gte=self.academic_year.year,
+                            academic_year=self.academic_year,
+                            has_validated_agreement=True,
                         )
                     )
                 ),
             )
-            .prefetch_related(
-                Prefetch(
-                    'partnership__years',
-                    queryset=year_qs,
-                    to_attr='selected_year',
-                ),
-                'entity__entityversion_set',
-            )
             .select_related(
                 'entity__partnerentity',
 
             )
         )
-        for rel in queryset.distinct():
+        rows = iterate_in_chunks(
+            queryset.distinct(),
+            PartnershipExportLoader,
+            self.chunk_size,
+            academic_year=self.academic_year,
+        )
+        financing = get_financing_lookup()
+        for rel, loader in rows:
             partnership = rel.partnership
+            funding = financing.get(rel.country_id, self.academic_year.pk)
 
-            all_years = getattr(partnership, 'selected_year', [])
-            year = next((y for y in all_years if y.academic_year == self.academic_year), None)
-            reverse_year = all_years[0] if all_years else None
-
-            last_agreement = partnership.last_valid_agreements[0] if partnership.last_valid_agreements else None
+            year = loader.get_selected_year(partnership)
+            first_year = loader.get_first_year(partnership)
+            last_agreement = loader.get_last_valid_agreement(partnership)
 
             # Replace funding values if financing is eligible for mobility and not overridden in year
-            if partnership.is_mobility and year and year.eligible and rel.financing_source and not year.funding_source:
-                funding_source = rel.financing_source
-                funding_program = rel.financing_program
-                funding_type = rel.financing_type
+            if partnership.is_mobility and year and year.eligible and funding and not year.funding_source:
+                funding_source = funding.source
+                funding_program = funding.program
+                funding_type = funding.type
             else:
                 funding_source = year and year.funding_source
                 funding_program = year and year.funding_program
@@ -137,7 +123,7 @@ class PartnershipExportView(ExportView, PartnershipsListView):
 
             parts = partnership.acronym_path[1:] if partnership.acronym_path else []
 
-            partner = rel.entity.organization.partner
+            erasmus_code, pic_code = loader.get_partner_codes(rel.entity.organization)
             yield [
                 partnership.pk,
                 partnership.get_partnership_type_display(),
@@ -149,8 +135,8 @@ class PartnershipExportView(ExportView, PartnershipsListView):
                 str(rel.country_name),
                 str(rel.entity.organization.name),
                 str(rel.entity.organization.code or ''),
-                str(partner.erasmus_code or ''),
-                str(partner.pic_code or ''),
+                str(erasmus_code or ''),
+                str(pic_code or ''),
 
                 hasattr(rel.entity, 'partnerentity')
                 and rel.entity.partnerentity.name or '',
@@ -171,10 +157,10 @@ class PartnershipExportView(ExportView, PartnershipsListView):
                 year and year.is_sta,
                 year and year.is_stt,
 
-                str(partnership.years.first().academic_year)
+                str(first_year or '')
                 if partnership.is_mobility else partnership.start_date,
 
-                str(reverse_year.academic_year) if reverse_year else ''
+                str(year.academic_year) if year else ''
                 if partnership.is_mobility else partnership.end_date,
 
                 getattr(
@@ -12,19 +12,21 @@ from partnership.filter import PartnershipAdminFilter
 from partnership.models import (
     Partnership, PartnershipType, PartnershipPartnerRelation, PartnershipYearOffers,
 )
+from partnership.pagination import CountingPaginator, KeysetPaginationMixin
 
 __all__ = [
     'PartnershipsListView',
 ]
 
 
-class PartnershipsListView(PermissionRequiredMixin, SearchMixin, FilterView):
+class PartnershipsListView(PermissionRequiredMixin, KeysetPaginationMixin, SearchMixin, FilterView):
     template_name = 'partnerships/partnership/partnership_list.html'
     context_object_name = 'partnerships'
     login_url = 'access_denied'
     permission_required = 'partnership.can_access_partnerships'
     serializer_class = PartnershipPartnerRelationAdminSerializer
     filterset_class = PartnershipAdminFilter
+    paginator_class = CountingPaginator
     cache_search = False
 
     def get_queryset(self):
@@ -43,7 +45,8 @@ class PartnershipsListView(PermissionRequiredMixin, SearchMixin, FilterView):
             .prefetch_related(
                 Prefetch(
                     'partnership',
-                    queryset=Partnership.objects.add_acronyms().for_validity_end().select_related(
+                    queryset=Partnership.objects.add_acronyms().annotate_display()
+                    .for_validity_end().select_related(
                         'supervisor',
                         'subtype',  # keep for xls export
                         'ucl_entity__uclmanagement_entity__academic_responsible',
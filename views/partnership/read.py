@@ -6,6 +6,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import get_language
 from django.views.generic import DetailView
 from base.models.organization import Organization
+from partnership.loaders import PartnershipValidityLoader
 from partnership.models import (
     Media, Partnership, PartnershipAgreement, PartnershipType, PartnershipYear, PartnershipPartnerRelationYear
 )
@@ -49,9 +50,10 @@ class PartnershipDetailView(PermissionRequiredMixin, DetailView):
         return context
 
     def get_object(self, queryset=None):
-        return get_object_or_404(
+        partnership = get_object_or_404(
             Partnership.objects
             .add_acronyms()
+            .annotate_display()
             .select_related(
                 'ucl_entity',
                 'author__user',
@@ -85,3 +87,5 @@ class PartnershipDetailView(PermissionRequiredMixin, DetailView):
             ).order_by('partnershiprelation__partnershiprelation__academic_year'),
             pk=self.kwargs['pk'],
         )
+        PartnershipValidityLoader.load([partnership])
+        return partnership
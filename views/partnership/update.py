@@ -8,12 +8,10 @@ from django.views.generic import UpdateView
 
 from base.models.academic_year import find_academic_years
 from partnership.auth.predicates import is_linked_to_adri_entity
-from partnership.models import (
-    PartnershipType, PartnershipYear, PartnershipPartnerRelation, PartnershipYearOffers,
-)
-from partnership.models.relation_year import PartnershipPartnerRelationYear
+from partnership.models import PartnershipType
 from partnership.views.mixins import NotifyAdminMailMixin
 from partnership.views.partnership.mixins import PartnershipFormMixin
+from partnership.years import YearMaterializer, get_year_m2m, get_year_values
 
 __all__ = [
     'PartnershipUpdateView',
@@ -56,31 +54,15 @@ class PartnershipUpdateView(PartnershipFormMixin,
                 'partnership': partnership,
             })
 
+        is_course = self.partnership_type == PartnershipType.COURSE.name
+        materializer = YearMaterializer(partnership, with_offer_education_groups=is_course)
+
         start_year = None
         start_academic_year = year_data.get('start_academic_year', None)
         # Create missing start year if needed
         if start_academic_year is not None:
             start_year = start_academic_year.year
-            first_year = partnership.years.order_by(
-                'academic_year__year'
-            ).select_related('academic_year').first()
-            if first_year is not None:
-                first_year_education_fields = first_year.education_fields.all()
-                first_year_education_levels = first_year.education_levels.all()
-                first_year_entities = first_year.entities.all()
-                first_year_offers = first_year.offers.all()
-                academic_years = find_academic_years(
-                    start_year=start_year,
-                    end_year=first_year.academic_year.year - 1
-                )
-                for academic_year in academic_years:
-                    first_year.id = None
-                    first_year.academic_year = academic_year
-                    first_year.save()
-                    first_year.education_fields.set(first_year_education_fields)
-                    first_year.education_levels.set(first_year_education_levels)
-                    first_year.entities.set(first_year_entities)
-                    first_year.offers.set(first_year_offers)
+            materializer.copy_first_year(start_year)
 
         # Update years
         if partnership.partnership_type in PartnershipType.with_synced_dates():
@@ -98,28 +80,13 @@ class PartnershipUpdateView(PartnershipFormMixin,
                 end_date=partnership.start_date,
             )
             end_year = academic_years.last().year
+        academic_years = list(academic_years)
 
-
-        for academic_year in academic_years:
-            partnership_year = form_year.save(commit=False)
-            existing_year = PartnershipYear.objects.filter(
-                partnership=partnership, academic_year=academic_year
-            ).first()
-
-            partnership_year.pk = existing_year.pk if existing_year else None
-            partnership_year.partnership = partnership
-            partnership_year.academic_year = academic_year
-            partnership_year.save()
-            form_year.save_m2m()
-
-            if self.partnership_type == PartnershipType.COURSE.name:
-                for offer in form_year.cleaned_data["offers"]:
-                    obj, created = PartnershipYearOffers.objects.update_or_create(
-                        partnershipyear=partnership_year,
-                        educationgroupyear=offer,
-                    )
-                    obj.educationgroup = offer.education_group
-                    obj.save()
+        materializer.save_years(
+            academic_years,
+            get_year_values(form_year.save(commit=False)),
+            get_year_m2m(form_year),
+        )
 
         # Delete no longer used years
         if partnership.partnership_type in PartnershipType.with_synced_dates():
@@ -132,21 +99,10 @@ class PartnershipUpdateView(PartnershipFormMixin,
         partnership.years.filter(query).delete()
 
         # code added when business request to add co-diplomation (program FIE and osis base history)
-        if self.partnership_type == PartnershipType.COURSE.name:
-            entities = PartnershipPartnerRelation.objects.filter(partnership=partnership)
-            for entity in entities:
-                for academic_year in academic_years:
-                    # update or create according to range start_year and end_year
-                    object, created = PartnershipPartnerRelationYear.objects.get_or_create(
-                        partnership_relation_id=entity.pk,
-                        academic_year=academic_year
-                    )
-            # delete according to range start_year and end_year
-            object = PartnershipPartnerRelationYear.objects.filter(
-                partnership_relation_id__in=entities).filter(
-                Q(academic_year__year__gt=end_year) | Q(academic_year__year__lt=start_year)
-            ).delete()
-
+        if is_course:
+            # create or delete according to range start_year and end_year
+            materializer.save_relation_years(academic_years, start_year, end_year)
+        materializer.refresh()
 
         # Sync dates
         if not form.cleaned_data.get('start_date') and start_academic_year:
@@ -1,11 +1,11 @@
-from django.db.models import Func, OuterRef, Subquery
+from django.db.models import Case, CharField, F, Value, When
 from django.views.generic import ListView
 
-from base.models.entity_version import EntityVersion
 from base.models.enums.entity_type import FACULTY
 from osis_role.contrib.views import PermissionRequiredMixin
 from partnership.auth.predicates import is_linked_to_adri_entity
 from partnership.auth.roles.partnership_manager import PartnershipEntityManager
+from partnership.entity_tree import get_entity_tree
 from partnership.models import UCLManagementEntity
 
 __all__ = [
@@ -21,25 +21,24 @@ class UCLManagementEntityListView(PermissionRequiredMixin, ListView):
     permission_required = 'partnership.view_uclmanagemententity'
 
     def get_queryset(self):
-        cte = EntityVersion.objects.with_children()
-        qs = cte.join(EntityVersion, id=cte.col.id).with_cte(cte).annotate(
-            children=cte.col.children,
-        ).filter(
-            children__contains_any=OuterRef('entity__pk'),
-        )
+        tree = get_entity_tree()
+        faculty_acronyms = [
+            When(entity_id=entity_id, then=Value(tree.acronyms.get(faculty_id)))
+            for entity_id, faculty_id in (
+                (entity_id, tree.ancestor_of_type(entity_id, FACULTY))
+                for entity_id in UCLManagementEntity.objects.values_list('entity_id', flat=True)
+            )
+            if faculty_id is not None
+        ]
 
         queryset = (
             UCLManagementEntity.objects
             .annotate(
-                faculty_most_recent_acronym=Subquery(
-                    qs.filter(entity_type=FACULTY).values('acronym')[:1]
-                ),
-                entity_most_recent_acronym=Subquery(
-                    EntityVersion.objects
-                        .filter(entity=OuterRef('entity__pk'))
-                        .order_by('-start_date')
-                        .values('acronym')[:1]
+                faculty_most_recent_acronym=Case(
+                    *faculty_acronyms,
+                    output_field=CharField(),
                 ),
+                entity_most_recent_acronym=F('entity__current_version__acronym'),
             )
             .order_by('faculty_most_recent_acronym', 'entity_most_recent_acronym')
             .select_related(
@@ -56,15 +55,11 @@ class UCLManagementEntityListView(PermissionRequiredMixin, ListView):
             person = self.request.user.person
             entities_managed_by_user = list(PartnershipEntityManager.get_person_related_entities(person))
 
-            # get the children
-            qs = cte.queryset().with_cte(cte).filter(
-                entity_id__in=entities_managed_by_user
-            ).annotate(
-                child_entity_id=Func(cte.col.children, function='unnest'),
-            ).distinct('child_entity_id').values('child_entity_id')
-
             # check if entity is part of entity the user manages
+            entity_ids = set()
+            for entity_id in entities_managed_by_user:
+                entity_ids.update(tree.descendants(entity_id))
             queryset = queryset.filter(
-                entity__in=qs,
+                entity__in=entity_ids,
             )
         return queryset.distinct()
@@ -0,0 +1,354 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils.timezone import now
+
+from base.models.academic_year import find_academic_years
+from partnership.cache import PARTNERSHIP_DATA, bump_data_version
+from partnership.models import (
+    PartnershipPartnerRelation,
+    PartnershipYear,
+    PartnershipYearCoverage,
+)
+from partnership.models.relation_year import PartnershipPartnerRelationYear
+
+# Many-to-many fields of a year, copied to each year of a partnership
+YEAR_M2M_FIELDS = ['education_fields', 'education_levels', 'entities', 'offers']
+
+# Fields specific to each year, never copied
+YEAR_OWN_FIELDS = ['id', 'partnership', 'academic_year', 'changed']
+
+
+def get_year_values(partnership_year):
+    """
+    Values of the fields of a year to copy to the other years, by attname
+    """
+    return {
+        field.attname: getattr(partnership_year, field.attname)
+        for field in PartnershipYear._meta.concrete_fields
+        if field.name not in YEAR_OWN_FIELDS
+    }
+
+
+def get_year_m2m(form):
+    """
+    Many-to-many values of a year form, for the fields it has
+    """
+    return {
+        name: form.cleaned_data[name]
+        for name in YEAR_M2M_FIELDS
+        if name in form.cleaned_data
+    }
+
+
+class YearMaterializer:
+    """
+    Write the years of a partnership on a range of academic years with bulk
+    statements, the number of queries not depending on the number of years
+
+    As bulk statements do not send the signals, refresh() must be called
+    once the years are written.
+    """
+
+    def __init__(self, partnership, with_offer_education_groups=False):
+        """
+        :param with_offer_education_groups: store the education group of
+            the offers, to display co-diplomas in the training catalogue
+        """
+        self.partnership = partnership
+        self.with_offer_education_groups = with_offer_education_groups
+
+    def save_years(self, academic_years, values, m2m):
+        """
+        Create or update the years of the partnership
+
+        :param values: dict of PartnershipYear field values by attname
+        :param m2m: dict of objects by many-to-many field name, only the
+            given fields being set
+        :return: list of the saved PartnershipYear
+        """
+        existing = {
+            year.academic_year_id: year
+            for year in PartnershipYear.objects.filter(
+                partnership=self.partnership,
+                academic_year__in=academic_years,
+            )
+        }
+        created = []
+        updated = []
+        timestamp = now()
+        for academic_year in academic_years:
+            year = existing.get(academic_year.pk)
+            if year is None:
+                year = PartnershipYear(
+                    partnership=self.partnership,
+                    academic_year=academic_year,
+                )
+                created.append(year)
+            else:
+                # bulk_update() does not set the auto_now fields
+                year.changed = timestamp
+                updated.append(year)
+            for attname, value in values.items():
+                setattr(year, attname, value)
+
+        PartnershipYear.objects.bulk_create(created)
+        PartnershipYear.objects.bulk_update(updated, [*values, 'changed'])
+        years = created + updated
+        self.set_m2m([year.pk for year in years], m2m)
+        return years
+
+    def copy_first_year(self, start_year):
+        """
+        Create the years from start_year to the first existing year, as
+        copies of the latter
+
+        :return: list of the created PartnershipYear
+        """
+        first_year = self.partnership.years.order_by(
+            'academic_year__year',
+        ).select_related('academic_year').first()
+        if first_year is None:
+            return []
+        academic_years = find_academic_years(
+            start_year=start_year,
+            end_year=first_year.academic_year.year - 1,
+        )
+        return self.save_years(
+            list(academic_years),
+            get_year_values(first_year),
+            {name: list(getattr(first_year, name).all()) for name in YEAR_M2M_FIELDS},
+        )
+
+    def set_m2m(self, year_ids, m2m):
+        """
+        Set the many-to-many fields of years through their through tables
+        """
+        for name, objs in m2m.items():
+            field = PartnershipYear._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            objs = {obj.pk: obj for obj in objs}
+
+            rows = through.objects.filter(**{source + '__in': year_ids})
+            rows.exclude(**{target + '__in': list(objs)}).delete()
+            existing = set(rows.values_list(source, target))
+            through.objects.bulk_create([
+                through(**{
+                    source: year_id,
+                    target: pk,
+                    **self.get_through_defaults(name, obj),
+                })
+                for year_id in year_ids
+                for pk, obj in objs.items()
+                if (year_id, pk) not in existing
+            ])
+
+    def get_through_defaults(self, name, obj):
+        if name == 'offers' and self.with_offer_education_groups:
+            return {'educationgroup_id': obj.education_group_id}
+        return {}
+
+    def save_relation_years(self, academic_years, start_year=None, end_year=None):
+        """
+        Create the missing years of the partner relations of the partnership,
+        and delete the ones outside of [start_year, end_year]
+        """
+        relation_ids = list(PartnershipPartnerRelation.objects.filter(
+            partnership=self.partnership,
+        ).values_list('pk', flat=True))
+        PartnershipPartnerRelationYear.objects.bulk_create([
+            PartnershipPartnerRelationYear(
+                partnership_relation_id=relation_id,
+                academic_year=academic_year,
+            )
+            for relation_id in relation_ids
+            for academic_year in academic_years
+        ], ignore_conflicts=True)
+
+        outside = Q(pk__in=[])
+        if end_year is not None:
+            outside |= Q(academic_year__year__gt=end_year)
+        if start_year is not None:
+            outside |= Q(academic_year__year__lt=start_year)
+        PartnershipPartnerRelationYear.objects.filter(
+            outside,
+            partnership_relation_id__in=relation_ids,
+        ).delete()
+
+    def refresh(self):
+        """
+        Refresh the data derived from the years, bulk statements not sending
+        the signals
+        """
+        from partnership.signals import refresh_api_snapshot
+
+        PartnershipYearCoverage.objects.refresh([self.partnership.pk])
+        refresh_api_snapshot([self.partnership.pk])
+        bump_data_version(PARTNERSHIP_DATA)
+
+
+class YearRollover:
+    """
+    Copy the years of partnerships from an academic year to the next one,
+    with their many-to-many relations and their partner relation years,
+    in a few INSERT ... SELECT statements
+
+    Only the partnerships having a year in the academic year, none in the
+    next one and still running in the next one are rolled over. Their dates
+    are left untouched.
+    """
+
+    def __init__(self, from_academic_year, to_academic_year, partnership_types):
+        self.from_academic_year = from_academic_year
+        self.to_academic_year = to_academic_year
+        self.partnership_types = partnership_types
+
+    def get_years(self):
+        """
+        Years to roll over, of the partnerships still running in the next
+        academic year: ending after the academic year, or having a validated
+        agreement covering the next one
+        """
+        return PartnershipYear.objects.filter(
+            Q(partnership__end_date__gt=self.from_academic_year.end_date)
+            | Q(partnership_id__in=PartnershipYearCoverage.objects.partnership_ids(
+                self.to_academic_year, has_validated_agreement=True,
+            )),
+            academic_year=self.from_academic_year,
+            partnership__partnership_type__in=self.partnership_types,
+        ).filter(~Exists(PartnershipYear.objects.filter(
+            partnership=OuterRef('partnership_id'),
+            academic_year=self.to_academic_year,
+        )))
+
+    def get_partnership_ids(self):
+        """
+        :return: dict of the sorted ids of the partnerships to roll over by
+            type
+        """
+        partnership_ids = defaultdict(list)
+        for partnership_type, partnership_id in self.get_years().order_by(
+            'partnership_id',
+        ).values_list('partnership__partnership_type', 'partnership_id'):
+            partnership_ids[partnership_type].append(partnership_id)
+        return dict(partnership_ids)
+
+    def apply(self):
+        """
+        Roll the partnerships over, without sending the signals
+
+        :return: dict of the number of rows created by table
+        """
+        partnership_ids = list(self.get_years().values_list('partnership_id', flat=True))
+        if not partnership_ids:
+            return {}
+        params = {
+            'from_year': self.from_academic_year.pk,
+            'to_year': self.to_academic_year.pk,
+            'partnership_ids': partnership_ids,
+        }
+        counts = {}
+        with connection.cursor() as cursor:
+            counts[PartnershipYear._meta.db_table] = self.copy_years(cursor, params)
+            for name in YEAR_M2M_FIELDS:
+                through = PartnershipYear._meta.get_field(name).remote_field.through
+                counts[through._meta.db_table] = self.copy_m2m(cursor, name, params)
+            counts[PartnershipPartnerRelationYear._meta.db_table] = (
+                self.copy_relation_years(cursor, params)
+            )
+        return counts
+
+    @staticmethod
+    def insert_select(cursor, model, values, from_sql, params):
+        """
+        :param values: dict of SQL expressions by column of the model table
+        :return: the number of inserted rows
+        """
+        qn = connection.ops.quote_name
+        cursor.execute('INSERT INTO {table} ({columns}) SELECT {values} {from_sql}'.format(
+            table=qn(model._meta.db_table),
+            columns=', '.join(qn(column) for column in values),
+            values=', '.join(values.values()),
+            from_sql=from_sql,
+        ), params)
+        return cursor.rowcount
+
+    @staticmethod
+    def get_copied_values(model, alias, **values):
+        """
+        SQL expressions copying the columns of a row, except the primary key
+        and the given ones, the auto_now fields being set to now
+        """
+        qn = connection.ops.quote_name
+        copied = {}
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.column in values:
+                continue
+            if getattr(field, 'auto_now', False):
+                copied[field.column] = 'NOW()'
+            else:
+                copied[field.column] = '{}.{}'.format(alias, qn(field.column))
+        return {**copied, **values}
+
+    def copy_years(self, cursor, params):
+        return self.insert_select(
+            cursor,
+            PartnershipYear,
+            self.get_copied_values(
+                PartnershipYear, 'old_year', academic_year_id='%(to_year)s',
+            ),
+            'FROM {year} old_year'
+            ' WHERE old_year.academic_year_id = %(from_year)s'
+            ' AND old_year.partnership_id = ANY(%(partnership_ids)s)'.format(
+                year=connection.ops.quote_name(PartnershipYear._meta.db_table),
+            ),
+            params,
+        )
+
+    def copy_m2m(self, cursor, name, params):
+        field = PartnershipYear._meta.get_field(name)
+        through = field.remote_field.through
+        source = field.m2m_column_name()
+        qn = connection.ops.quote_name
+        return self.insert_select(
+            cursor,
+            through,
+            self.get_copied_values(through, 'old_row', **{source: 'new_year.id'}),
+            'FROM {through} old_row'
+            ' JOIN {year} old_year ON old_year.id = old_row.{source}'
+            ' JOIN {year} new_year ON new_year.partnership_id = old_year.partnership_id'
+            ' AND new_year.academic_year_id = %(to_year)s'
+            ' WHERE old_year.academic_year_id = %(from_year)s'
+            ' AND old_year.partnership_id = ANY(%(partnership_ids)s)'.format(
+                through=qn(through._meta.db_table),
+                year=qn(PartnershipYear._meta.db_table),
+                source=qn(source),
+            ),
+            params,
+        )
+
+    def copy_relation_years(self, cursor, params):
+        qn = connection.ops.quote_name
+        return self.insert_select(
+            cursor,
+            PartnershipPartnerRelationYear,
+            self.get_copied_values(
+                PartnershipPartnerRelationYear,
+                'old_row',
+                academic_year_id='%(to_year)s',
+                # Identifies the synchronized row, not to be duplicated
+                external_id='NULL',
+            ),
+            'FROM {relation_year} old_row'
+            ' JOIN {relation} relation ON relation.id = old_row.partnership_relation_id'
+            ' WHERE old_row.academic_year_id = %(from_year)s'
+            ' AND relation.partnership_id = ANY(%(partnership_ids)s)'
+            ' ON CONFLICT DO NOTHING'.format(
+                relation_year=qn(PartnershipPartnerRelationYear._meta.db_table),
+                relation=qn(PartnershipPartnerRelation._meta.db_table),
+            ),
+            params,
+        )